@@ -29,6 +29,7 @@ from openrazer_daemon.dbus_services.service import DBusService
 from openrazer_daemon.device import DeviceCollection
 from openrazer_daemon.misc.screensaver_monitor import ScreensaverMonitor
 from openrazer_daemon.misc.autosave_persistence import PersistenceAutoSave
+from openrazer_daemon.misc.macro_store import set_macro_directory
 
 
 class RazerDaemon(DBusService):
@@ -86,6 +87,9 @@ class RazerDaemon(DBusService):
         self.logger = self._create_logger(log_dir, log_level, console_log)
 
         self._persistence_file = persistence_file
+        # Macros are stored next to the persistence file, one directory per device
+        if persistence_file is not None:
+            set_macro_directory(os.path.join(os.path.dirname(persistence_file), 'macros'))
         self._persistence = configparser.ConfigParser()
         self._persistence.status = {"changed": False}
         self.read_persistence(persistence_file)
@@ -113,7 +117,7 @@ class RazerDaemon(DBusService):
         self.logger.info("Initialising Daemon (v%s). Pid: %d", __version__, os.getpid())
         self._init_screensaver_monitor()
 
-        self._razer_devices = DeviceCollection()
+        self._razer_devices = DeviceCollection(async_notify=True)
         self._load_devices(first_run=True)
 
         # Add DBus methods
@@ -125,6 +129,8 @@ class RazerDaemon(DBusService):
             ('razer.devices', 'getOffOnScreensaver', self.get_off_on_screensaver, None, 'b'),
             ('razer.devices', 'syncEffects', self.sync_effects, 'b', None),
             ('razer.devices', 'getSyncEffects', self.get_sync_effects, None, 'b'),
+            ('razer.devices', 'setSyncGroup', self.set_sync_group, 'ss', None),
+            ('razer.devices', 'getSyncGroup', self.get_sync_group, 's', 's'),
             ('razer.daemon', 'version', self.version, None, 's'),
             ('razer.daemon', 'stop', self.stop, None, None),
         }
@@ -278,6 +284,7 @@ class RazerDaemon(DBusService):
 
         self._config['General'] = {
             'verbose_logging': False,
+            'key_events_batch_window': 5,
         }
         self._config['Startup'] = {
             'sync_effects_enabled': True,
@@ -323,45 +330,22 @@ class RazerDaemon(DBusService):
 
         for device in self._razer_devices:
             self._persistence[device.dbus.storage_name] = {}
-            if 'set_dpi_xy' in device.dbus.METHODS or 'set_dpi_xy_byte' in device.dbus.METHODS:
+            if device.dbus.HAS_DPI:
                 dpi_x = int(device.dbus.dpi[0])
                 dpi_y = int(device.dbus.dpi[1])
                 # When Y is not greater than 0 check for a DPI X only device, a device with 'available_dpi' and a Y value of 0
-                if dpi_x > 0 and (dpi_y > 0 or ('available_dpi' in device.dbus.METHODS and dpi_y == 0)):
+                if dpi_x > 0 and (dpi_y > 0 or ('available_dpi' in device.dbus.METHOD_NAMES and dpi_y == 0)):
                     self._persistence[device.dbus.storage_name]['dpi_x'] = str(dpi_x)
                     self._persistence[device.dbus.storage_name]['dpi_y'] = str(dpi_y)
 
-            if 'set_poll_rate' in device.dbus.METHODS:
-                self._persistence[device.dbus.storage_name]['poll_rate'] = str(device.dbus.poll_rate)
-
-            if 'set_fan_speed' in device.dbus.METHODS:
-                fan_speed = int(device.dbus.fan_speed)
-                self._persistence[device.dbus.storage_name]['fan_speed'] = str(fan_speed)
-
-            if 'set_power_mode' in device.dbus.METHODS:
-                power_mode = device.dbus.power_mode
-                self._persistence[device.dbus.storage_name]['power_mode'] = str(power_mode)
+            for option, option_type, _ in device.dbus.PERSISTENCE_SCHEMA:
+                self._persistence[device.dbus.storage_name][option] = str(option_type(getattr(device.dbus, option)))
 
-            if 'set_cpu_boost' in device.dbus.METHODS:
-                cpu_bost = device.dbus.cpu_boost
-                self._persistence[device.dbus.storage_name]['cpu_boost'] = str(cpu_bost)
+            if device.dbus.sync_group:
+                self._persistence[device.dbus.storage_name]['sync_group'] = device.dbus.sync_group
 
-            if 'set_gpu_boost' in device.dbus.METHODS:
-                gpu_bost = device.dbus.gpu_boost
-                self._persistence[device.dbus.storage_name]['gpu_boost'] = str(gpu_bost)
-
-            if 'set_bho' in device.dbus.METHODS:
-                bho = int(device.dbus.bho)
-                self._persistence[device.dbus.storage_name]['bho'] = str(bho)
-
-            for i in device.dbus.ZONES:
-                if device.dbus.zone[i]["present"]:
-                    self._persistence[device.dbus.storage_name][i + '_active'] = str(device.dbus.zone[i]["active"])
-                    self._persistence[device.dbus.storage_name][i + '_brightness'] = str(device.dbus.zone[i]["brightness"])
-                    self._persistence[device.dbus.storage_name][i + '_effect'] = device.dbus.zone[i]["effect"]
-                    self._persistence[device.dbus.storage_name][i + '_colors'] = ' '.join(str(i) for i in device.dbus.zone[i]["colors"])
-                    self._persistence[device.dbus.storage_name][i + '_speed'] = str(device.dbus.zone[i]["speed"])
-                    self._persistence[device.dbus.storage_name][i + '_wave_dir'] = str(device.dbus.zone[i]["wave_dir"])
+            for i in device.dbus.PRESENT_ZONES:
+                device.dbus.zone[i].write_persistence(self._persistence[device.dbus.storage_name], i)
 
         with open(persistence_file, 'w') as cf:
             self._persistence.write(cf)
@@ -442,6 +426,50 @@ class RazerDaemon(DBusService):
 
         return result
 
+    def set_sync_group(self, serial, group):
+        """
+        Set the group a device syncs effects with
+
+        Effects are only synced between devices in the same group. Devices which haven't been put in a group
+        are in the '' group.
+
+        :param serial: Device serial
+        :type serial: str
+
+        :param group: Group name
+        :type group: str
+
+        :raises ValueError: If there is no device with the serial
+        """
+        serial = str(serial)
+        group = str(group)
+        if serial not in self._razer_devices:
+            raise ValueError("Unknown device {0}".format(serial))
+
+        device = self._razer_devices[serial]
+        device.dbus.sync_group = group
+        self._razer_devices.set_sync_group(serial, group)
+
+        self._persistence.status["changed"] = True
+
+    def get_sync_group(self, serial):
+        """
+        Get the group a device syncs effects with
+
+        :param serial: Device serial
+        :type serial: str
+
+        :return: Group name
+        :rtype: str
+
+        :raises ValueError: If there is no device with the serial
+        """
+        serial = str(serial)
+        if serial not in self._razer_devices:
+            raise ValueError("Unknown device {0}".format(serial))
+
+        return self._razer_devices[serial].sync_group
+
     def _load_devices(self, first_run=False):
         """
         Go through supported devices and load them
@@ -526,7 +554,7 @@ class RazerDaemon(DBusService):
                         logging.warning("Could not get serial for device {0}. Skipping".format(sys_name))
                         continue
 
-                    self._razer_devices.add(sys_name, device_serial, razer_device)
+                    self._razer_devices.add(sys_name, device_serial, razer_device, razer_device.sync_group)
 
                     device_number += 1
 
@@ -559,7 +587,7 @@ class RazerDaemon(DBusService):
 
                 if len(device_serial) > 0:
                     # Add Device
-                    self._razer_devices.add(sys_name, device_serial, razer_device)
+                    self._razer_devices.add(sys_name, device_serial, razer_device, razer_device.sync_group)
                     self.device_added()
                 else:
                     logging.warning("Could not get serial for device {0}. Skipping".format(sys_name))
@@ -584,6 +612,7 @@ class RazerDaemon(DBusService):
         try:
             device = self._razer_devices[device_id]
 
+            device.stop_worker()
             device.dbus.close()
             device.dbus.remove_from_connection()
             self.write_persistence(self._persistence_file)
@@ -662,6 +691,7 @@ class RazerDaemon(DBusService):
         self._udev_observer.send_stop()
 
         for device in self._razer_devices:
+            device.stop_worker()
             device.dbus.close()
 
         # Write config
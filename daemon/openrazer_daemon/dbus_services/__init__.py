@@ -8,7 +8,7 @@ Has an endpoint decorator to wrap a method for DBus
 from functools import wraps
 
 
-def endpoint(interface_name, function_name, in_sig=None, out_sig=None, byte_arrays=False):
+def endpoint(interface_name, function_name, in_sig=None, out_sig=None, byte_arrays=False, sender_keyword=None):
     """
     DBus Endpoint
 
@@ -27,6 +27,9 @@ def endpoint(interface_name, function_name, in_sig=None, out_sig=None, byte_arra
     :param byte_arrays: is Byte Array
     :type byte_arrays: bool
 
+    :param sender_keyword: Keyword argument the unique bus name of the caller is passed as
+    :type sender_keyword: str or None
+
     :return: Function
     :rtype: callable
     """
@@ -40,6 +43,7 @@ def endpoint(interface_name, function_name, in_sig=None, out_sig=None, byte_arra
         wrapped.in_sig = in_sig
         wrapped.out_sig = out_sig
         wrapped.byte_arrays = byte_arrays
+        wrapped.sender_keyword = sender_keyword
         wrapped.code = func.__code__
         wrapped.globals = func.__globals__
         wrapped.defaults = func.__defaults__
@@ -12,7 +12,7 @@ def get_charging_brightness(self):
     """
     self.logger.debug("DBus call get_charging_brightness")
 
-    return self.zone["charging"]["brightness"]
+    return self.zone["charging"].brightness
 
 
 @endpoint('razer.device.lighting.charging', 'setChargingBrightness', in_sig='d')
@@ -90,7 +90,7 @@ def set_charging_static(self, red, green, blue):
 
     # remember effect
     self.set_persistence("charging", "effect", 'static')
-    self.zone["charging"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["charging"].colors[0:3] = int(red), int(green), int(blue)
 
     rgb_driver_path = self.get_driver_path('charging_matrix_effect_static')
 
@@ -180,7 +180,7 @@ def set_charging_breath_single(self, red, green, blue):
 
     # remember effect
     self.set_persistence("charging", "effect", 'breathSingle')
-    self.zone["charging"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["charging"].colors[0:3] = int(red), int(green), int(blue)
 
     driver_path = self.get_driver_path('charging_matrix_effect_breath')
 
@@ -220,7 +220,7 @@ def set_charging_breath_dual(self, red1, green1, blue1, red2, green2, blue2):
 
     # remember effect
     self.set_persistence("charging", "effect", 'breathDual')
-    self.zone["charging"]["colors"][0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
+    self.zone["charging"].colors[0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
 
     driver_path = self.get_driver_path('charging_matrix_effect_breath')
 
@@ -239,7 +239,7 @@ def get_fast_charging_brightness(self):
     """
     self.logger.debug("DBus call get_fast_charging_brightness")
 
-    return self.zone["fast_charging"]["brightness"]
+    return self.zone["fast_charging"].brightness
 
 
 @endpoint('razer.device.lighting.fast_charging', 'setFastChargingBrightness', in_sig='d')
@@ -317,7 +317,7 @@ def set_fast_charging_static(self, red, green, blue):
 
     # remember effect
     self.set_persistence("fast_charging", "effect", 'static')
-    self.zone["fast_charging"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["fast_charging"].colors[0:3] = int(red), int(green), int(blue)
 
     rgb_driver_path = self.get_driver_path('fast_charging_matrix_effect_static')
 
@@ -407,7 +407,7 @@ def set_fast_charging_breath_single(self, red, green, blue):
 
     # remember effect
     self.set_persistence("fast_charging", "effect", 'breathSingle')
-    self.zone["fast_charging"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["fast_charging"].colors[0:3] = int(red), int(green), int(blue)
 
     driver_path = self.get_driver_path('fast_charging_matrix_effect_breath')
 
@@ -447,7 +447,7 @@ def set_fast_charging_breath_dual(self, red1, green1, blue1, red2, green2, blue2
 
     # remember effect
     self.set_persistence("fast_charging", "effect", 'breathDual')
-    self.zone["fast_charging"]["colors"][0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
+    self.zone["fast_charging"].colors[0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
 
     driver_path = self.get_driver_path('fast_charging_matrix_effect_breath')
 
@@ -466,7 +466,7 @@ def get_fully_charged_brightness(self):
     """
     self.logger.debug("DBus call get_fully_charged_brightness")
 
-    return self.zone["fully_charged"]["brightness"]
+    return self.zone["fully_charged"].brightness
 
 
 @endpoint('razer.device.lighting.fully_charged', 'setFullyChargedBrightness', in_sig='d')
@@ -544,7 +544,7 @@ def set_fully_charged_static(self, red, green, blue):
 
     # remember effect
     self.set_persistence("fully_charged", "effect", 'static')
-    self.zone["fully_charged"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["fully_charged"].colors[0:3] = int(red), int(green), int(blue)
 
     rgb_driver_path = self.get_driver_path('fully_charged_matrix_effect_static')
 
@@ -634,7 +634,7 @@ def set_fully_charged_breath_single(self, red, green, blue):
 
     # remember effect
     self.set_persistence("fully_charged", "effect", 'breathSingle')
-    self.zone["fully_charged"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["fully_charged"].colors[0:3] = int(red), int(green), int(blue)
 
     driver_path = self.get_driver_path('fully_charged_matrix_effect_breath')
 
@@ -674,7 +674,7 @@ def set_fully_charged_breath_dual(self, red1, green1, blue1, red2, green2, blue2
 
     # remember effect
     self.set_persistence("fully_charged", "effect", 'breathDual')
-    self.zone["fully_charged"]["colors"][0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
+    self.zone["fully_charged"].colors[0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
 
     driver_path = self.get_driver_path('fully_charged_matrix_effect_breath')
 
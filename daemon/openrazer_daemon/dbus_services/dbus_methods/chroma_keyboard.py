@@ -5,6 +5,7 @@ BlackWidow Chroma Effects
 """
 import os
 from openrazer_daemon.dbus_services import endpoint
+from openrazer_daemon.misc.software_effects import SOFTWARE_EFFECTS, persistence_name
 
 
 @endpoint('razer.device.lighting.brightness', 'getBrightness', out_sig='d')
@@ -17,7 +18,7 @@ def get_brightness(self):
     """
     self.logger.debug("DBus call get_brightness")
 
-    return self.zone["backlight"]["brightness"]
+    return self.zone["backlight"].brightness
 
 
 @endpoint('razer.device.lighting.brightness', 'setBrightness', in_sig='d')
@@ -297,7 +298,7 @@ def set_static_effect(self, red, green, blue):
 
     # remember effect
     self.set_persistence("backlight", "effect", 'static')
-    self.zone["backlight"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["backlight"].colors[0:3] = int(red), int(green), int(blue)
 
     driver_path = self.get_driver_path('matrix_effect_static')
 
@@ -328,7 +329,7 @@ def set_blinking_effect(self, red, green, blue):
 
     # remember effect
     self.set_persistence("backlight", "effect", 'blinking')
-    self.zone["backlight"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["backlight"].colors[0:3] = int(red), int(green), int(blue)
 
     driver_path = self.get_driver_path('matrix_effect_blinking')
 
@@ -418,7 +419,7 @@ def set_reactive_effect(self, red, green, blue, speed):
 
     # remember effect
     self.set_persistence("backlight", "effect", 'reactive')
-    self.zone["backlight"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["backlight"].colors[0:3] = int(red), int(green), int(blue)
 
     if speed not in (1, 2, 3, 4):
         speed = 4
@@ -473,7 +474,7 @@ def set_breath_single_effect(self, red, green, blue):
 
     # remember effect
     self.set_persistence("backlight", "effect", 'breathSingle')
-    self.zone["backlight"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["backlight"].colors[0:3] = int(red), int(green), int(blue)
 
     driver_path = self.get_driver_path('matrix_effect_breath')
 
@@ -513,7 +514,7 @@ def set_breath_dual_effect(self, red1, green1, blue1, red2, green2, blue2):
 
     # remember effect
     self.set_persistence("backlight", "effect", 'breathDual')
-    self.zone["backlight"]["colors"][0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
+    self.zone["backlight"].colors[0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
 
     driver_path = self.get_driver_path('matrix_effect_breath')
 
@@ -562,7 +563,7 @@ def set_breath_triple_effect(self, red1, green1, blue1, red2, green2, blue2, red
 
     # remember effect
     self.set_persistence("backlight", "effect", 'breathTriple')
-    self.zone["backlight"]["colors"][0:9] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2), int(red3), int(green3), int(blue3)
+    self.zone["backlight"].colors[0:9] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2), int(red3), int(green3), int(blue3)
 
     driver_path = self.get_driver_path('matrix_effect_breath')
 
@@ -625,7 +626,7 @@ def set_ripple_effect(self, red, green, blue, refresh_rate):
 
     # remember effect
     self.set_persistence("backlight", "effect", 'ripple')
-    self.zone["backlight"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["backlight"].colors[0:3] = int(red), int(green), int(blue)
 
 
 @endpoint('razer.device.lighting.custom', 'setRippleRandomColour', in_sig='d')
@@ -645,6 +646,94 @@ def set_ripple_effect_random_colour(self, refresh_rate):
     self.set_persistence("backlight", "effect", 'rippleRandomColour')
 
 
+@endpoint('razer.device.lighting.custom', 'getSoftwareEffects', out_sig='as')
+def get_software_effects(self):
+    """
+    Get the names of the effects the daemon can render
+
+    :return: List of effect names
+    :rtype: list of str
+    """
+    self.logger.debug("DBus call get_software_effects")
+
+    return sorted(SOFTWARE_EFFECTS)
+
+
+@endpoint('razer.device.lighting.custom', 'setSoftwareEffect', in_sig='syyyd')
+def set_software_effect(self, effect_name, red, green, blue, refresh_rate):
+    """
+    Set the daemon to render an effect of the specified colour
+
+    :param effect_name: Effect name, one of getSoftwareEffects
+    :type effect_name: str
+
+    :param red: Red component
+    :type red: int
+
+    :param green: Green component
+    :type green: int
+
+    :param blue: Blue component
+    :type blue: int
+
+    :param refresh_rate: Refresh rate
+    :type refresh_rate: float
+    """
+    self.logger.debug("DBus call set_software_effect")
+
+    effect_name = str(effect_name)
+    if effect_name not in SOFTWARE_EFFECTS:
+        raise ValueError("Unknown software effect {0}".format(effect_name))
+
+    # Notify others
+    self.send_effect_event('setSoftwareEffect', effect_name, red, green, blue, refresh_rate)
+
+    # remember effect
+    self.set_persistence("backlight", "effect", persistence_name(effect_name, False))
+    self.zone["backlight"].colors[0:3] = int(red), int(green), int(blue)
+
+
+@endpoint('razer.device.lighting.custom', 'setSoftwareEffectRandomColour', in_sig='sd')
+def set_software_effect_random_colour(self, effect_name, refresh_rate):
+    """
+    Set the daemon to render an effect of random colours
+
+    :param effect_name: Effect name, one of getSoftwareEffects
+    :type effect_name: str
+
+    :param refresh_rate: Refresh rate
+    :type refresh_rate: float
+    """
+    self.logger.debug("DBus call set_software_effect_random_colour")
+
+    effect_name = str(effect_name)
+    if effect_name not in SOFTWARE_EFFECTS:
+        raise ValueError("Unknown software effect {0}".format(effect_name))
+
+    # Notify others
+    self.send_effect_event('setSoftwareEffectRandomColour', effect_name, refresh_rate)
+
+    # remember effect
+    self.set_persistence("backlight", "effect", persistence_name(effect_name, True))
+
+
+@endpoint('razer.device.lighting.custom', 'getSoftwareEffectStats', out_sig='a{sd}')
+def get_software_effect_stats(self):
+    """
+    Get diagnostic statistics of the effects rendered by the daemon
+
+    Covers the last 100 frames, times are in milliseconds. Also has the p50 and p99 latency of key presses
+    since the effect was set for each stage from the input event to the LEDs (read, key_action, render, upload
+    and total), as latency_<stage>_p50_ms, latency_<stage>_p99_ms and latency_<stage>_count.
+
+    :return: Dictionary of fps, target_fps, render_ms, render_max_ms, upload_ms, upload_max_ms, skipped_frames, latency_*
+    :rtype: dict
+    """
+    self.logger.debug("DBus call get_software_effect_stats")
+
+    return self.effect_manager.statistics
+
+
 @endpoint('razer.device.lighting.chroma', 'setStarlightRandom', in_sig='y')
 def set_starlight_random_effect(self, speed):
     """
@@ -683,7 +772,7 @@ def set_starlight_single_effect(self, red, green, blue, speed):
     # remember effect
     self.set_persistence("backlight", "effect", 'starlightSingle')
     self.set_persistence("backlight", "speed", int(speed))
-    self.zone["backlight"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["backlight"].colors[0:3] = int(red), int(green), int(blue)
 
 
 @endpoint('razer.device.lighting.chroma', 'setStarlightDual', in_sig='yyyyyyy')
@@ -704,4 +793,4 @@ def set_starlight_dual_effect(self, red1, green1, blue1, red2, green2, blue2, sp
     # remember effect
     self.set_persistence("backlight", "effect", 'starlightDual')
     self.set_persistence("backlight", "speed", int(speed))
-    self.zone["backlight"]["colors"][0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
+    self.zone["backlight"].colors[0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
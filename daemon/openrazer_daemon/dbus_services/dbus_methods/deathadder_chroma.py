@@ -10,7 +10,7 @@ def get_backlight_brightness(self):
     """
     self.logger.debug("DBus call get_backlight_brightness")
 
-    return self.zone["backlight"]["brightness"]
+    return self.zone["backlight"].brightness
 
 
 @endpoint('razer.device.lighting.backlight', 'setBacklightBrightness', in_sig='d')
@@ -47,7 +47,7 @@ def get_logo_active(self):
     """
     self.logger.debug("DBus call get_logo_active")
 
-    return self.zone["logo"]["active"]
+    return self.zone["logo"].active
 
 
 @endpoint('razer.device.lighting.logo', 'setLogoActive', in_sig='b')
@@ -73,7 +73,7 @@ def get_logo_brightness(self):
     """
     self.logger.debug("DBus call get_logo_brightness")
 
-    return self.zone["logo"]["brightness"]
+    return self.zone["logo"].brightness
 
 
 @endpoint('razer.device.lighting.logo', 'setLogoBrightness', in_sig='d')
@@ -110,7 +110,7 @@ def get_scroll_brightness(self):
     """
     self.logger.debug("DBus call get_scroll_brightness")
 
-    return self.zone["scroll"]["brightness"]
+    return self.zone["scroll"].brightness
 
 
 @endpoint('razer.device.lighting.scroll', 'setScrollBrightness', in_sig='d')
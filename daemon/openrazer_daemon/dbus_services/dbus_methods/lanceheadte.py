@@ -65,7 +65,7 @@ def get_left_brightness(self):
     """
     self.logger.debug("DBus call get_left_brightness")
 
-    return self.zone["left"]["brightness"]
+    return self.zone["left"].brightness
 
 
 @endpoint('razer.device.lighting.left', 'setLeftBrightness', in_sig='d')
@@ -145,7 +145,7 @@ def set_left_static(self, red, green, blue):
 
     # remember effect
     self.set_persistence("left", "effect", 'static')
-    self.zone["left"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["left"].colors[0:3] = int(red), int(green), int(blue)
 
     rgb_driver_path = self.get_driver_path('left_matrix_effect_static')
 
@@ -219,7 +219,7 @@ def set_left_reactive(self, red, green, blue, speed):
 
     # remember effect
     self.set_persistence("left", "effect", 'reactive')
-    self.zone["left"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["left"].colors[0:3] = int(red), int(green), int(blue)
 
     if speed not in (1, 2, 3, 4):
         speed = 4
@@ -274,7 +274,7 @@ def set_left_breath_single(self, red, green, blue):
 
     # remember effect
     self.set_persistence("left", "effect", 'breathSingle')
-    self.zone["left"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["left"].colors[0:3] = int(red), int(green), int(blue)
 
     driver_path = self.get_driver_path('left_matrix_effect_breath')
 
@@ -314,7 +314,7 @@ def set_left_breath_dual(self, red1, green1, blue1, red2, green2, blue2):
 
     # remember effect
     self.set_persistence("left", "effect", 'breathDual')
-    self.zone["left"]["colors"][0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
+    self.zone["left"].colors[0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
 
     driver_path = self.get_driver_path('left_matrix_effect_breath')
 
@@ -333,7 +333,7 @@ def get_right_brightness(self):
     """
     self.logger.debug("DBus call get_right_brightness")
 
-    return self.zone["right"]["brightness"]
+    return self.zone["right"].brightness
 
 
 @endpoint('razer.device.lighting.right', 'setRightBrightness', in_sig='d')
@@ -413,7 +413,7 @@ def set_right_static(self, red, green, blue):
 
     # remember effect
     self.set_persistence("right", "effect", 'static')
-    self.zone["right"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["right"].colors[0:3] = int(red), int(green), int(blue)
 
     rgb_driver_path = self.get_driver_path('right_matrix_effect_static')
 
@@ -487,7 +487,7 @@ def set_right_reactive(self, red, green, blue, speed):
 
     # remember effect
     self.set_persistence("right", "effect", 'reactive')
-    self.zone["right"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["right"].colors[0:3] = int(red), int(green), int(blue)
 
     if speed not in (1, 2, 3, 4):
         speed = 4
@@ -542,7 +542,7 @@ def set_right_breath_single(self, red, green, blue):
 
     # remember effect
     self.set_persistence("right", "effect", 'breathSingle')
-    self.zone["right"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["right"].colors[0:3] = int(red), int(green), int(blue)
 
     driver_path = self.get_driver_path('right_matrix_effect_breath')
 
@@ -582,7 +582,7 @@ def set_right_breath_dual(self, red1, green1, blue1, red2, green2, blue2):
 
     # remember effect
     self.set_persistence("right", "effect", 'breathDual')
-    self.zone["right"]["colors"][0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
+    self.zone["right"].colors[0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
 
     driver_path = self.get_driver_path('right_matrix_effect_breath')
 
@@ -639,7 +639,7 @@ def set_backlight_static(self, red, green, blue):
 
     # remember effect
     self.set_persistence("backlight", "effect", 'static')
-    self.zone["backlight"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["backlight"].colors[0:3] = int(red), int(green), int(blue)
 
     rgb_driver_path = self.get_driver_path('backlight_matrix_effect_static')
 
@@ -732,7 +732,7 @@ def set_backlight_reactive(self, red, green, blue, speed):
 
     # remember effect
     self.set_persistence("backlight", "effect", 'reactive')
-    self.zone["backlight"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["backlight"].colors[0:3] = int(red), int(green), int(blue)
 
     if speed not in (1, 2, 3, 4):
         speed = 4
@@ -787,7 +787,7 @@ def set_backlight_breath_single(self, red, green, blue):
 
     # remember effect
     self.set_persistence("backlight", "effect", 'breathSingle')
-    self.zone["backlight"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["backlight"].colors[0:3] = int(red), int(green), int(blue)
 
     driver_path = self.get_driver_path('backlight_matrix_effect_breath')
 
@@ -827,7 +827,7 @@ def set_backlight_breath_dual(self, red1, green1, blue1, red2, green2, blue2):
 
     # remember effect
     self.set_persistence("backlight", "effect", 'breathDual')
-    self.zone["backlight"]["colors"][0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
+    self.zone["backlight"].colors[0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
 
     driver_path = self.get_driver_path('backlight_matrix_effect_breath')
 
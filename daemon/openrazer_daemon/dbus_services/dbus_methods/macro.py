@@ -47,3 +47,63 @@ def add_macro(self, macro_bind_key, macro_json):
     self.logger.debug("DBus call add_macro")
 
     self.key_manager.dbus_add_macro(macro_bind_key, macro_json)
+
+
+@endpoint('razer.device.macro', 'getMacroPolicy', in_sig='s', out_sig='s')
+def get_macro_policy(self, macro_key):
+    """
+    Get what happens when the bind key is pressed while its macro is still playing
+
+    :param macro_key: Macro bind key
+    :type macro_key: str
+
+    :return: Policy, queue, restart or ignore
+    :rtype: str
+    """
+    self.logger.debug("DBus call get_macro_policy")
+
+    return self.key_manager.dbus_get_macro_policy(macro_key)
+
+
+@endpoint('razer.device.macro', 'setMacroPolicy', in_sig='ss')
+def set_macro_policy(self, macro_key, policy):
+    """
+    Set what happens when the bind key is pressed while its macro is still playing
+
+    With queue the macro is played again after the previous one, with restart the previous one is cancelled and
+    with ignore the press is ignored.
+
+    :param macro_key: Macro bind key
+    :type macro_key: str
+
+    :param policy: Policy, queue, restart or ignore
+    :type policy: str
+    """
+    self.logger.debug("DBus call set_macro_policy")
+
+    self.key_manager.dbus_set_macro_policy(str(macro_key), str(policy))
+
+
+@endpoint('razer.device.input', 'subscribeKeyEvents', sender_keyword='sender')
+def subscribe_key_events(self, sender=None):
+    """
+    Start emitting the razer.device.input.KeyEvents signal
+
+    The signal carries batches of (timestamp, position, action) key events. The timestamp is in nanoseconds, the
+    position has the matrix row in the high byte and the column in the low byte, and the action is 0 for release,
+    1 for press and 2 for autorepeat. It is emitted until every subscribed client has called unsubscribeKeyEvents
+    or disconnected from the bus.
+    """
+    self.logger.debug("DBus call subscribe_key_events")
+
+    self.add_key_event_subscriber(sender)
+
+
+@endpoint('razer.device.input', 'unsubscribeKeyEvents', sender_keyword='sender')
+def unsubscribe_key_events(self, sender=None):
+    """
+    Stop emitting the razer.device.input.KeyEvents signal for the calling client
+    """
+    self.logger.debug("DBus call unsubscribe_key_events")
+
+    self.remove_key_event_subscriber(sender)
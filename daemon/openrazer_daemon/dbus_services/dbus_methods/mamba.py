@@ -164,7 +164,7 @@ def set_dpi_xy(self, dpi_x, dpi_y):
     """
     self.logger.debug("DBus call set_dpi_xy")
 
-    if 'available_dpi' in self.METHODS:
+    if 'available_dpi' in self.METHOD_NAMES:
         if dpi_y > 0:
             raise RuntimeError("Devices with available_dpi are expected to have only one DPI value set, got " + str(dpi_x) + ", " + str(dpi_y))
         if dpi_x not in self.AVAILABLE_DPI:
@@ -225,7 +225,7 @@ def get_dpi_xy(self):
     except FileNotFoundError:
         return self.dpi
 
-    if 'available_dpi' in self.METHODS:
+    if 'available_dpi' in self.METHOD_NAMES:
         if len(dpi) != 1:
             raise RuntimeError("Devices with available_dpi are expected to have only one DPI value returned from driver, got " + str(dpi))
         dpi = dpi[0], 0
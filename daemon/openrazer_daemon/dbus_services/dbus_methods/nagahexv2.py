@@ -24,7 +24,7 @@ def set_logo_static(self, red, green, blue):
 
     # remember effect
     self.set_persistence("logo", "effect", 'static')
-    self.zone["logo"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["logo"].colors[0:3] = int(red), int(green), int(blue)
 
     rgb_driver_path = self.get_driver_path('logo_matrix_effect_static')
 
@@ -117,7 +117,7 @@ def set_logo_reactive(self, red, green, blue, speed):
 
     # remember effect
     self.set_persistence("logo", "effect", 'reactive')
-    self.zone["logo"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["logo"].colors[0:3] = int(red), int(green), int(blue)
     self.set_persistence("logo", "speed", int(speed))
 
     if speed not in (1, 2, 3, 4):
@@ -190,7 +190,7 @@ def set_logo_breath_single(self, red, green, blue):
 
     # remember effect
     self.set_persistence("logo", "effect", 'breathSingle')
-    self.zone["logo"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["logo"].colors[0:3] = int(red), int(green), int(blue)
 
     driver_path = self.get_driver_path('logo_matrix_effect_breath')
 
@@ -230,7 +230,7 @@ def set_logo_breath_dual(self, red1, green1, blue1, red2, green2, blue2):
 
     # remember effect
     self.set_persistence("logo", "effect", 'breathDual')
-    self.zone["logo"]["colors"][0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
+    self.zone["logo"].colors[0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
 
     driver_path = self.get_driver_path('logo_matrix_effect_breath')
 
@@ -261,7 +261,7 @@ def set_logo_blinking(self, red, green, blue):
 
     # remember effect
     self.set_persistence("logo", "effect", 'blinking')
-    self.zone["logo"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["logo"].colors[0:3] = int(red), int(green), int(blue)
 
     rgb_driver_path = self.get_driver_path('logo_matrix_effect_blinking')
 
@@ -292,7 +292,7 @@ def set_scroll_static(self, red, green, blue):
 
     # remember effect
     self.set_persistence("scroll", "effect", 'static')
-    self.zone["scroll"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["scroll"].colors[0:3] = int(red), int(green), int(blue)
 
     rgb_driver_path = self.get_driver_path('scroll_matrix_effect_static')
 
@@ -382,7 +382,7 @@ def set_scroll_reactive(self, red, green, blue, speed):
 
     # remember effect
     self.set_persistence("scroll", "effect", 'reactive')
-    self.zone["scroll"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["scroll"].colors[0:3] = int(red), int(green), int(blue)
     self.set_persistence("scroll", "speed", int(speed))
 
     if speed not in (1, 2, 3, 4):
@@ -455,7 +455,7 @@ def set_scroll_breath_single(self, red, green, blue):
 
     # remember effect
     self.set_persistence("scroll", "effect", 'breathSingle')
-    self.zone["scroll"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["scroll"].colors[0:3] = int(red), int(green), int(blue)
 
     driver_path = self.get_driver_path('scroll_matrix_effect_breath')
 
@@ -495,7 +495,7 @@ def set_scroll_breath_dual(self, red1, green1, blue1, red2, green2, blue2):
 
     # remember effect
     self.set_persistence("scroll", "effect", 'breathDual')
-    self.zone["scroll"]["colors"][0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
+    self.zone["scroll"].colors[0:6] = int(red1), int(green1), int(blue1), int(red2), int(green2), int(blue2)
 
     driver_path = self.get_driver_path('scroll_matrix_effect_breath')
 
@@ -526,7 +526,7 @@ def set_scroll_blinking(self, red, green, blue):
 
     # remember effect
     self.set_persistence("scroll", "effect", 'blinking')
-    self.zone["scroll"]["colors"][0:3] = int(red), int(green), int(blue)
+    self.zone["scroll"].colors[0:3] = int(red), int(green), int(blue)
 
     rgb_driver_path = self.get_driver_path('scroll_matrix_effect_blinking')
 
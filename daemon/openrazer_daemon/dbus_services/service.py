@@ -7,6 +7,7 @@ Service Object for DBus
 # Disable some pylint stuff
 # pylint: disable=no-member
 
+import functools
 import types
 import dbus
 import dbus.service
@@ -31,6 +32,30 @@ def copy_func(function_reference, name=None):
         return types.FunctionType(function_reference.__code__, function_reference.__globals__, name or function_reference.func_name, function_reference.__defaults__, function_reference.__closure__)
 
 
+def hold_lock(function):
+    """
+    Wrap a DBus method so its calls hold the lock of the object
+
+    :param function: Function
+    :type function: func
+
+    :return: Wrapped function, with the signature of the function for DBus
+    :rtype: func
+    """
+    @functools.wraps(function)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            return function(self, *args, **kwargs)
+
+    return locked
+
+
+def _signal(self, value):
+    """
+    Body of the signals added with DBusService.add_dbus_signal, the value is sent by dbus-python
+    """
+
+
 class DBusService(dbus.service.Object):
     """
     DBus Service object
@@ -38,6 +63,8 @@ class DBusService(dbus.service.Object):
     Allows for dynamic method adding
     """
     BUS_NAME = 'org.razer'
+    # If the calls of the DBus methods hold self.lock
+    LOCK_METHODS = False
 
     def __init__(self, object_path):
         """
@@ -56,7 +83,7 @@ class DBusService(dbus.service.Object):
 
         self.add_to_connection(bus, object_path)
 
-    def add_dbus_method(self, interface_name, function_name, function, in_signature=None, out_signature=None, byte_arrays=False):
+    def add_dbus_method(self, interface_name, function_name, function, in_signature=None, out_signature=None, byte_arrays=False, sender_keyword=None):
         """
         Add method to DBus Object
 
@@ -77,6 +104,9 @@ class DBusService(dbus.service.Object):
 
         :param byte_arrays: Is byte array
         :type byte_arrays: bool
+
+        :param sender_keyword: Keyword argument the unique bus name of the caller is passed as
+        :type sender_keyword: str or None
         """
 
         # Get class key for use in the DBus introspection table
@@ -84,7 +114,9 @@ class DBusService(dbus.service.Object):
 
         # Create a copy of the function so that if its used multiple times it won't affect other instances if the names changed
         function_deepcopy = copy_func(function, function_name)
-        func = dbus.service.method(interface_name, in_signature=in_signature, out_signature=out_signature, byte_arrays=byte_arrays)(function_deepcopy)
+        if self.LOCK_METHODS:
+            function_deepcopy = hold_lock(function_deepcopy)
+        func = dbus.service.method(interface_name, in_signature=in_signature, out_signature=out_signature, byte_arrays=byte_arrays, sender_keyword=sender_keyword)(function_deepcopy)
 
         # Add method to DBus tables
         try:
@@ -95,6 +127,36 @@ class DBusService(dbus.service.Object):
         # Add method to class as DBus expects it to be there.
         setattr(self.__class__, function_name, func)
 
+    def add_dbus_signal(self, interface_name, signal_name, signature):
+        """
+        Add signal with a single argument to DBus Object
+
+        The signal is emitted by calling the method of the same name on the object
+
+        :param interface_name: DBus interface name
+        :type interface_name: str
+
+        :param signal_name: DBus signal name
+        :type signal_name: str
+
+        :param signature: DBus signal signature
+        :type signature: str
+        """
+
+        # Get class key for use in the DBus introspection table
+        class_key = [key for key in self._dbus_class_table.keys() if key.endswith(self.__class__.__name__)][0]
+
+        func = dbus.service.signal(interface_name, signature=signature)(copy_func(_signal, signal_name))
+
+        # Add signal to DBus tables
+        try:
+            self._dbus_class_table[class_key][interface_name][signal_name] = func
+        except KeyError:
+            self._dbus_class_table[class_key][interface_name] = {signal_name: func}
+
+        # Add signal to class so it can be emitted
+        setattr(self.__class__, signal_name, func)
+
     def del_dbus_method(self, interface_name, function_name):
         """
         Remove method from DBus Object
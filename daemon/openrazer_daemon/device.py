@@ -3,6 +3,99 @@
 """
 Class to hold a device and collections of them
 """
+import logging
+import queue
+import threading
+import time
+
+
+class DeviceWorker(threading.Thread):
+    """
+    Thread passing the messages of other devices to one device
+
+    Messages are applied in the order they were sent. The queue is bounded, when it is full the oldest message
+    is dropped as newer effects replace it anyway.
+
+    :param device: Device
+    :type device: Device
+    """
+
+    # Number of messages which can be waiting
+    QUEUE_SIZE = 16
+
+    def __init__(self, device):
+        super().__init__(name='DeviceWorker-{0}'.format(device.serial), daemon=True)
+
+        self._logger = logging.getLogger('razer.device_worker')
+        self._device = device
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._shutdown = False
+
+    def post(self, msg):
+        """
+        Queue a message for the device
+
+        :param msg: Tuple with first element a string
+        :type msg: tuple
+        """
+        item = (msg, time.monotonic_ns())
+
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+
+            try:
+                dropped, _ = self._queue.get_nowait()
+                self._logger.warning("Too many messages queued for %s, dropping %s", self._device.serial, dropped[:3])
+            except queue.Empty:
+                pass
+
+    def stop(self, timeout=1):
+        """
+        Stop the thread after the message it is passing on
+
+        :param timeout: Seconds to wait for the thread
+        :type timeout: float
+
+        :return: False if the thread didn't stop in time
+        :rtype: bool
+        """
+        self._shutdown = True
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            # The thread is busy and sees the flag once it takes the next message
+            pass
+
+        if self.is_alive() and self is not threading.current_thread():
+            self.join(timeout=timeout)
+        return not self.is_alive()
+
+    def run(self):
+        """
+        Main thread function
+        """
+        while True:
+            item = self._queue.get()
+            if item is None or self._shutdown:
+                break
+
+            msg, sent_ns = item
+            start_ns = time.monotonic_ns()
+            try:
+                # The device's DBus methods hold the lock too, so the calls to one device don't interleave
+                with self._device.lock:
+                    self._device.notify_child(msg)
+            except Exception as err:
+                self._logger.exception("Could not pass %s to %s", msg[:3], self._device.serial, exc_info=err)
+                continue
+
+            end_ns = time.monotonic_ns()
+            self._logger.debug("Passed %s to %s in %.1f ms, %.1f ms after it was sent", msg[2] if len(msg) > 2 else msg[0],
+                               self._device.serial, (end_ns - start_ns) / 1000000, (end_ns - sent_ns) / 1000000)
 
 
 class Device(object):
@@ -19,6 +112,11 @@ class Device(object):
         # Register as parent
         self._dbus.register_parent(self)
 
+        # Thread passing on the messages of other devices, if they are passed on asynchronously
+        self._worker = None
+        # Group of devices the effects are synced with
+        self.sync_group = ''
+
     @property
     def device_id(self):
         """
@@ -39,6 +137,16 @@ class Device(object):
         """
         return self._serial
 
+    @property
+    def lock(self):
+        """
+        Lock held while the device is changed
+
+        :return: Lock of the DBus object
+        :rtype: threading.RLock
+        """
+        return self._dbus.lock
+
     @property
     def dbus(self):
         """
@@ -77,19 +185,48 @@ class Device(object):
         # Message from DBus object
         self._dbus.notify(msg)
 
+    def post_child(self, msg):
+        """
+        Pass a message on from the worker thread of the device, starting it if needed
+
+        :param msg: Tuple with first element a string
+        :type msg: tuple
+        """
+        if self._worker is None:
+            self._worker = DeviceWorker(self)
+            self._worker.start()
+
+        self._worker.post(msg)
+
+    def stop_worker(self):
+        """
+        Stop the worker thread of the device
+        """
+        if self._worker is not None:
+            if not self._worker.stop():
+                logging.getLogger('razer.device_worker').error("Could not stop the worker thread of %s", self._serial)
+            self._worker = None
+
 
 class DeviceCollection(object):
     """
     Multimap of devices
 
     Can be referenced by either ID or serial
+
+    :param async_notify: Pass messages between devices on a worker thread of each device, so the device sending
+                         one doesn't wait for the others
+    :type async_notify: bool
     """
 
-    def __init__(self):
+    def __init__(self, async_notify=False):
         self._id_map = {}
         self._serial_map = {}
+        self._async_notify = async_notify
+        # Device to the other devices in its sync group, rebuilt when devices or groups change
+        self._sync_targets = {}
 
-    def add(self, device_id, device_serial, device_dbus):
+    def add(self, device_id, device_serial, device_dbus, sync_group=''):
         """
         Add device to collection
 
@@ -101,12 +238,42 @@ class DeviceCollection(object):
 
         :param device_dbus: Device's DBus object
         :type device_dbus: openrazer_daemon.hardware.device_base.__RazerDevice
+
+        :param sync_group: Group of devices the effects are synced with
+        :type sync_group: str
         """
         device_object = Device(device_id, device_serial, device_dbus)
         device_object.register_parent(self)
+        device_object.sync_group = sync_group
 
         self._id_map[device_id] = device_object
         self._serial_map[device_serial] = device_object
+        self._update_sync_targets()
+
+    def set_sync_group(self, key, sync_group):
+        """
+        Set the group of devices a device syncs effects with
+
+        :param key: ID or serial
+        :type key: str
+
+        :param sync_group: Group name
+        :type sync_group: str
+
+        :raises IndexError: If key not found
+        """
+        self.__getitem__(key).sync_group = sync_group
+        self._update_sync_targets()
+
+    def _update_sync_targets(self):
+        """
+        Work out which devices each device passes its messages to
+        """
+        groups = {}
+        for device in self._id_map.values():
+            groups.setdefault(device.sync_group, []).append(device)
+
+        self._sync_targets = {device: tuple(other for other in groups[device.sync_group] if other is not device) for device in self._id_map.values()}
 
     def remove(self, key):
         """
@@ -194,13 +361,17 @@ class DeviceCollection(object):
         :type key: str
         """
         if key in self._id_map:
-            serial = self._id_map[key].serial
+            device = self._id_map[key]
             self._id_map.pop(key, None)
-            self._serial_map.pop(serial, None)
+            self._serial_map.pop(device.serial, None)
+            device.stop_worker()
+            self._update_sync_targets()
         elif key in self._serial_map:
-            device_id = self._serial_map[key].device_id
-            self._id_map.pop(device_id, None)
+            device = self._serial_map[key]
+            self._id_map.pop(device.device_id, None)
             self._serial_map.pop(key, None)
+            device.stop_worker()
+            self._update_sync_targets()
 
     def __contains__(self, item):
         """
@@ -235,7 +406,7 @@ class DeviceCollection(object):
 
     def notify(self, active_child, msg):
         """
-        Send messages between children
+        Send messages between the children in the same sync group
 
         :param active_child: Child sending the message
         :type active_child: Device
@@ -243,6 +414,8 @@ class DeviceCollection(object):
         :param msg: Messgae
         :type msg: tuple
         """
-        for child in self._id_map.values():
-            if child is not active_child:
+        for child in self._sync_targets.get(active_child, ()):
+            if self._async_notify:
+                child.post_child(msg)
+            else:
                 child.notify_child(msg)
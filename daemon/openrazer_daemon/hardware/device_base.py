@@ -12,11 +12,80 @@ import logging
 import time
 import json
 import random
+import operator
+import threading
 
 from openrazer_daemon.dbus_services.service import DBusService
 import openrazer_daemon.dbus_services.dbus_methods
 from openrazer_daemon.misc import effect_sync
 from openrazer_daemon.misc.battery_notifier import BatteryManager as _BatteryManager
+from openrazer_daemon.misc.zone_state import ZoneState, ZoneStates
+
+
+def _get_endpoints():
+    """
+    Get the DBus method functions which can be in METHODS
+
+    :return: Dictionary of function names to functions
+    :rtype: dict
+    """
+    available_functions = {}
+    for method in dir(openrazer_daemon.dbus_services.dbus_methods):
+        potential_function = getattr(openrazer_daemon.dbus_services.dbus_methods, method)
+        if isinstance(potential_function, types.FunctionType) and hasattr(potential_function, 'endpoint') and potential_function.endpoint:
+            available_functions[potential_function.__name__] = potential_function
+
+    return available_functions
+
+
+ENDPOINTS = _get_endpoints()
+
+# Device settings stored in the persistence file: method the setting needs, option and attribute name, type and description
+PERSISTENCE_OPTIONS = (
+    ('set_poll_rate', 'poll_rate', int, "poll rate"),
+    ('set_fan_speed', 'fan_speed', int, "fan speed"),
+    ('set_power_mode', 'power_mode', str, "power mode"),
+    ('set_cpu_boost', 'cpu_boost', str, "cpu boost"),
+    ('set_gpu_boost', 'gpu_boost', str, "gpu boost"),
+    ('set_bho', 'bho', int, "battery health optimizer"),
+)
+
+_COLOURS_1 = operator.itemgetter(0, 1, 2)
+_COLOURS_2 = operator.itemgetter(0, 1, 2, 3, 4, 5)
+_COLOURS_3 = operator.itemgetter(0, 1, 2, 3, 4, 5, 6, 7, 8)
+
+
+# Functions building the arguments of the effect setters from the state of a zone
+def _restore_args_none(zone):
+    return ()
+
+
+def _restore_args_speed(zone):
+    return (zone.speed,)
+
+
+def _restore_args_wave_dir(zone):
+    return (zone.wave_dir,)
+
+
+def _restore_args_rgb(zone):
+    return _COLOURS_1(zone.colors)
+
+
+def _restore_args_rgb_speed(zone):
+    return _COLOURS_1(zone.colors) + (zone.speed,)
+
+
+def _restore_args_rgb2(zone):
+    return _COLOURS_2(zone.colors)
+
+
+def _restore_args_rgb2_speed(zone):
+    return _COLOURS_2(zone.colors) + (zone.speed,)
+
+
+def _restore_args_rgb3(zone):
+    return _COLOURS_3(zone.colors)
 
 
 # pylint: disable=too-many-instance-attributes
@@ -30,6 +99,7 @@ class RazerDevice(DBusService):
     """
     OBJECT_PATH = '/org/razer/device/'
     METHODS = []
+    LOCK_METHODS = True
 
     EVENT_FILE_REGEX = None
 
@@ -47,7 +117,72 @@ class RazerDevice(DBusService):
 
     DEVICE_IMAGE = None
 
+    # Derived from METHODS when a device class is created, see __init_subclass__()
+    METHOD_NAMES = frozenset()
+    EFFECT_METHOD_GROUPS = ()
+    PRESENT_ZONES = ()
+    ZONE_SETTERS = {}
+    HAS_DPI = False
+    PERSISTENCE_SCHEMA = ()
+
+    # Restore plans of every class, see _get_brightness_plan() and _get_effect_plan()
+    _restore_plans = {}
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Derive the capabilities of a device class from its METHODS
+
+        This is done once per class so the devices don't search the METHODS list.
+
+        :raises RuntimeError: If METHODS has a method which isn't a DBus method
+        """
+        super().__init_subclass__(**kwargs)
+
+        unknown_methods = [method_name for method_name in cls.METHODS if method_name not in ENDPOINTS]
+        if unknown_methods:
+            raise RuntimeError("{0} has unknown methods: {1}".format(cls.__name__, ', '.join(unknown_methods)))
+
+        methods = frozenset(cls.METHODS)
+        cls.METHOD_NAMES = methods
+
+        # this check is separate from the rest because backlight effects don't have prefixes in their names
+        effect_method_groups = []
+        has_backlight_chroma = 'set_static_effect' in methods or 'bw_set_static' in methods
+        if has_backlight_chroma:
+            effect_method_groups.append("backlight_chroma")
+
+        present_zones = []
+        zone_setters = {}
+        for i in cls.ZONES:
+            if 'set_' + i + '_static_classic' in methods or 'set_' + i + '_static' in methods \
+                    or 'set_' + i + '_active' in methods or 'set_' + i + '_on' in methods:
+                effect_method_groups.append(i)
+                present_zones.append(i)
+            elif i == "backlight" and has_backlight_chroma:
+                present_zones.append(i)
+
+            active_func_name = None
+            if 'set_' + i + '_active' in methods:
+                active_func_name = "set" + cls.capitalize_first_char(i) + "Active"
+
+            bright_func_name = None
+            if i == "backlight":
+                bright_func_name = "setBrightness"
+            elif 'set_' + i + '_brightness' in methods:
+                bright_func_name = "set" + cls.capitalize_first_char(i) + "Brightness"
+
+            zone_setters[i] = (active_func_name, bright_func_name)
+
+        cls.EFFECT_METHOD_GROUPS = tuple(effect_method_groups)
+        cls.PRESENT_ZONES = tuple(present_zones)
+        cls.ZONE_SETTERS = zone_setters
+        cls.HAS_DPI = 'set_dpi_xy' in methods or 'set_dpi_xy_byte' in methods
+        cls.PERSISTENCE_SCHEMA = tuple(option[1:] for option in PERSISTENCE_OPTIONS if option[0] in methods)
+
     def __init__(self, device_path, device_number, config, persistence, testing, additional_interfaces, additional_methods):
+        # Held by the DBus methods and while the effects of other devices are synced, so the device is changed
+        # by one thread at a time
+        self.lock = threading.RLock()
 
         self.logger = logging.getLogger('razer.device{0}'.format(device_number))
         self.logger.info("Initialising device.%d %s", device_number, self.__class__.__name__)
@@ -60,8 +195,9 @@ class RazerDevice(DBusService):
 
         self._observer_list = []
         self._effect_sync_propagate_up = False
-        self._disable_notifications = False
-        self._disable_persistence = False
+        # Per thread, so syncing an effect on another thread doesn't hide the changes made over DBus
+        self._disable_notifications = threading.local()
+        self._disable_persistence = threading.local()
         self.additional_interfaces = []
         if additional_interfaces is not None:
             self.additional_interfaces.extend(additional_interfaces)
@@ -88,27 +224,20 @@ class RazerDevice(DBusService):
         else:
             self.storage_name = self.serial
 
-        self.zone = dict()
-
-        for i in self.ZONES:
-            self.zone[i] = {
-                "present": False,
-                "active": True,
-                "brightness": 75.0,
-                "effect": 'spectrum',
-                "colors": [0, 255, 0, 0, 255, 255, 0, 0, 255],
-                "speed": 1,
-                "wave_dir": 1,
-            }
+        # only the zones of the device are allocated
+        self.zone = ZoneStates()
+
+        for i in self.PRESENT_ZONES:
+            self.zone[i] = ZoneState(present=True)
 
         # Check for a DPI X only device since they need a Y value of 0
-        if 'available_dpi' in self.METHODS:
+        if 'available_dpi' in self.METHOD_NAMES:
             self.dpi = [1800, 0]
         else:
             self.dpi = [1800, 1800]
 
         self.poll_rate = 500
-        if 'set_poll_rate' in self.METHODS and not self.POLL_RATES:
+        if 'set_poll_rate' in self.METHOD_NAMES and not self.POLL_RATES:
             self.POLL_RATES = [125, 500, 1000]
 
         # auto fan speed
@@ -118,6 +247,8 @@ class RazerDevice(DBusService):
         self.cpu_boost = 'normal'
         self.gpu_boost = 'low'
         self.bho = 80
+        # Effects are only synced with the devices in the same group, '' is the group of all ungrouped devices
+        self.sync_group = ''
 
         self._effect_sync = effect_sync.EffectSync(self, device_number)
 
@@ -235,127 +366,39 @@ class RazerDevice(DBusService):
             self.logger.debug("Adding {}.{} method to DBus".format(m[0], m[1]))
             self.add_dbus_method(m[0], m[1], m[2], in_signature=m[3], out_signature=m[4])
 
-        # this check is separate from the rest because backlight effects don't have prefixes in their names
-        if 'set_static_effect' in self.METHODS or 'bw_set_static' in self.METHODS:
-            self.zone["backlight"]["present"] = True
-            for m in effect_methods["backlight_chroma"]:
+        for group in self.EFFECT_METHOD_GROUPS:
+            for m in effect_methods[group]:
                 self.logger.debug("Adding {}.{} method to DBus".format(m[0], m[1]))
                 self.add_dbus_method(m[0], m[1], m[2], in_signature=m[3], out_signature=m[4])
 
-        for i in self.ZONES:
-            if 'set_' + i + '_static_classic' in self.METHODS \
-                    or 'set_' + i + '_static' in self.METHODS \
-                    or 'set_' + i + '_active' in self.METHODS \
-                    or 'set_' + i + '_on' in self.METHODS:
-                self.zone[i]["present"] = True
-                for m in effect_methods[i]:
-                    self.logger.debug("Adding {}.{} method to DBus".format(m[0], m[1]))
-                    self.add_dbus_method(m[0], m[1], m[2], in_signature=m[3], out_signature=m[4])
-
         # Load additional DBus methods
         self.load_methods()
 
         # load last DPI/poll rate state
         if self.persistence.has_section(self.storage_name):
-            if 'set_dpi_xy' in self.METHODS or 'set_dpi_xy_byte' in self.METHODS:
+            if self.HAS_DPI:
                 try:
                     self.dpi[0] = int(self.persistence[self.storage_name]['dpi_x'])
                     self.dpi[1] = int(self.persistence[self.storage_name]['dpi_y'])
                 except (KeyError, configparser.NoOptionError):
                     self.logger.info("Failed to get DPI from persistence storage, using default.")
 
-            if 'set_poll_rate' in self.METHODS:
+            for option, option_type, description in self.PERSISTENCE_SCHEMA:
                 try:
-                    self.poll_rate = int(self.persistence[self.storage_name]['poll_rate'])
+                    setattr(self, option, option_type(self.persistence[self.storage_name][option]))
                 except (KeyError, configparser.NoOptionError):
-                    self.logger.info("Failed to get poll rate from persistence storage, using default.")
+                    self.logger.info("Failed to get %s from persistence storage, using default.", description)
 
-            if 'set_fan_speed' in self.METHODS:
-                try:
-                    self.fan_speed = int(self.persistence[self.storage_name]['fan_speed'])
-                except (KeyError, configparser.NoOptionError):
-                    self.logger.info("Failed to get fan speed from persistence storage, using default.")
-
-            if 'set_power_mode' in self.METHODS:
-                try:
-                    self.power_mode = self.persistence[self.storage_name]['power_mode']
-                except (KeyError, configparser.NoOptionError):
-                    self.logger.info("Failed to get power mode from persistence storage, using default.")
-
-            if 'set_cpu_boost' in self.METHODS:
-                try:
-                    self.cpu_boost = self.persistence[self.storage_name]['cpu_boost']
-                except (KeyError, configparser.NoOptionError):
-                    self.logger.info("Failed to get cpu boost from persistence storage, using default.")
-
-            if 'set_gpu_boost' in self.METHODS:
-                try:
-                    self.gpu_boost = self.persistence[self.storage_name]['gpu_boost']
-                except (KeyError, configparser.NoOptionError):
-                    self.logger.info("Failed to get gpu boost from persistence storage, using default.")
-
-            if 'set_bho' in self.METHODS:
-                try:
-                    self.bho = int(self.persistence[self.storage_name]['bho'])
-                except (KeyError, configparser.NoOptionError):
-                    self.logger.info("Failed to get battery health optimizer from persistence storage, using default.")
+            self.sync_group = self.persistence[self.storage_name].get('sync_group', '')
 
         # load last effects
-        for i in self.ZONES:
-            if self.zone[i]["present"]:
-                # check if we have the device in the persistence file
-                if self.persistence.has_section(self.storage_name):
-                    # try reading the effect name from the persistence
-                    try:
-                        self.zone[i]["effect"] = self.persistence[self.storage_name][i + '_effect']
-                    except (KeyError, configparser.NoOptionError):
-                        self.logger.info("Failed to get " + i + " effect from persistence storage, using default.")
-
-                    # zone active status
-                    try:
-                        self.zone[i]["active"] = self.persistence.getboolean(self.storage_name, i + '_active')
-                    except (KeyError, configparser.NoOptionError):
-                        self.logger.info("Failed to get " + i + " active from persistence storage, using default.")
-
-                    # brightness
-                    try:
-                        self.zone[i]["brightness"] = float(self.persistence[self.storage_name][i + '_brightness'])
-                    except (KeyError, configparser.NoOptionError):
-                        self.logger.info("Failed to get " + i + " brightness from persistence storage, using default.")
-
-                    # colors.
-                    # these are stored as a string that must contain 9 numbers, separated with spaces.
-                    try:
-                        for index, item in enumerate(self.persistence[self.storage_name][i + '_colors'].split(" ")):
-                            self.zone[i]["colors"][index] = int(item)
-                            # check if the color is in range
-                            if not 0 <= self.zone[i]["colors"][index] <= 255:
-                                raise ValueError('Color out of range')
-
-                        # check if we have exactly 9 colors
-                        if len(self.zone[i]["colors"]) != 9:
-                            raise ValueError('There must be exactly 9 colors')
-                    except ValueError:
-                        # invalid colors. reinitialize
-                        self.zone[i]["colors"] = [0, 255, 0, 0, 255, 255, 0, 0, 255]
-                        self.logger.info("%s: Invalid colors; restoring to defaults.", self.__class__.__name__)
-                    except (KeyError, configparser.NoOptionError):
-                        self.logger.info("Failed to get " + i + " colors from persistence storage, using default.")
-
-                    # speed
-                    try:
-                        self.zone[i]["speed"] = int(self.persistence[self.storage_name][i + '_speed'])
-                    except (KeyError, configparser.NoOptionError):
-                        self.logger.info("Failed to get " + i + " speed from persistence storage, using default.")
-
-                    # wave direction
-                    try:
-                        self.zone[i]["wave_dir"] = int(self.persistence[self.storage_name][i + '_wave_dir'])
-                    except (KeyError, configparser.NoOptionError):
-                        self.logger.info("Failed to get " + i + " wave direction from persistence storage, using default.")
+        # check if we have the device in the persistence file
+        if self.persistence.has_section(self.storage_name):
+            for i in self.PRESENT_ZONES:
+                self.zone[i].read_persistence(self.persistence, self.storage_name, i, self.logger)
 
         # Initialize battery manager if the device has support
-        if 'get_battery' in self.METHODS:
+        if 'get_battery' in self.METHOD_NAMES:
             self._init_battery_manager()
 
         self.restore_dpi_poll_rate()
@@ -435,51 +478,148 @@ class RazerDevice(DBusService):
 
             poll_rate_func(self.poll_rate)
 
+    def _get_brightness_plan(self):
+        """
+        Get the setters restoring the active state and brightness of the zones
+
+        Built once per class as the setters only depend on its methods.
+
+        :return: Tuple of the present zones with their active state setter and brightness setter, None if there is none
+        :rtype: tuple
+        """
+        plans = self._restore_plans.setdefault(type(self), {})
+        try:
+            return plans[None]
+        except KeyError:
+            pass
+
+        plan = []
+        for i in self.PRESENT_ZONES:
+            active_func_name, bright_func_name = self.ZONE_SETTERS[i]
+            active_func = None
+            if active_func_name is not None:
+                active_func = getattr(type(self), active_func_name, None)
+
+            bright_func = None
+            if bright_func_name is not None:
+                bright_func = getattr(type(self), bright_func_name, None)
+
+            if active_func is not None or bright_func is not None:
+                plan.append((i, active_func, bright_func))
+
+        plans[None] = tuple(plan)
+        return plans[None]
+
     def restore_brightness(self):
         """
         Set the device to the current brightness/active state.
 
         This is used at launch time.
         """
-        for i in self.ZONES:
-            if self.zone[i]["present"]:
-                # load active state
-                if 'set_' + i + '_active' in self.METHODS:
-                    active_func = getattr(self, "set" + self.capitalize_first_char(i) + "Active", None)
-                    if active_func is not None:
-                        active_func(self.zone[i]["active"])
-
-                # load brightness level
-                bright_func = None
-                if i == "backlight":
-                    bright_func = getattr(self, "setBrightness", None)
-                elif 'set_' + i + '_brightness' in self.METHODS:
-                    bright_func = getattr(self, "set" + self.capitalize_first_char(i) + "Brightness", None)
-
-                if bright_func is not None:
-                    bright_func(self.zone[i]["brightness"])
+        for i, active_func, bright_func in self._get_brightness_plan():
+            if active_func is not None:
+                active_func(self, self.zone[i].active)
+            if bright_func is not None:
+                bright_func(self, self.zone[i].brightness)
 
     def disable_brightness(self):
         """
         Set brightness to 0 and/or active state to false.
         """
-        for i in self.ZONES:
-            if self.zone[i]["present"]:
-                # set active state
-                if 'set_' + i + '_active' in self.METHODS:
-                    active_func = getattr(self, "set" + self.capitalize_first_char(i) + "Active", None)
-                    if active_func is not None:
-                        active_func(False)
+        for i, active_func, bright_func in self._get_brightness_plan():
+            if active_func is not None:
+                active_func(self, False)
+            if bright_func is not None:
+                bright_func(self, 0)
 
-                # set brightness level
-                bright_func = None
-                if i == "backlight":
-                    bright_func = getattr(self, "setBrightness", None)
-                elif 'set_' + i + '_brightness' in self.METHODS:
-                    bright_func = getattr(self, "set" + self.capitalize_first_char(i) + "Brightness", None)
+    def _get_effect_plan(self, zone, effect):
+        """
+        Get how to restore an effect of a zone
 
-                if bright_func is not None:
-                    bright_func(0)
+        Built once per class and effect as the setter and its arguments only depend on the methods of the class.
+
+        :param zone: Zone
+        :type zone: str
+
+        :param effect: Effect name
+        :type effect: str
+
+        :return: Tuple of the effect setter, the function building its arguments from the zone state or None if it isn't called,
+                 the name of the missing setter if the effect falls back to spectrum and the error to log if the arguments are unknown
+        :rtype: tuple
+        """
+        plans = self._restore_plans.setdefault(type(self), {})
+        key = (zone, effect)
+        try:
+            return plans[key]
+        except KeyError:
+            pass
+
+        effect_func = None
+        build_args = None
+        invalid_func_name = None
+        error = None
+
+        # prepare the effect method name
+        # yes, we need to handle the backlight zone separately too.
+        # the backlight effect methods don't have a prefix.
+        if zone == "backlight" and effect.startswith('software') and hasattr(self, 'setSoftwareEffect'):
+            # do nothing. this is handled in the effect manager.
+            plans[key] = (effect_func, build_args, invalid_func_name, error)
+            return plans[key]
+
+        if zone == "backlight":
+            effect_func_name = 'set' + self.capitalize_first_char(effect)
+        else:
+            effect_func_name = 'set' + self.handle_underscores(self.capitalize_first_char(zone)) + self.capitalize_first_char(effect)
+
+        # check if the effect method exists only if we didn't look for spectrum (because resetting to Spectrum when the effect is Spectrum is in vain)
+        if getattr(self, effect_func_name, None) is None and not effect == "spectrum":
+            # not found. restoring to Spectrum
+            invalid_func_name = effect_func_name
+            effect = 'spectrum'
+            if zone == "backlight":
+                effect_func_name = 'setSpectrum'
+            else:
+                effect_func_name = 'set' + self.capitalize_first_char(zone) + 'Spectrum'
+
+        # we check again here because there is a possibility the device may not even have Spectrum
+        bound_func = getattr(self, effect_func_name, None)
+        if bound_func is not None:
+            effect_func = getattr(type(self), effect_func_name)
+            num_arguments = self.get_num_arguments(bound_func)
+            if num_arguments == 0:
+                build_args = _restore_args_none
+            elif num_arguments == 1:
+                # there are 2 effects which require 1 argument.
+                # these are: Starlight (Random) and Wave.
+                if effect == 'starlightRandom':
+                    build_args = _restore_args_speed
+                elif effect in ('wave', 'wheel'):
+                    build_args = _restore_args_wave_dir
+                elif effect != 'rippleRandomColour':
+                    # rippleRandomColour is handled in the ripple manager.
+                    error = "%s: Effect requires 1 argument but don't know how to handle it!"
+            elif num_arguments == 3:
+                build_args = _restore_args_rgb
+            elif num_arguments == 4:
+                # starlight/reactive have different arguments.
+                if effect in ('starlightSingle', 'reactive'):
+                    build_args = _restore_args_rgb_speed
+                elif effect != 'ripple':
+                    # ripple is handled in the ripple manager.
+                    error = "%s: Effect requires 4 arguments but don't know how to handle it!"
+            elif num_arguments == 6:
+                build_args = _restore_args_rgb2
+            elif num_arguments == 7:
+                build_args = _restore_args_rgb2_speed
+            elif num_arguments == 9:
+                build_args = _restore_args_rgb3
+            else:
+                error = "%s: Couldn't detect effect argument count!"
+
+        plans[key] = (effect_func, build_args, invalid_func_name, error)
+        return plans[key]
 
     def restore_effect(self):
         """
@@ -488,71 +628,18 @@ class RazerDevice(DBusService):
         This is used at launch time and can be called by applications
         that use custom matrix frames after they exit
         """
-        for i in self.ZONES:
-            if self.zone[i]["present"]:
-                # prepare the effect method name
-                # yes, we need to handle the backlight zone separately too.
-                # the backlight effect methods don't have a prefix.
-                if i == "backlight":
-                    effect_func_name = 'set' + self.capitalize_first_char(self.zone[i]["effect"])
-                else:
-                    effect_func_name = 'set' + self.handle_underscores(self.capitalize_first_char(i)) + self.capitalize_first_char(self.zone[i]["effect"])
-
-                # find the effect method
-                effect_func = getattr(self, effect_func_name, None)
-
-                # check if the effect method exists only if we didn't look for spectrum (because resetting to Spectrum when the effect is Spectrum is in vain)
-                if effect_func == None and not self.zone[i]["effect"] == "spectrum":
-                    # not found. restoring to Spectrum
-                    self.logger.info("%s: Invalid effect name %s; restoring to Spectrum.", self.__class__.__name__, effect_func_name)
-                    self.zone[i]["effect"] = 'spectrum'
-                    if i == "backlight":
-                        effect_func_name = 'setSpectrum'
-                    else:
-                        effect_func_name = 'set' + self.capitalize_first_char(i) + 'Spectrum'
-                    effect_func = getattr(self, effect_func_name, None)
-
-                # we check again here because there is a possibility the device may not even have Spectrum
-                if effect_func is not None:
-                    effect = self.zone[i]["effect"]
-                    colors = self.zone[i]["colors"]
-                    speed = self.zone[i]["speed"]
-                    wave_dir = self.zone[i]["wave_dir"]
-                    if self.get_num_arguments(effect_func) == 0:
-                        effect_func()
-                    elif self.get_num_arguments(effect_func) == 1:
-                        # there are 2 effects which require 1 argument.
-                        # these are: Starlight (Random) and Wave.
-                        if effect == 'starlightRandom':
-                            effect_func(speed)
-                        elif effect == 'wave':
-                            effect_func(wave_dir)
-                        elif effect == 'wheel':
-                            effect_func(wave_dir)
-                        elif effect == 'rippleRandomColour':
-                            # do nothing. this is handled in the ripple manager.
-                            pass
-                        else:
-                            self.logger.error("%s: Effect requires 1 argument but don't know how to handle it!", self.__class__.__name__)
-                    elif self.get_num_arguments(effect_func) == 3:
-                        effect_func(colors[0], colors[1], colors[2])
-                    elif self.get_num_arguments(effect_func) == 4:
-                        # starlight/reactive have different arguments.
-                        if effect == 'starlightSingle' or effect == 'reactive':
-                            effect_func(colors[0], colors[1], colors[2], speed)
-                        elif effect == 'ripple':
-                            # do nothing. this is handled in the ripple manager.
-                            pass
-                        else:
-                            self.logger.error("%s: Effect requires 4 arguments but don't know how to handle it!", self.__class__.__name__)
-                    elif self.get_num_arguments(effect_func) == 6:
-                        effect_func(colors[0], colors[1], colors[2], colors[3], colors[4], colors[5])
-                    elif self.get_num_arguments(effect_func) == 7:
-                        effect_func(colors[0], colors[1], colors[2], colors[3], colors[4], colors[5], speed)
-                    elif self.get_num_arguments(effect_func) == 9:
-                        effect_func(colors[0], colors[1], colors[2], colors[3], colors[4], colors[5], colors[6], colors[7], colors[8])
-                    else:
-                        self.logger.error("%s: Couldn't detect effect argument count!", self.__class__.__name__)
+        for i in self.PRESENT_ZONES:
+            zone = self.zone[i]
+            effect_func, build_args, invalid_func_name, error = self._get_effect_plan(i, zone.effect)
+
+            if invalid_func_name is not None:
+                self.logger.info("%s: Invalid effect name %s; restoring to Spectrum.", self.__class__.__name__, invalid_func_name)
+                zone.effect = 'spectrum'
+
+            if build_args is not None:
+                effect_func(self, *build_args(zone))
+            elif error is not None:
+                self.logger.error(error, self.__class__.__name__)
 
     def set_persistence(self, zone, key, value):
         """
@@ -567,16 +654,15 @@ class RazerDevice(DBusService):
         :param value: Value
         :type value: string
         """
-        if self._disable_persistence:
+        if self.disable_persistence:
             return
         self.logger.debug("Set persistence (%s, %s, %s)", zone, key, value)
 
         self.persistence.status["changed"] = True
 
-        if zone:
-            self.zone[zone][key] = value
-        else:
-            self.zone[key] = value
+        # the other settings are attributes of the device, which the callers set
+        if zone and key in ZoneState.KEYS:
+            setattr(self.zone[zone], key, value)
 
     def get_current_effect(self):
         """
@@ -587,7 +673,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_effect")
 
-        return self.zone["backlight"]["effect"]
+        return self.zone["backlight"].effect
 
     def get_current_effect_colors(self):
         """
@@ -598,7 +684,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_effect_colors")
 
-        return self.zone["backlight"]["colors"]
+        return list(self.zone["backlight"].colors)
 
     def get_current_effect_speed(self):
         """
@@ -609,7 +695,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_effect_speed")
 
-        return self.zone["backlight"]["speed"]
+        return self.zone["backlight"].speed
 
     def get_current_wave_dir(self):
         """
@@ -620,7 +706,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_wave_dir")
 
-        return self.zone["backlight"]["wave_dir"]
+        return self.zone["backlight"].wave_dir
 
     def get_current_logo_effect(self):
         """
@@ -631,7 +717,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_logo_effect")
 
-        return self.zone["logo"]["effect"]
+        return self.zone["logo"].effect
 
     def get_current_logo_effect_colors(self):
         """
@@ -642,7 +728,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_logo_effect_colors")
 
-        return self.zone["logo"]["colors"]
+        return list(self.zone["logo"].colors)
 
     def get_current_logo_effect_speed(self):
         """
@@ -653,7 +739,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_logo_effect_speed")
 
-        return self.zone["logo"]["speed"]
+        return self.zone["logo"].speed
 
     def get_current_logo_wave_dir(self):
         """
@@ -664,7 +750,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_logo_wave_dir")
 
-        return self.zone["logo"]["wave_dir"]
+        return self.zone["logo"].wave_dir
 
     def get_current_scroll_effect(self):
         """
@@ -675,7 +761,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_scroll_effect")
 
-        return self.zone["scroll"]["effect"]
+        return self.zone["scroll"].effect
 
     def get_current_scroll_effect_colors(self):
         """
@@ -686,7 +772,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_scroll_effect_colors")
 
-        return self.zone["scroll"]["colors"]
+        return list(self.zone["scroll"].colors)
 
     def get_current_scroll_effect_speed(self):
         """
@@ -697,7 +783,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_scroll_effect_speed")
 
-        return self.zone["scroll"]["speed"]
+        return self.zone["scroll"].speed
 
     def get_current_scroll_wave_dir(self):
         """
@@ -708,7 +794,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_scroll_wave_dir")
 
-        return self.zone["scroll"]["wave_dir"]
+        return self.zone["scroll"].wave_dir
 
     def get_current_left_effect(self):
         """
@@ -719,7 +805,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_left_effect")
 
-        return self.zone["left"]["effect"]
+        return self.zone["left"].effect
 
     def get_current_left_effect_colors(self):
         """
@@ -730,7 +816,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_left_effect_colors")
 
-        return self.zone["left"]["colors"]
+        return list(self.zone["left"].colors)
 
     def get_current_left_effect_speed(self):
         """
@@ -741,7 +827,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_left_effect_speed")
 
-        return self.zone["left"]["speed"]
+        return self.zone["left"].speed
 
     def get_current_left_wave_dir(self):
         """
@@ -752,7 +838,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_left_wave_dir")
 
-        return self.zone["left"]["wave_dir"]
+        return self.zone["left"].wave_dir
 
     def get_current_right_effect(self):
         """
@@ -763,7 +849,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_right_effect")
 
-        return self.zone["right"]["effect"]
+        return self.zone["right"].effect
 
     def get_current_right_effect_colors(self):
         """
@@ -774,7 +860,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_right_effect_colors")
 
-        return self.zone["right"]["colors"]
+        return list(self.zone["right"].colors)
 
     def get_current_right_effect_speed(self):
         """
@@ -785,7 +871,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_right_effect_speed")
 
-        return self.zone["right"]["speed"]
+        return self.zone["right"].speed
 
     def get_current_right_wave_dir(self):
         """
@@ -796,7 +882,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_right_wave_dir")
 
-        return self.zone["right"]["wave_dir"]
+        return self.zone["right"].wave_dir
 
     def get_current_charging_effect(self):
         """
@@ -807,7 +893,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_charging_effect")
 
-        return self.zone["charging"]["effect"]
+        return self.zone["charging"].effect
 
     def get_current_charging_effect_colors(self):
         """
@@ -818,7 +904,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_charging_effect_colors")
 
-        return self.zone["charging"]["colors"]
+        return list(self.zone["charging"].colors)
 
     def get_current_charging_effect_speed(self):
         """
@@ -829,7 +915,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_charging_effect_speed")
 
-        return self.zone["charging"]["speed"]
+        return self.zone["charging"].speed
 
     def get_current_charging_wave_dir(self):
         """
@@ -840,7 +926,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_charging_wave_dir")
 
-        return self.zone["charging"]["wave_dir"]
+        return self.zone["charging"].wave_dir
 
     def get_current_fast_charging_effect(self):
         """
@@ -851,7 +937,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_fast_charging_effect")
 
-        return self.zone["fast_charging"]["effect"]
+        return self.zone["fast_charging"].effect
 
     def get_current_fast_charging_effect_colors(self):
         """
@@ -862,7 +948,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_fast_charging_effect_colors")
 
-        return self.zone["fast_charging"]["colors"]
+        return list(self.zone["fast_charging"].colors)
 
     def get_current_fast_charging_effect_speed(self):
         """
@@ -873,7 +959,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_fast_charging_effect_speed")
 
-        return self.zone["fast_charging"]["speed"]
+        return self.zone["fast_charging"].speed
 
     def get_current_fast_charging_wave_dir(self):
         """
@@ -884,7 +970,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_fast_charging_wave_dir")
 
-        return self.zone["fast_charging"]["wave_dir"]
+        return self.zone["fast_charging"].wave_dir
 
     def get_current_fully_charged_effect(self):
         """
@@ -895,7 +981,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_fully_charged_effect")
 
-        return self.zone["fully_charged"]["effect"]
+        return self.zone["fully_charged"].effect
 
     def get_current_fully_charged_effect_colors(self):
         """
@@ -906,7 +992,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_fully_charged_effect_colors")
 
-        return self.zone["fully_charged"]["colors"]
+        return list(self.zone["fully_charged"].colors)
 
     def get_current_fully_charged_effect_speed(self):
         """
@@ -917,7 +1003,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_fully_charged_effect_speed")
 
-        return self.zone["fully_charged"]["speed"]
+        return self.zone["fully_charged"].speed
 
     def get_current_fully_charged_wave_dir(self):
         """
@@ -928,7 +1014,7 @@ class RazerDevice(DBusService):
         """
         self.logger.debug("DBus call get_current_fully_charged_wave_dir")
 
-        return self.zone["fully_charged"]["wave_dir"]
+        return self.zone["fully_charged"].wave_dir
 
     @property
     def effect_sync(self):
@@ -953,42 +1039,42 @@ class RazerDevice(DBusService):
     @property
     def disable_notify(self):
         """
-        Disable notifications flag
+        Disable notifications flag of the calling thread
 
         :return: Flag
         :rtype: bool
         """
-        return self._disable_notifications
+        return getattr(self._disable_notifications, 'value', False)
 
     @disable_notify.setter
     def disable_notify(self, value):
         """
-        Set the disable notifications flag
+        Set the disable notifications flag of the calling thread
 
         :param value: Disable
         :type value: bool
         """
-        self._disable_notifications = value
+        self._disable_notifications.value = value
 
     @property
     def disable_persistence(self):
         """
-        Disable persistence flag
+        Disable persistence flag of the calling thread
 
         :return: Flag
         :rtype: bool
         """
-        return self._disable_persistence
+        return getattr(self._disable_persistence, 'value', False)
 
     @disable_persistence.setter
     def disable_persistence(self, value):
         """
-        Set the disable persistence flag
+        Set the disable persistence flag of the calling thread
 
         :param value: Disable
         :type value: bool
         """
-        self._disable_persistence = value
+        self._disable_persistence.value = value
 
     def get_driver_path(self, driver_filename):
         """
@@ -1152,49 +1238,48 @@ class RazerDevice(DBusService):
 
         Goes through the list in self.methods_internal and self.METHODS and loads each effect and adds it to DBus
         """
-        available_functions = {}
-        methods = dir(openrazer_daemon.dbus_services.dbus_methods)
-        for method in methods:
-            potential_function = getattr(openrazer_daemon.dbus_services.dbus_methods, method)
-            if isinstance(potential_function, types.FunctionType) and hasattr(potential_function, 'endpoint') and potential_function.endpoint:
-                available_functions[potential_function.__name__] = potential_function
-
         self.methods_internal.extend(self.METHODS)
         for method_name in self.methods_internal:
             try:
-                new_function = available_functions[method_name]
+                new_function = ENDPOINTS[method_name]
                 self.logger.debug("Adding %s.%s method to DBus", new_function.interface, new_function.name)
-                self.add_dbus_method(new_function.interface, new_function.name, new_function, new_function.in_sig, new_function.out_sig, new_function.byte_arrays)
+                self.add_dbus_method(new_function.interface, new_function.name, new_function, new_function.in_sig, new_function.out_sig, new_function.byte_arrays, new_function.sender_keyword)
             except KeyError as e:
                 raise RuntimeError("Couldn't add method to DBus: " + str(e)) from None
 
+        # The setters of the class may have changed
+        self._restore_plans.pop(type(self), None)
+
     def suspend_device(self):
         """
         Suspend device
         """
         self.logger.info("Suspending %s", self.__class__.__name__)
-        self.disable_notify = True
-        self.disable_persistence = True
+        # Not a DBus method, so take the lock here to keep synced effects out until the device is suspended
+        with self.lock:
+            self.disable_notify = True
+            self.disable_persistence = True
 
-        self.disable_brightness()
-        self._suspend_device()
+            self.disable_brightness()
+            self._suspend_device()
 
-        self.disable_notify = False
-        self.disable_persistence = False
+            self.disable_notify = False
+            self.disable_persistence = False
 
     def resume_device(self):
         """
         Resume device
         """
         self.logger.info("Resuming %s", self.__class__.__name__)
-        self.disable_notify = True
-        self.disable_persistence = True
+        with self.lock:
+            self.disable_notify = True
+            self.disable_persistence = True
 
-        self.restore_brightness()
-        self._resume_device()
+            self.restore_brightness()
+            self._resume_device()
 
-        self.disable_notify = False
-        self.disable_persistence = False
+            self.disable_notify = False
+            self.disable_persistence = False
 
     def _suspend_device(self):
         """
@@ -1224,7 +1309,7 @@ class RazerDevice(DBusService):
             # If this is a mouse, retrieve current DPI for local storage
             # in case the user has changed the DPI on-the-fly
             # (e.g. the DPI buttons)
-            if 'get_dpi_xy' in self.METHODS:
+            if 'get_dpi_xy' in self.METHOD_NAMES:
                 dpi_func = getattr(self, "getDPI", None)
                 if dpi_func is not None:
                     self.dpi = dpi_func()
@@ -1271,7 +1356,7 @@ class RazerDevice(DBusService):
         :param msg: Tuple with first element a string
         :type msg: tuple
         """
-        if not self._disable_notifications:
+        if not self.disable_notify:
             self.logger.debug("Sending observer message: %s", str(msg))
 
             if self._effect_sync_propagate_up and self._parent is not None:
@@ -24,7 +24,7 @@ class RazerKraken71(__RazerDevice):
 
     def _suspend_device(self):
         self.suspend_args.clear()
-        self.suspend_args['effect'] = self.zone["backlight"]["effect"]
+        self.suspend_args['effect'] = self.zone["backlight"].effect
 
         _dbus_chroma.set_none_effect(self)
 
@@ -57,8 +57,8 @@ class RazerKraken71Chroma(__RazerDevice):
 
     def _suspend_device(self):
         self.suspend_args.clear()
-        self.suspend_args['effect'] = self.zone["backlight"]["effect"]
-        self.suspend_args['args'] = self.zone["backlight"]["colors"][0:3]
+        self.suspend_args['effect'] = self.zone["backlight"].effect
+        self.suspend_args['args'] = self.zone["backlight"].colors[0:3]
 
         _dbus_chroma.set_none_effect(self)
 
@@ -90,13 +90,13 @@ class RazerKraken71V2(__RazerDevice):
 
     def _suspend_device(self):
         self.suspend_args.clear()
-        self.suspend_args['effect'] = self.zone["backlight"]["effect"]
+        self.suspend_args['effect'] = self.zone["backlight"].effect
         if self.suspend_args['effect'] == "breathDual":
-            self.suspend_args['args'] = self.zone["backlight"]["colors"][0:6]
+            self.suspend_args['args'] = self.zone["backlight"].colors[0:6]
         elif self.suspend_args['effect'] == "breathTriple":
-            self.suspend_args['args'] = self.zone["backlight"]["colors"][0:9]
+            self.suspend_args['args'] = self.zone["backlight"].colors[0:9]
         else:
-            self.suspend_args['args'] = self.zone["backlight"]["colors"][0:3]
+            self.suspend_args['args'] = self.zone["backlight"].colors[0:3]
 
         _dbus_chroma.set_none_effect(self)
 
@@ -133,13 +133,13 @@ class RazerKrakenUltimate(__RazerDevice):
 
     def _suspend_device(self):
         self.suspend_args.clear()
-        self.suspend_args['effect'] = self.zone["backlight"]["effect"]
+        self.suspend_args['effect'] = self.zone["backlight"].effect
         if self.suspend_args['effect'] == "breathDual":
-            self.suspend_args['args'] = self.zone["backlight"]["colors"][0:6]
+            self.suspend_args['args'] = self.zone["backlight"].colors[0:6]
         elif self.suspend_args['effect'] == "breathTriple":
-            self.suspend_args['args'] = self.zone["backlight"]["colors"][0:9]
+            self.suspend_args['args'] = self.zone["backlight"].colors[0:9]
         else:
-            self.suspend_args['args'] = self.zone["backlight"]["colors"][0:3]
+            self.suspend_args['args'] = self.zone["backlight"].colors[0:3]
 
         _dbus_chroma.set_none_effect(self)
 
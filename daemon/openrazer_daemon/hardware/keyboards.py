@@ -3,11 +3,32 @@
 """
 Keyboards class
 """
+import functools
 import re
 
+from gi.repository import GLib
+
 from openrazer_daemon.hardware.device_base import RazerDeviceBrightnessSuspend as _RazerDeviceBrightnessSuspend
-from openrazer_daemon.misc.key_event_management import KeyboardKeyManager as _KeyboardKeyManager, GamepadKeyManager as _GamepadKeyManager, OrbweaverKeyManager as _OrbweaverKeyManager
-from openrazer_daemon.misc.ripple_effect import RippleManager as _RippleManager
+from openrazer_daemon.misc.key_event_management import KeyboardKeyManager as _KeyboardKeyManager, GamepadKeyManager as _GamepadKeyManager, OrbweaverKeyManager as _OrbweaverKeyManager, KeyEventBatcher as _KeyEventBatcher
+from openrazer_daemon.misc.effect_engine import EffectManager as _EffectManager
+from openrazer_daemon.misc.macro_store import get_macro_store as _get_macro_store
+from openrazer_daemon.misc.software_effects import parse_persistence_name as _parse_persistence_name
+
+
+def _schedule_on_main_loop(delay, callback):
+    """
+    Call a function from the main loop after a delay
+
+    :param delay: Delay in seconds
+    :type delay: float
+
+    :param callback: Function, called again as long as it returns True
+    :type callback: callable
+    """
+    if delay > 0:
+        GLib.timeout_add(max(1, int(delay * 1000)), callback)
+    else:
+        GLib.idle_add(callback)
 
 
 class _MacroKeyboard(_RazerDeviceBrightnessSuspend):
@@ -19,14 +40,24 @@ class _MacroKeyboard(_RazerDeviceBrightnessSuspend):
 
     def __init__(self, *args, **kwargs):
         if 'additional_methods' in kwargs:
-            kwargs['additional_methods'].extend(['get_keyboard_layout'])
+            kwargs['additional_methods'].extend(['get_keyboard_layout', 'subscribe_key_events', 'unsubscribe_key_events', 'get_macro_policy', 'set_macro_policy'])
         else:
-            kwargs['additional_methods'] = ['get_keyboard_layout']
+            kwargs['additional_methods'] = ['get_keyboard_layout', 'subscribe_key_events', 'unsubscribe_key_events', 'get_macro_policy', 'set_macro_policy']
         super().__init__(*args, **kwargs)
         # Methods are loaded into DBus by this point
 
         self.key_manager = _KeyboardKeyManager(self._device_number, self.event_files, self, use_epoll=True, testing=self._testing)
 
+        # Stored macros are loaded once the device has been added, so they don't slow it down
+        self.key_manager.macro_store = _get_macro_store(self.storage_name)
+        _schedule_on_main_loop(0, self.key_manager.load_macros)
+
+        # Key events are only collected while a client is subscribed to the signal
+        self.add_dbus_signal('razer.device.input', 'KeyEvents', 'a(tqy)')
+        batch_window = self.config.getfloat('General', 'key_events_batch_window', fallback=5.0) / 1000
+        self._key_event_batcher = _KeyEventBatcher(self.KeyEvents, _schedule_on_main_loop, batch_window)
+        self._key_event_subscribers = {}
+
         self.logger.info('Putting device into driver mode. Daemon will handle special functionality')
         self.set_device_mode(0x03, 0x00)  # Driver mode
 
@@ -41,8 +72,59 @@ class _MacroKeyboard(_RazerDeviceBrightnessSuspend):
         except FileNotFoundError:  # Could be called when daemon is stopping or device is removed.
             pass
 
+        for watch in self._key_event_subscribers.values():
+            if watch is not None:
+                watch.cancel()
+        self._key_event_subscribers.clear()
+        self.key_manager.key_event_batcher = None
+
         self.key_manager.close()
 
+    def add_key_event_subscriber(self, bus_name):
+        """
+        Start emitting the KeyEvents signal for a client
+
+        :param bus_name: Unique bus name of the client, it is removed when it disconnects from the bus
+        :type bus_name: str or None
+        """
+        if bus_name in self._key_event_subscribers:
+            return
+
+        watch = None
+        if bus_name is not None:
+            watch = self.connection.watch_name_owner(bus_name, functools.partial(self._key_event_subscriber_changed, bus_name))
+
+        self._key_event_subscribers[bus_name] = watch
+        self.key_manager.key_event_batcher = self._key_event_batcher
+
+    def remove_key_event_subscriber(self, bus_name):
+        """
+        Stop emitting the KeyEvents signal for a client, it stops being emitted once there are no clients left
+
+        :param bus_name: Unique bus name of the client
+        :type bus_name: str or None
+        """
+        watch = self._key_event_subscribers.pop(bus_name, None)
+        if watch is not None:
+            watch.cancel()
+
+        if not self._key_event_subscribers:
+            self.key_manager.key_event_batcher = None
+
+    def _key_event_subscriber_changed(self, bus_name, owner):
+        """
+        Remove a subscribed client once it has disconnected from the bus
+
+        :param bus_name: Unique bus name of the client
+        :type bus_name: str
+
+        :param owner: New owner of the name, empty when the client has disconnected
+        :type owner: str
+        """
+        if not owner:
+            self.logger.debug("Key event subscriber %s has gone away", bus_name)
+            self.remove_key_event_subscriber(bus_name)
+
     def _resume_device(self):
         """
         Restore device mode
@@ -66,34 +148,42 @@ class _RippleKeyboard(_MacroKeyboard):
     """
     Keyboard class
 
-    Inherits _MacroKeyboard and has a ripple manager
+    Inherits _MacroKeyboard and has an effect manager which renders ripple and the other software effects
     """
 
     def __init__(self, *args, **kwargs):
+        if 'additional_methods' in kwargs:
+            kwargs['additional_methods'].extend(['get_software_effects', 'set_software_effect', 'set_software_effect_random_colour', 'get_software_effect_stats'])
+        else:
+            kwargs['additional_methods'] = ['get_software_effects', 'set_software_effect', 'set_software_effect_random_colour', 'get_software_effect_stats']
         super().__init__(*args, **kwargs)
 
         if not self.HAS_MATRIX:
             # You can use _MacroKeyboard instead if the keyboard doesn't support matrix
             raise RuntimeError("Cannot use RippleKeyboard without matrix capabilities")
 
-        self.ripple_manager = _RippleManager(self, self._device_number)
+        self.effect_manager = _EffectManager(self, self._device_number)
 
-        # we need to set the effect to ripple (if needed) after the ripple manager has started
+        # we need to set the effect to ripple (if needed) after the effect manager has started
         # otherwise it doesn't work
-        if self.zone["backlight"]["effect"] == "ripple" or self.zone["backlight"]["effect"] == "rippleRandomColour":
-            effect_func_name = 'set' + self.capitalize_first_char(self.zone["backlight"]["effect"])
-            effect_func = getattr(self, effect_func_name, None)
-
-            if effect_func is not None:
-                if effect_func_name == 'setRipple':
-                    effect_func(self.zone["backlight"]["colors"][0], self.zone["backlight"]["colors"][1], self.zone["backlight"]["colors"][2], self.ripple_manager._ripple_thread._refresh_rate)
-                elif effect_func_name == 'setRippleRandomColour':
-                    effect_func(self.ripple_manager._ripple_thread._refresh_rate)
+        effect = self.zone["backlight"].effect
+        colors = self.zone["backlight"].colors
+        software_effect = _parse_persistence_name(effect)
+        if effect == "ripple" and 'set_ripple_effect' in self.METHOD_NAMES:
+            self.setRipple(colors[0], colors[1], colors[2], self.effect_manager.refresh_rate)
+        elif effect == "rippleRandomColour" and 'set_ripple_effect_random_colour' in self.METHOD_NAMES:
+            self.setRippleRandomColour(self.effect_manager.refresh_rate)
+        elif software_effect is not None:
+            effect_name, random_colour = software_effect
+            if random_colour:
+                self.setSoftwareEffectRandomColour(effect_name, self.effect_manager.refresh_rate)
+            else:
+                self.setSoftwareEffect(effect_name, colors[0], colors[1], colors[2], self.effect_manager.refresh_rate)
 
     def _close(self):
         super()._close()
 
-        self.ripple_manager.close()
+        self.effect_manager.close()
 
 
 class RazerNostromo(_RazerDeviceBrightnessSuspend):
@@ -4,7 +4,6 @@
 Module to handle custom colours
 """
 
-import struct
 import subprocess
 
 
@@ -403,20 +402,84 @@ class RGB(object):
 class KeyboardColour(object):
     """
     Keyboard class which represents the colour state of the keyboard.
+
+    The colours are stored in a single preallocated buffer which is already laid out in the
+    format the driver expects for matrix_custom_frame, so a frame can be handed to the driver
+    without building a new payload each time.
+
+    Each row is stored as
+    * 1 byte row ID
+    * 1 byte start column (always 0)
+    * 1 byte end column (columns - 1)
+    * columns * 3 bytes of RGB
     """
 
+    ROW_HEADER_SIZE = 3
+
     def __init__(self, rows, columns):
         self.rows = rows
         self.columns = columns
 
-        # Two-dimensional array to hold color data
-        self.colors = []
+        self._row_size = self.ROW_HEADER_SIZE + columns * 3
+
+        # Template of an empty frame with the row headers baked in, used to clear the buffer
+        self._blank = bytearray(self._row_size * rows)
+        for row_id in range(0, rows):
+            offset = row_id * self._row_size
+            self._blank[offset:offset + self.ROW_HEADER_SIZE] = bytes([row_id, 0x00, columns - 1])
+        self._blank = bytes(self._blank)
+
+        # Buffer holding the colour data and views into it, which are handed out as payloads
+        self._buffer = bytearray(self._blank)
+        self._view = memoryview(self._buffer)
+        self._row_views = [self._view[row_id * self._row_size:(row_id + 1) * self._row_size] for row_id in range(0, rows)]
 
         # Backup object (currently not used)
         self.backup = None
 
-        # Initialize array with empty values
-        self.reset_rows()
+    def _offset(self, row, col):
+        """
+        Get the buffer offset of a key's red component
+
+        :param row: Row ID
+        :type row: int
+
+        :param col: Column ID
+        :type col: int
+
+        :return: Offset
+        :rtype: int
+
+        :raises KeyDoesNotExistError: If given key does not exist
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.columns):
+            raise KeyDoesNotExistError("The key ({0}, {1}) does not exist".format(row, col))
+
+        return row * self._row_size + self.ROW_HEADER_SIZE + col * 3
+
+    @property
+    def buffer(self):
+        """
+        Get the buffer holding the payload
+
+        Writing to the RGB bytes of a row changes the colours, the row headers must be left alone.
+
+        :return: Buffer
+        :rtype: bytearray
+        """
+        return self._buffer
+
+    @property
+    def colors(self):
+        """
+        Get the colours as a two-dimensional list of RGB objects
+
+        The RGB objects are copies, modifying them does not change the keyboard.
+
+        :return: Rows
+        :rtype: list
+        """
+        return self.get_rows_raw()
 
     def backup_configuration(self):
         """
@@ -432,7 +495,7 @@ class KeyboardColour(object):
         if self.backup is None:
             raise NoBackupError()
 
-        self.colors = self.backup.colors
+        self._buffer[:] = self.backup._buffer
         self.backup = None
 
     def get_rows_raw(self):
@@ -442,17 +505,20 @@ class KeyboardColour(object):
         :return: Rows
         :rtype: list
         """
-        return self.colors
+        result = []
+
+        for row_id in range(0, self.rows):
+            offset = row_id * self._row_size + self.ROW_HEADER_SIZE
+            row = self._buffer[offset:offset + self.columns * 3]
+            result.append([RGB(*row[i:i + 3]) for i in range(0, len(row), 3)])
+
+        return result
 
     def reset_rows(self):
         """
         Reset the rows of the keyboard
         """
-        self.colors.clear()
-
-        for row in range(0, self.rows):
-            # Create 22 rgb values
-            self.colors.append([RGB() for _ in range(0, self.columns)])
+        self._buffer[:] = self._blank
 
     def set_key_colour(self, row, col, colour):
         """
@@ -469,7 +535,12 @@ class KeyboardColour(object):
 
         :raises KeyDoesNotExistError: If given key does not exist
         """
-        self.colors[row][col].set(colour)
+        offset = self._offset(row, col)
+        buffer = self._buffer
+
+        buffer[offset] = RGB.clamp(colour[0])
+        buffer[offset + 1] = RGB.clamp(colour[1])
+        buffer[offset + 2] = RGB.clamp(colour[2])
 
     def get_key_colour(self, key):
         """
@@ -483,8 +554,8 @@ class KeyboardColour(object):
         if key not in KEY_MAPPING:
             raise KeyDoesNotExistError("The key \"{0}\" does not exist".format(key))
 
-        row_id, col_id = KEY_MAPPING[key]
-        return self.colors[row_id][col_id].get()
+        offset = self._offset(*KEY_MAPPING[key])
+        return tuple(self._buffer[offset:offset + 3])
 
     def reset_key(self, row, col):
         """
@@ -498,58 +569,56 @@ class KeyboardColour(object):
 
         :raises KeyDoesNotExistError: If given key does not exist
         """
-        self.colors[row][col].set((0, 0, 0))
+        offset = self._offset(row, col)
+        self._buffer[offset:offset + 3] = b'\x00\x00\x00'
 
     def get_row_binary(self, row_id):
         """
         Gets the binary payload for a given row
 
+        The payload is a view into the colour buffer, it is not copied so it will reflect any
+        later changes to the keyboard.
+
         :param row_id: Row ID
         :type row_id: int
 
-        :return: Byte string of 67 bytes, Row ID byte then 22 RGB bytes
-        :rtype: bytearray
+        :return: Row ID byte, start and end column bytes then the RGB bytes
+        :rtype: memoryview
         """
         assert isinstance(row_id, int), "Row ID is not an int"
 
-        payload = bytes([row_id, 0x00, len(self.colors[row_id]) - 1])
-
-        for rgb in self.colors[row_id]:
-            payload += bytes(rgb)
-
-        return payload
+        return self._row_views[row_id]
 
     def get_total_binary(self):
         """
         Gets the binary payload for the whole keyboard
 
-        :return: Byte string of 6*67 bytes, (Row ID byte then 22 RGB bytes) * 6
-        :rtype: bytearray
-        """
-        payload = b''
-
-        for row in range(0, self.rows):
-            payload += self.get_row_binary(row)
+        The payload is a view into the colour buffer, it is not copied so it will reflect any
+        later changes to the keyboard.
 
-        return payload
+        :return: (Row ID byte, start and end column bytes then the RGB bytes) * rows
+        :rtype: memoryview
+        """
+        return self._view
 
     def get_from_total_binary(self, binary_blob):
         """
         Load in a binary blob which is the output from get_total_binary
 
         :param binary_blob: Binary blob
-        :type binary_blob: bytearray
-        """
-        self.reset_rows()
+        :type binary_blob: bytes or bytearray or memoryview
 
-        for row_id in range(0, self.rows):
-            binary_blob = binary_blob[1:]  # Skip first byte
+        :raises ValueError: If the blob is not the size of a whole frame
+        """
+        if len(binary_blob) != len(self._buffer):
+            raise ValueError("Expected {0} bytes, got {1}".format(len(self._buffer), len(binary_blob)))
 
-            for col_id, binary_rgb in enumerate([binary_blob[i:i + 3] for i in range(0, 66, 3)]):
-                rgb = struct.unpack('=BBB', binary_rgb)
-                self.colors[row_id][col_id].set(rgb)
+        self._buffer[:] = binary_blob
 
-            binary_blob = binary_blob[66:]  # Skip the current row
+        # Don't trust the headers of the blob
+        for row_id in range(0, self.rows):
+            offset = row_id * self._row_size
+            self._buffer[offset:offset + self.ROW_HEADER_SIZE] = self._blank[offset:offset + self.ROW_HEADER_SIZE]
 
 
 def get_keyboard_layout():
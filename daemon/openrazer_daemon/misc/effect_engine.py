@@ -0,0 +1,696 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Contains the functions and classes to perform effects rendered by the daemon, like ripple
+"""
+import collections
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+import numpy as np
+
+# pylint: disable=import-error
+from openrazer_daemon.keyboard import KeyboardColour
+from openrazer_daemon.misc.software_effects import KeyEvents, NO_KEY_EVENTS, RippleEffect, SOFTWARE_EFFECTS
+
+
+class FrameStatistics(object):
+    """
+    Timings of the most recent frames of a device
+    """
+
+    # Number of frames the statistics are calculated over
+    WINDOW = 100
+
+    def __init__(self):
+        # (seconds since the previous frame or None, render seconds, upload seconds) of each frame
+        self._frames = collections.deque(maxlen=self.WINDOW)
+        self._last_start = None
+        self.skipped_frames = 0
+        self.refresh_rate = 0.0
+
+    def add_frame(self, start, render_time, upload_time):
+        """
+        Record a frame
+
+        :param start: time.monotonic() at the start of the frame
+        :type start: float
+
+        :param render_time: Seconds taken to render the frame
+        :type render_time: float
+
+        :param upload_time: Seconds taken to send the frame to the device
+        :type upload_time: float
+        """
+        interval = None if self._last_start is None else start - self._last_start
+        self._last_start = start
+
+        self._frames.append((interval, render_time, upload_time))
+
+    def pause(self):
+        """
+        Mark that the thread stopped rendering, so the time until the next frame does not count towards the FPS
+        """
+        self._last_start = None
+
+    def reset(self, refresh_rate):
+        """
+        Forget the recorded frames
+
+        :param refresh_rate: Requested refresh rate in seconds
+        :type refresh_rate: float
+        """
+        self._frames.clear()
+        self._last_start = None
+        self.skipped_frames = 0
+        self.refresh_rate = refresh_rate
+
+    def as_dict(self):
+        """
+        Get the statistics
+
+        Times are in milliseconds.
+
+        :return: Dictionary of fps, target_fps, render_ms, render_max_ms, upload_ms, upload_max_ms, skipped_frames
+        :rtype: dict
+        """
+        # Copy as the scheduler thread keeps adding frames
+        frames = list(self._frames)
+
+        result = {
+            'fps': 0.0,
+            'target_fps': 1.0 / self.refresh_rate if self.refresh_rate > 0 else 0.0,
+            'render_ms': 0.0,
+            'render_max_ms': 0.0,
+            'upload_ms': 0.0,
+            'upload_max_ms': 0.0,
+            'skipped_frames': float(self.skipped_frames),
+        }
+
+        intervals = [interval for interval, _, _ in frames if interval is not None]
+        if intervals and sum(intervals) > 0:
+            result['fps'] = len(intervals) / sum(intervals)
+        if frames:
+            render_times = [render_time for _, render_time, _ in frames]
+            upload_times = [upload_time for _, _, upload_time in frames]
+
+            result['render_ms'] = sum(render_times) / len(frames) * 1000
+            result['render_max_ms'] = max(render_times) * 1000
+            result['upload_ms'] = sum(upload_times) / len(frames) * 1000
+            result['upload_max_ms'] = max(upload_times) * 1000
+
+        return result
+
+
+class EffectScheduler(threading.Thread):
+    """
+    Effect scheduler thread.
+
+    One thread renders the effects of all devices. Each device has a renderer which is kept in a heap ordered
+    by the time its next frame is due, the thread sleeps until the earliest one and renders it.
+
+    :param clock: Function returning the current time in seconds
+    :type clock: callable
+    """
+
+    def __init__(self, clock=time.monotonic):
+        super().__init__()
+
+        self._logger = logging.getLogger('razer.effectscheduler')
+        self._clock = clock
+
+        self._condition = threading.Condition()
+        # Heap of (due time, sequence number, renderer), entries whose sequence number is not the renderer's
+        # current one in self._scheduled have been replaced or cancelled and are skipped
+        self._heap = []
+        self._sequence = itertools.count()
+        self._scheduled = {}
+        self._renderers = set()
+
+        self._shutdown = False
+
+    def add(self, renderer):
+        """
+        Add a device's renderer
+
+        :param renderer: Renderer
+        :type renderer: EffectRenderer
+        """
+        with self._condition:
+            self._renderers.add(renderer)
+
+    def remove(self, renderer):
+        """
+        Remove a device's renderer, the thread stops once it has no renderers
+
+        :param renderer: Renderer
+        :type renderer: EffectRenderer
+
+        :return: True if the scheduler has no renderers left
+        :rtype: bool
+        """
+        with self._condition:
+            self._renderers.discard(renderer)
+            self._scheduled.pop(renderer, None)
+
+            if not self._renderers:
+                self._shutdown = True
+                self._condition.notify()
+
+            return self._shutdown
+
+    def schedule(self, renderer, due):
+        """
+        Schedule a frame of a renderer
+
+        If a frame of the renderer is already scheduled the earlier time is kept.
+
+        :param renderer: Renderer
+        :type renderer: EffectRenderer
+
+        :param due: time.monotonic() the frame is due
+        :type due: float
+        """
+        with self._condition:
+            if renderer not in self._renderers:
+                return
+
+            current = self._scheduled.get(renderer)
+            if current is not None and current[0] <= due:
+                return
+
+            sequence = next(self._sequence)
+            self._scheduled[renderer] = (due, sequence)
+            heapq.heappush(self._heap, (due, sequence, renderer))
+
+            # Only wake up if the thread needs to sleep for less time now
+            if self._heap[0][1] == sequence:
+                self._condition.notify()
+
+    def unschedule(self, renderer):
+        """
+        Cancel the scheduled frame of a renderer
+
+        :param renderer: Renderer
+        :type renderer: EffectRenderer
+        """
+        with self._condition:
+            self._scheduled.pop(renderer, None)
+
+    def _next_renderer(self):
+        """
+        Wait until a frame is due
+
+        :return: Renderer or None if shutting down
+        :rtype: EffectRenderer or None
+        """
+        with self._condition:
+            while not self._shutdown:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+
+                due, sequence, renderer = self._heap[0]
+                if self._scheduled.get(renderer, (None, None))[1] != sequence:
+                    # Cancelled or replaced by an earlier frame
+                    heapq.heappop(self._heap)
+                    continue
+
+                timeout = due - self._clock()
+                if timeout > 0:
+                    self._condition.wait(timeout)
+                    continue
+
+                heapq.heappop(self._heap)
+                del self._scheduled[renderer]
+                return renderer
+
+        return None
+
+    def run(self):
+        """
+        Event loop
+        """
+        while True:
+            renderer = self._next_renderer()
+            if renderer is None:
+                break
+
+            try:
+                due = renderer.render_frame()
+            except Exception:
+                self._logger.exception("Failed to render frame")
+                continue
+
+            if due is not None:
+                self.schedule(renderer, due)
+
+
+# The scheduler shared by all devices, started when the first device needs it
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def _add_renderer(renderer):
+    """
+    Add a renderer to the shared scheduler, starting it if needed
+
+    :param renderer: Renderer
+    :type renderer: EffectRenderer
+
+    :return: Scheduler
+    :rtype: EffectScheduler
+    """
+    global _SCHEDULER  # pylint: disable=global-statement
+
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = EffectScheduler()
+            _SCHEDULER.start()
+
+        _SCHEDULER.add(renderer)
+        return _SCHEDULER
+
+
+def _remove_renderer(renderer):
+    """
+    Remove a renderer from the shared scheduler, stopping it if it was the last one
+
+    :param renderer: Renderer
+    :type renderer: EffectRenderer
+
+    :return: False if the scheduler could not be stopped
+    :rtype: bool
+    """
+    global _SCHEDULER  # pylint: disable=global-statement
+
+    with _SCHEDULER_LOCK:
+        scheduler = renderer.scheduler
+        if not scheduler.remove(renderer):
+            return True
+
+        if scheduler is _SCHEDULER:
+            _SCHEDULER = None
+
+    if scheduler is not threading.current_thread():
+        scheduler.join(timeout=2)
+    return not scheduler.is_alive()
+
+
+class EffectRenderer(object):
+    """
+    Renders the effect of one device
+
+    The shared EffectScheduler calls render_frame when a frame is due.
+
+    :param scheduler: Scheduler to use instead of the shared one, its owner starts and stops it
+    :type scheduler: EffectScheduler or None
+
+    :param clock: Function returning the current time in seconds
+    :type clock: callable
+    """
+
+    # Shortest time between frames in seconds, lower refresh rates are raised to it
+    MIN_REFRESH_RATE = 0.001
+
+    def __init__(self, parent, device_number, scheduler=None, clock=time.monotonic):
+        self._logger = logging.getLogger('razer.device{0}.effectrenderer'.format(device_number))
+        self._parent = parent
+        self._clock = clock
+
+        self._effect = None
+        self._refresh_rate = 0.040
+
+        self._active = False
+        # Set when there is nothing to draw until a key is pressed
+        self._waiting = False
+        self._deadline = None
+        self._last_frame = 0.0
+
+        self.statistics = FrameStatistics()
+
+        self._rows, self._cols = self._parent._parent.MATRIX_DIMS
+
+        self._keyboard_grid = KeyboardColour(self._rows, self._cols)
+
+        # (rows, cols, 3) view of the RGB bytes of the payload, the effects draw straight into it
+        row_size = KeyboardColour.ROW_HEADER_SIZE + self._cols * 3
+        self._frame = np.frombuffer(self._keyboard_grid.buffer, dtype=np.uint8).reshape(self._rows, row_size)[:, KeyboardColour.ROW_HEADER_SIZE:].reshape(self._rows, self._cols, 3)
+
+        self._shared_scheduler = scheduler is None
+        if self._shared_scheduler:
+            self.scheduler = _add_renderer(self)
+        else:
+            self.scheduler = scheduler
+            self.scheduler.add(self)
+
+    @property
+    def active(self):
+        """
+        Get if the renderer is active
+
+        :return: Active
+        :rtype: bool
+        """
+        return self._active
+
+    @property
+    def effect(self):
+        """
+        Get the current effect
+
+        :return: Effect
+        :rtype: openrazer_daemon.misc.software_effects.SoftwareEffect or None
+        """
+        return self._effect
+
+    @property
+    def key_events(self):
+        """
+        Get recent key presses
+
+        :return: Key presses
+        :rtype: openrazer_daemon.misc.software_effects.KeyEvents
+        """
+        return self._parent.key_events
+
+    def enable(self, effect, refresh_rate):
+        """
+        Enable an effect
+
+        :param effect: Effect to render
+        :type effect: openrazer_daemon.misc.software_effects.SoftwareEffect
+
+        :param refresh_rate: Refresh rate in seconds, at least MIN_REFRESH_RATE
+        :type refresh_rate: float
+        """
+        # Also catches NaN
+        if not refresh_rate >= self.MIN_REFRESH_RATE:
+            self._logger.warning("Refresh rate %s is too low, using %s", refresh_rate, self.MIN_REFRESH_RATE)
+            refresh_rate = self.MIN_REFRESH_RATE
+
+        self._effect = effect
+        self._refresh_rate = refresh_rate
+        self.statistics.reset(refresh_rate)
+        self._deadline = None
+        self._waiting = False
+        self._active = True
+
+        self.scheduler.schedule(self, self._clock())
+
+    def disable(self):
+        """
+        Disable the effect
+        """
+        self._active = False
+        self._waiting = False
+
+        self.scheduler.unschedule(self)
+
+    def wake(self):
+        """
+        Render again if waiting for a key press, used when a key has been pressed
+        """
+        if self._waiting:
+            self._waiting = False
+            self.scheduler.schedule(self, self._clock())
+
+    def close(self):
+        """
+        Remove the renderer from the scheduler
+
+        :return: False if the scheduler could not be stopped
+        :rtype: bool
+        """
+        self._active = False
+        if not self._shared_scheduler:
+            self.scheduler.remove(self)
+            return True
+
+        return _remove_renderer(self)
+
+    def _wait(self, effect):
+        """
+        Stop rendering until a key is pressed
+
+        :param effect: Current effect
+        :type effect: openrazer_daemon.misc.software_effects.SoftwareEffect
+
+        :return: Time the next frame is due, or None to wait for wake()
+        :rtype: float or None
+        """
+        self._waiting = True
+
+        # A key could have been pressed after the key events were read
+        if self._active and effect is self._effect and not effect.is_idle(self.key_events):
+            self._waiting = False
+            return self._clock()
+
+        self.statistics.pause()
+        self._deadline = None
+        return None
+
+    def render_frame(self):
+        """
+        Render a frame and send it to the device
+
+        Frames are scheduled on a fixed grid of deadlines, so the time taken to render and upload a frame
+        is taken off the wait. If the scheduler falls behind the missed frames are skipped instead of trying
+        to catch up.
+
+        When the effect goes idle a final blank frame is sent and no more frames are scheduled until a key
+        is pressed.
+
+        :return: Time the next frame is due, or None if no frame should be scheduled
+        :rtype: float or None
+        """
+        effect = self._effect
+        if not self._active or effect is None:
+            return None
+
+        key_events = self.key_events
+
+        start = self._clock()
+        # enable() can reset these from another thread while the frame is rendered
+        deadline = self._deadline
+        refresh_rate = self._refresh_rate
+        if deadline is None:
+            deadline = self._last_frame = start
+        dt = start - self._last_frame
+        self._last_frame = start
+
+        try:
+            effect.render(self._frame, dt, key_events)
+        except Exception:
+            self._logger.exception("Effect %s failed to render", effect.NAME)
+            self._active = False
+            return None
+        rendered = self._clock()
+
+        # Set the colors on the device
+        payload = self._keyboard_grid.get_total_binary()
+
+        self._parent.set_rgb_matrix(payload)
+        self._parent.refresh_keyboard()
+        uploaded = self._clock()
+
+        self.statistics.add_frame(start, rendered - start, uploaded - rendered)
+        self._parent.record_latency(rendered, uploaded)
+
+        # Once the final blank frame has been sent wait for a key press
+        if effect.is_idle(key_events):
+            return self._wait(effect)
+
+        deadline += refresh_rate
+        if uploaded > deadline:
+            skipped = int((uploaded - deadline) // refresh_rate) + 1
+            self.statistics.skipped_frames += skipped
+            deadline += skipped * refresh_rate
+
+        self._deadline = deadline
+        return deadline
+
+
+class EffectManager(object):
+    """
+    Class which manages the overall process of performing effects rendered by the daemon
+
+    :param scheduler: Scheduler to use instead of the shared one
+    :type scheduler: EffectScheduler or None
+
+    :param clock: Function returning the current time in seconds, used to schedule the frames
+    :type clock: callable
+    """
+
+    def __init__(self, parent, device_number, scheduler=None, clock=time.monotonic):
+        self._logger = logging.getLogger('razer.device{0}.effectmanager'.format(device_number))
+        self._parent = parent
+        self._parent.register_observer(self)
+
+        self._is_closed = False
+
+        # Key presses last passed to the renderer, and the time of the newest press whose latency was recorded
+        self._snapshot = None
+        self._last_recorded_press = 0
+
+        self._renderer = EffectRenderer(self, device_number, scheduler, clock)
+
+        if hasattr(self._parent, 'key_manager'):
+            self._parent.key_manager.temp_key_store_callback = self._renderer.wake
+
+    @property
+    def refresh_rate(self):
+        """
+        Get the refresh rate of the renderer
+
+        :return: Refresh rate in seconds
+        :rtype: float
+        """
+        return self._renderer._refresh_rate
+
+    @property
+    def statistics(self):
+        """
+        Get the frame statistics of the renderer
+
+        Also has the key press latencies, see openrazer_daemon.misc.latency.KeyLatencyStatistics.as_dict
+
+        :return: Dictionary of fps, target_fps, render_ms, render_max_ms, upload_ms, upload_max_ms, skipped_frames
+        :rtype: dict
+        """
+        result = self._renderer.statistics.as_dict()
+
+        if hasattr(self._parent, 'key_manager'):
+            result.update(self._parent.key_manager.latency.as_dict())
+
+        return result
+
+    @property
+    def key_events(self):
+        """
+        Get the recent key presses from the key manager
+
+        :return: Key presses
+        :rtype: openrazer_daemon.misc.software_effects.KeyEvents
+        """
+        if not hasattr(self._parent, 'key_manager'):
+            return NO_KEY_EVENTS
+
+        snapshot = self._parent.key_manager.temp_key_store
+        ages = (time.monotonic_ns() - snapshot.times) * 1e-9
+        self._snapshot = snapshot
+
+        return KeyEvents(ages, snapshot.rows, snapshot.cols, snapshot.colours)
+
+    def record_latency(self, rendered, uploaded):
+        """
+        Record the latency of the key presses which were drawn for the first time in the last frame
+
+        :param rendered: time.monotonic() when the frame was rendered
+        :type rendered: float
+
+        :param uploaded: time.monotonic() when the frame was sent to the device
+        :type uploaded: float
+        """
+        snapshot = self._snapshot
+        if snapshot is None or not len(snapshot.times) or snapshot.times[-1] <= self._last_recorded_press:
+            return
+
+        latency = self._parent.key_manager.latency
+        rendered_ns = int(rendered * 1e9)
+        uploaded_ns = int(uploaded * 1e9)
+
+        new_presses = snapshot.times > self._last_recorded_press
+        for press_time, event_time in zip(snapshot.times[new_presses].tolist(), snapshot.event_times[new_presses].tolist()):
+            latency.add('render', rendered_ns - press_time)
+            latency.add('upload', uploaded_ns - rendered_ns)
+            latency.add('total', uploaded_ns - event_time)
+
+        self._last_recorded_press = int(snapshot.times[-1])
+
+    def set_rgb_matrix(self, payload):
+        """
+        Set the LED matrix on the keyboard
+
+        :param payload: Binary payload
+        :type payload: bytes
+        """
+        self._parent._set_key_row(payload)
+
+    def refresh_keyboard(self):
+        """
+        Refresh the keyboard
+        """
+        self._parent._set_custom_effect()
+
+    def _enable(self, effect_class, colour, refresh_rate):
+        """
+        Start rendering an effect
+
+        :param effect_class: Effect class
+        :type effect_class: type
+
+        :param colour: Colour tuple like (0, 255, 255), if it contains None then random colours are used
+        :type colour: tuple
+
+        :param refresh_rate: Refresh rate in seconds
+        :type refresh_rate: float
+        """
+        if colour[0] is None:
+            colour = None
+        else:
+            colour = tuple(int(component) for component in colour)
+
+        rows, cols = self._parent.MATRIX_DIMS
+        effect = effect_class(rows, cols, colour)
+
+        self._parent.key_manager.temp_key_store_state = True
+        self._parent.key_manager.latency.clear()
+        self._renderer.enable(effect, float(refresh_rate))
+
+    def notify(self, msg):
+        """
+        Receive notificatons from the device (we only care about effects)
+
+        :param msg: Notification
+        :type msg: tuple
+        """
+        if not isinstance(msg, tuple):
+            self._logger.warning("Got msg that was not a tuple")
+        elif msg[0] == 'effect':
+            # We have a message directed at us
+            # MSG format
+            #  0         1       2             3
+            # ('effect', Device, 'effectName', 'effectparams'...)
+            # Device is the device the msg originated from (could be parent device)
+            if msg[2] == 'setRipple':
+                # Get (red, green, blue) tuple (args 3:6), and refreshrate arg 6
+                self._enable(RippleEffect, msg[3:6], msg[6])
+            elif msg[2] == 'setSoftwareEffect' and msg[3] in SOFTWARE_EFFECTS:
+                # Get effect name arg 3, (red, green, blue) tuple (args 4:7), and refreshrate arg 7
+                self._enable(SOFTWARE_EFFECTS[msg[3]], msg[4:7], msg[7])
+            elif msg[2] == 'setSoftwareEffectRandomColour' and msg[3] in SOFTWARE_EFFECTS:
+                # Get effect name arg 3, and refreshrate arg 4
+                self._enable(SOFTWARE_EFFECTS[msg[3]], (None, None, None), msg[4])
+            else:
+                # Effect other than ours so stop
+                self._renderer.disable()
+
+                self._parent.key_manager.temp_key_store_state = False
+
+    def close(self):
+        """
+        Close the manager, remove the renderer from the scheduler
+        """
+        if not self._is_closed:
+            self._logger.debug("Closing Effect Manager")
+            self._is_closed = True
+
+            if not self._renderer.close():
+                self._logger.error("Could not stop EffectScheduler thread")
+
+    def __del__(self):
+        self.close()
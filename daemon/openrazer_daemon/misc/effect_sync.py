@@ -7,9 +7,70 @@ import inspect
 import logging
 
 
+# Prefixes of the zone methods used when the device doesn't have the effect itself
+ZONE_PREFIXES = ('setScroll', 'setLogo', 'setLeft', 'setRight', 'setBacklight')
+
+GREEN = (0x00, 0xFF, 0x00)
+
+
+def _pass_args(args):
+    return args
+
+
+def _no_args(args):
+    return ()
+
+
+def _green(args):
+    return GREEN
+
+
+def _true(args):
+    return (True,)
+
+
+def _arity_adapter(count, fallback=None):
+    """
+    Get an argument adapter for a method taking a fixed number of arguments
+
+    :param count: Number of arguments of the method
+    :type count: int
+
+    :param fallback: Adapter used when the number of arguments doesn't match, the method isn't called if None
+    :type fallback: callable or None
+
+    :return: Adapter
+    :rtype: callable
+    """
+    def adapter(args):
+        if len(args) == count:
+            return args
+        if fallback is not None:
+            return fallback(args)
+        return None
+
+    return adapter
+
+
+# Effects the device doesn't have, to the zone method suffix and the argument adapter used instead
+ZONE_EFFECTS = {
+    'setSpectrum': ('Spectrum', _no_args),
+    'setStatic': ('Static', _pass_args),
+    'setWave': ('Wave', _pass_args),
+    'setReactive': ('Reactive', _pass_args),
+    'setBreathRandom': ('BreathRandom', _pass_args),
+    'setBreathSingle': ('BreathSingle', _pass_args),
+    'setBreathDual': ('BreathDual', _pass_args),
+    'setBrightness': ('Brightness', _pass_args),
+}
+
+
 class EffectSync(object):
     """
     Class which deals with receiving effect events from other devices
+
+    Each effect name is turned into a dispatch plan the first time it is received, the methods of the device
+    to call with an adapter for their arguments, so syncing an effect doesn't have to look anything up.
     """
 
     def __init__(self, parent, device_number):
@@ -17,6 +78,10 @@ class EffectSync(object):
         self._parent = parent
         self._parent.register_observer(self)
 
+        # Effect name to the dispatch plan, built for _plans_parent
+        self._plans = {}
+        self._plans_parent = None
+
     def __del__(self):
         self.close()
 
@@ -42,6 +107,68 @@ class EffectSync(object):
                 # Msg from another device
                 self.run_effect(msg[2], *msg[3:])
 
+    def build_plan(self, effect_name):
+        """
+        Work out which methods of the device an effect is run with
+
+        If the device has the effect it's called when the number of arguments matches. Otherwise the zones
+        are activated and the similar effects of the zones are called.
+
+        :param effect_name: Name of the effect
+        :type effect_name: str
+
+        :return: Tuples of the bound method and the argument adapter, which returns None to skip the method
+        :rtype: tuple
+        """
+        parent = self._parent
+        plan = []
+
+        def add(method_name, adapter):
+            method = getattr(parent, method_name, None)
+            if method is not None:
+                plan.append((method, adapter))
+
+        # Does parent have method
+        effect_func = getattr(parent, effect_name, None)
+        if effect_func is not None:
+            actual_args = self.get_num_arguments(effect_func)
+            fallback = None
+            if effect_name == 'setStatic':
+                # Could be static from chroma to non chroma, Chroma -> BW or BW -> Chroma (green)
+                fallback = _no_args if actual_args == 0 else _green
+
+            plan.append((effect_func, _arity_adapter(actual_args, fallback)))
+            return tuple(plan)
+
+        # setNone sets active to false and needs to be re-enabled for effects to show - maybe a bit inefficient
+        if effect_name != 'setNone':
+            for prefix in ZONE_PREFIXES:
+                add(prefix + 'Active', _true)
+        else:
+            for prefix in ZONE_PREFIXES:
+                add(prefix + 'None', _no_args)
+
+        # The target device doesn't have these methods, use similar ones
+        if effect_name == 'setPulsate':
+            # setPulsate doesn't provide a color but we need one, take green.
+            for method_name in ('setBreathSingle', 'setScrollBreathSingle', 'setLogoBreathSingle', 'setLeftBreathSingle', 'setRightBreathSingle',
+                                'setScrollPulsate', 'setLogoPulsate', 'setBacklightPulsate'):
+                add(method_name, _green)
+            return tuple(plan)
+
+        if effect_name in ('setBreathRandom', 'setBreathSingle'):
+            # setPulsate doesn't take any argument, the zones pulsate in green
+            add('setPulsate', _no_args)
+            for method_name in ('setScrollPulsate', 'setLogoPulsate', 'setBacklightPulsate'):
+                add(method_name, _green)
+
+        if effect_name in ZONE_EFFECTS:
+            suffix, adapter = ZONE_EFFECTS[effect_name]
+            for prefix in ZONE_PREFIXES:
+                add(prefix + suffix, adapter)
+
+        return tuple(plan)
+
     def run_effect(self, effect_name, *args):
         """
         Run the specified effect with the given arguments
@@ -56,257 +183,19 @@ class EffectSync(object):
         self._parent.disable_notify = True
 
         try:
-            # Does parent have method
-            effect_func = getattr(self._parent, effect_name, None)
-            if effect_func is not None:
-                # We have method, does it have the correct num arguments
-                actual_args = self.get_num_arguments(effect_func)
-                if actual_args == len(args):
-                    # method should be same
-                    effect_func(*args)
-                else:
-                    # Method same but wrong args, try alternatives
-                    if effect_name == 'setStatic':
-                        # Could be static from chroma to non chroma
-                        if actual_args == 0:
-                            # Chroma -> BW
-                            effect_func()
-                        else:
-                            # BW -> Chroma
-                            effect_func(0x0, 0xFF, 0x00)  # Green
-
-            else:
-                # setNone sets active to false and needs to be re-enabled for effects to show - maybe a bit inefficient
-                if not effect_name == 'setNone':
-                    effect_func = getattr(self._parent, 'setScrollActive', None)
-                    if effect_func is not None:
-                        effect_func(True)
-                    effect_func = getattr(self._parent, 'setLogoActive', None)
-                    if effect_func is not None:
-                        effect_func(True)
-                    effect_func = getattr(self._parent, 'setLeftActive', None)
-                    if effect_func is not None:
-                        effect_func(True)
-                    effect_func = getattr(self._parent, 'setRightActive', None)
-                    if effect_func is not None:
-                        effect_func(True)
-                    effect_func = getattr(self._parent, 'setBacklightActive', None)
-                    if effect_func is not None:
-                        effect_func(True)
-                else:
-                    effect_func = getattr(self._parent, 'setScrollNone', None)
-                    if effect_func is not None:
-                        effect_func()
-                    effect_func = getattr(self._parent, 'setLogoNone', None)
-                    if effect_func is not None:
-                        effect_func()
-                    effect_func = getattr(self._parent, 'setLeftNone', None)
-                    if effect_func is not None:
-                        effect_func()
-                    effect_func = getattr(self._parent, 'setRightNone', None)
-                    if effect_func is not None:
-                        effect_func()
-                    effect_func = getattr(self._parent, 'setBacklightNone', None)
-                    if effect_func is not None:
-                        effect_func()
-
-                # The target device doesn't have these methods, use similar ones
-
-                if effect_name == 'setPulsate':
-                    # setPulsate doesn't provide a color but we need one, take green.
-                    pargs = (0x00, 0xFF, 0x00)  # Green
-                    effect_func = getattr(self._parent, 'setBreathSingle', None)
-                    if effect_func is not None:
-                        effect_func(*pargs)
-                    effect_func = getattr(self._parent, 'setScrollBreathSingle', None)
-                    if effect_func is not None:
-                        effect_func(*pargs)
-                    effect_func = getattr(self._parent, 'setLogoBreathSingle', None)
-                    if effect_func is not None:
-                        effect_func(*pargs)
-                    effect_func = getattr(self._parent, 'setLeftBreathSingle', None)
-                    if effect_func is not None:
-                        effect_func(*pargs)
-                    effect_func = getattr(self._parent, 'setRightBreathSingle', None)
-                    if effect_func is not None:
-                        effect_func(*pargs)
-                    effect_func = getattr(self._parent, 'setScrollPulsate', None)
-                    if effect_func is not None:
-                        effect_func(*pargs)
-                    effect_func = getattr(self._parent, 'setLogoPulsate', None)
-                    if effect_func is not None:
-                        effect_func(*pargs)
-                    effect_func = getattr(self._parent, 'setBacklightPulsate', None)
-                    if effect_func is not None:
-                        effect_func(*pargs)
-
-                elif effect_name == 'setSpectrum':
-                    effect_func = getattr(self._parent, 'setScrollSpectrum', None)
-                    if effect_func is not None:
-                        effect_func()
-                    effect_func = getattr(self._parent, 'setLogoSpectrum', None)
-                    if effect_func is not None:
-                        effect_func()
-                    effect_func = getattr(self._parent, 'setLeftSpectrum', None)
-                    if effect_func is not None:
-                        effect_func()
-                    effect_func = getattr(self._parent, 'setRightSpectrum', None)
-                    if effect_func is not None:
-                        effect_func()
-                    effect_func = getattr(self._parent, 'setBacklightSpectrum', None)
-                    if effect_func is not None:
-                        effect_func()
-
-                elif effect_name == 'setStatic':
-                    effect_func = getattr(self._parent, 'setScrollStatic', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setLogoStatic', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setLeftStatic', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setRightStatic', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setBacklightStatic', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-
-                elif effect_name == 'setWave':
-                    effect_func = getattr(self._parent, 'setScrollWave', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setLogoWave', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setLeftWave', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setRightWave', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setBacklightWave', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-
-                elif effect_name == 'setReactive':
-                    effect_func = getattr(self._parent, 'setScrollReactive', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setLogoReactive', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setLeftReactive', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setRightReactive', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setBacklightReactive', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-
-                elif effect_name in ('setBreathRandom', 'setBreathSingle', 'setBreathDual', 'setBreathTriple'):
-                    if effect_name in ('setBreathRandom', 'setBreathSingle'):
-                        pargs = (0x00, 0xFF, 0x00)  # Green
-                    else:
-                        pargs = args[0:3]  # limit args to first 3, as setBreathDual gives 6 args and setBreathTriple gives 9 args
-
-                    if effect_name == 'setBreathRandom':
-                        effect_func = getattr(self._parent, 'setPulsate', None)
-                        if effect_func is not None:
-                            # setPulsate doesn't take any argument
-                            effect_func()
-                        effect_func = getattr(self._parent, 'setScrollPulsate', None)
-                        if effect_func is not None:
-                            effect_func(*pargs)
-                        effect_func = getattr(self._parent, 'setLogoPulsate', None)
-                        if effect_func is not None:
-                            effect_func(*pargs)
-                        effect_func = getattr(self._parent, 'setBacklightPulsate', None)
-                        if effect_func is not None:
-                            effect_func(*pargs)
-
-                        effect_func = getattr(self._parent, 'setScrollBreathRandom', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setLogoBreathRandom', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setLeftBreathRandom', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setRightBreathRandom', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setBacklightBreathRandom', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-
-                    if effect_name == 'setBreathSingle':
-                        if effect_func is not None:
-                            effect_func(*pargs)
-                        effect_func = getattr(self._parent, 'setScrollPulsate', None)
-                        if effect_func is not None:
-                            effect_func(*pargs)
-                        effect_func = getattr(self._parent, 'setLogoPulsate', None)
-                        if effect_func is not None:
-                            effect_func(*pargs)
-                        effect_func = getattr(self._parent, 'setBacklightPulsate', None)
-                        if effect_func is not None:
-                            effect_func(*pargs)
-
-                        effect_func = getattr(self._parent, 'setScrollBreathSingle', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setLogoBreathSingle', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setLeftBreathSingle', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setRightBreathSingle', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setBacklightBreathSingle', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-
-                    if effect_name == 'setBreathDual':
-                        effect_func = getattr(self._parent, 'setScrollBreathDual', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setLogoBreathDual', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setLeftBreathDual', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setRightBreathDual', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-                        effect_func = getattr(self._parent, 'setBacklightBreathDual', None)
-                        if effect_func is not None:
-                            effect_func(*args)
-
-                elif effect_name == 'setBrightness':
-                    effect_func = getattr(self._parent, 'setScrollBrightness', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setLogoBrightness', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setLeftBrightness', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setRightBrightness', None)
-                    if effect_func is not None:
-                        effect_func(*args)
-                    effect_func = getattr(self._parent, 'setBacklightBrightness', None)
-                    if effect_func is not None:
-                        effect_func(*args)
+            # Plans are for the methods of one device
+            if self._plans_parent is not self._parent:
+                self._plans = {}
+                self._plans_parent = self._parent
+
+            plan = self._plans.get(effect_name)
+            if plan is None:
+                plan = self._plans[effect_name] = self.build_plan(effect_name)
+
+            for effect_func, adapter in plan:
+                effect_args = adapter(args)
+                if effect_args is not None:
+                    effect_func(*effect_args)
 
         except Exception as err:
             self._logger.exception("Caught exception trying to sync effects.", exc_info=err)
@@ -14,7 +14,6 @@ Each event is in the format of
 * unsigned short code
 * signed int value
 """
-import datetime
 import fcntl
 import json
 import logging
@@ -27,15 +26,25 @@ import time
 
 # pylint: disable=import-error
 from openrazer_daemon.keyboard import KEY_MAPPING, TARTARUS_KEY_MAPPING, EVENT_MAPPING, TARTARUS_EVENT_MAPPING, NAGA_HEX_V2_EVENT_MAPPING, NAGA_HEX_V2_KEY_MAPPING, ORBWEAVER_EVENT_MAPPING, ORBWEAVER_KEY_MAPPING
-from .macro import MacroKey, MacroRunner, macro_dict_to_obj
+from .key_store import KeyStore
+from .latency import KeyLatencyStatistics, MAX_EVENT_AGE
+from .macro import MacroKey, macro_dict_to_obj, add_macro_user, remove_macro_user, MACRO_POLICIES, MACRO_POLICY_QUEUE
 
 EVENT_FORMAT = '@llHHI'
-EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+EVENT_STRUCT = struct.Struct(EVENT_FORMAT)
+EVENT_SIZE = EVENT_STRUCT.size
+# Maximum number of events read with one read() call
+READ_EVENTS = 64
 
-EPOLL_TIMEOUT = 0.01
-SPIN_SLEEP = 0.01
+# input-event-codes.h EV_KEY and the values of its events, which are passed on as the key actions
+EV_KEY = 0x01
+KEY_RELEASE = 0
+KEY_PRESS = 1
+KEY_AUTOREPEAT = 2
 
 EVIOCGRAB = 0x40044590
+# Sets the clock used for the event timestamps
+EVIOCSCLOCKID = 0x400445a0
 
 COLOUR_CHOICES = (
     (255, 0, 0),    # Red
@@ -66,9 +75,172 @@ def random_colour_picker(last_choice, iterable):
     return result
 
 
-class KeyWatcher(threading.Thread):
+class InputReactor(threading.Thread):
     """
-    Thread to watch keyboard event files and return keypresses
+    Thread to watch the event files of all devices
+
+    The thread owns one epoll set with the event files of every KeyWatcher and passes readable files
+    to the watcher they belong to. It blocks in epoll until there are events to read or it is woken up
+    through a pipe to shut down, so it doesn't wake up at all while no keys are pressed.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self._logger = logging.getLogger('razer.inputreactor')
+        self._shutdown = False
+
+        # Held while dispatching, so a watcher is never removed while its files are being read
+        self._lock = threading.RLock()
+        self._watchers = {}
+
+        self._poll_object = select.epoll()
+
+        # Pipe used to wake the thread up to shut down
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        self._poll_object.register(self._wakeup_read, select.EPOLLIN)
+
+    def add(self, event_fd, watcher):
+        """
+        Watch an event file
+
+        :param event_fd: Event file descriptor
+        :type event_fd: int
+
+        :param watcher: Key watcher the file belongs to
+        :type watcher: KeyWatcher
+        """
+        with self._lock:
+            self._watchers[event_fd] = watcher
+            self._poll_object.register(event_fd, select.EPOLLIN | select.EPOLLPRI)
+
+    def remove(self, event_fd):
+        """
+        Stop watching an event file, the thread stops once it has no files left
+
+        :param event_fd: Event file descriptor
+        :type event_fd: int
+
+        :return: True if the reactor has no files left
+        :rtype: bool
+        """
+        with self._lock:
+            if self._watchers.pop(event_fd, None) is not None:
+                self._unregister(event_fd)
+
+            if not self._watchers:
+                self._shutdown = True
+                os.write(self._wakeup_write, b'\x00')
+
+            return self._shutdown
+
+    def _unregister(self, event_fd):
+        """
+        Remove a file from epoll
+
+        :param event_fd: Event file descriptor
+        :type event_fd: int
+        """
+        try:
+            self._poll_object.unregister(event_fd)
+        except (IOError, OSError, ValueError):
+            pass
+
+    def run(self):
+        """
+        Main event loop
+        """
+        while not self._shutdown:
+            for event_fd, mask in self._poll_object.poll():
+                if event_fd == self._wakeup_read:
+                    # Shutting down, the loop condition deals with it
+                    continue
+
+                with self._lock:
+                    watcher = self._watchers.get(event_fd)
+                    if watcher is None:
+                        continue
+
+                    try:
+                        open_file = watcher.read_events(event_fd)
+                    except (IOError, OSError):  # Basically if there's an error, most likely device has been removed then it'll get deleted properly
+                        open_file = False
+
+                    if not open_file or (mask & (select.EPOLLERR | select.EPOLLHUP) and not mask & select.EPOLLIN):
+                        # Stop watching the file so epoll doesn't keep reporting it
+                        self._logger.debug("Event file %d has gone away", event_fd)
+                        self._unregister(event_fd)
+
+        self._poll_object.close()
+        os.close(self._wakeup_read)
+        os.close(self._wakeup_write)
+
+
+# The reactor shared by all devices, started when the first device needs it
+_REACTOR = None
+_REACTOR_LOCK = threading.Lock()
+
+
+def _add_event_files(watcher, event_fds):
+    """
+    Add event files to the shared reactor, starting it if needed
+
+    :param watcher: Key watcher the files belong to
+    :type watcher: KeyWatcher
+
+    :param event_fds: Event file descriptors
+    :type event_fds: list of int
+
+    :return: Reactor
+    :rtype: InputReactor
+    """
+    global _REACTOR  # pylint: disable=global-statement
+
+    with _REACTOR_LOCK:
+        if _REACTOR is None:
+            _REACTOR = InputReactor()
+            _REACTOR.start()
+
+        for event_fd in event_fds:
+            _REACTOR.add(event_fd, watcher)
+        return _REACTOR
+
+
+def _remove_event_files(reactor, event_fds):
+    """
+    Remove event files from the shared reactor, stopping it if they were the last ones
+
+    :param reactor: Reactor the files were added to
+    :type reactor: InputReactor
+
+    :param event_fds: Event file descriptors
+    :type event_fds: list of int
+
+    :return: False if the reactor could not be stopped
+    :rtype: bool
+    """
+    global _REACTOR  # pylint: disable=global-statement
+
+    with _REACTOR_LOCK:
+        stopped = False
+        for event_fd in event_fds:
+            stopped = reactor.remove(event_fd)
+        if not stopped:
+            return True
+
+        if reactor is _REACTOR:
+            _REACTOR = None
+
+    if reactor is not threading.current_thread():
+        reactor.join(timeout=2)
+    return not reactor.is_alive()
+
+
+class KeyWatcher(object):
+    """
+    Watches a device's keyboard event files and returns keypresses
+
+    The files are watched by the InputReactor shared by all devices.
     """
     @staticmethod
     def parse_event_record(data):
@@ -78,42 +250,23 @@ class KeyWatcher(threading.Thread):
         :param data: Binary data
         :type data: bytes
 
-        :return: Tuple of event time, key_action, key_code
+        :return: Tuple of event time in nanoseconds, key action (KEY_RELEASE, KEY_PRESS or KEY_AUTOREPEAT), key_code
         :rtype: tuple
         """
         # Event Seconds, Event Microseconds, Event Type, Event Code, Event Value
-        ev_sec, ev_usec, ev_type, ev_code, ev_value = struct.unpack(EVENT_FORMAT, data)
-
-        if ev_type != 0x01:  # input-event-codes.h EV_KEY 0x01
-            return None, None, None
+        ev_sec, ev_usec, ev_type, ev_code, ev_value = EVENT_STRUCT.unpack(data)
 
-        if ev_value == 0:
-            key_action = 'release'
-        elif ev_value == 1:
-            key_action = 'press'
-        elif ev_value == 2:
-            key_action = 'autorepeat'
-        else:
-            key_action = 'unknown'
-
-        seconds = ev_sec + (ev_usec * 0.000001)
-        date = datetime.datetime.fromtimestamp(seconds)
-
-        result = (date, key_action, ev_code)
-
-        if ev_type == ev_code == ev_value == 0:
+        if ev_type != EV_KEY:
             return None, None, None
 
-        return result
+        return ev_sec * 1000000000 + ev_usec * 1000, ev_value, ev_code
 
+    # use_epoll is unused as epoll is always used, it is kept for compatibility
     def __init__(self, device_id, event_files, parent, use_epoll=True):
-        super().__init__()
-
         self._logger = logging.getLogger('razer.device{0}.keywatcher'.format(device_id))
         self._event_files = event_files
-        self._shutdown = False
-        self._use_epoll = use_epoll
         self._parent = parent
+        self._reactor = None
 
         self.open_event_files = [open(event_file, 'rb') for event_file in self._event_files]
         # Set open files to non blocking mode
@@ -121,97 +274,153 @@ class KeyWatcher(threading.Thread):
             flags = fcntl.fcntl(event_file.fileno(), fcntl.F_GETFL)
             fcntl.fcntl(event_file.fileno(), fcntl.F_SETFL, flags | os.O_NONBLOCK)
 
-    def run(self):
+            # Have the events timestamped with the monotonic clock instead of the wall clock
+            try:
+                fcntl.ioctl(event_file.fileno(), EVIOCSCLOCKID, struct.pack('@i', time.CLOCK_MONOTONIC))
+            except (IOError, OSError):
+                self._logger.debug("Could not set the clock of %s", event_file.name)
+
+        # Partial event records left over from the last read of each file
+        self._remainders = {event_file.fileno(): b'' for event_file in self.open_event_files}
+
+    @property
+    def running(self):
         """
-        Main event loop
+        Get if the event files are being watched
+
+        :return: Running
+        :rtype: bool
         """
-        # Create dict of Event File Descriptor: Event File Object
-        event_file_map = {event_file.fileno(): event_file for event_file in self.open_event_files}
+        return self._reactor is not None
 
-        # Create epoll object
-        poll_object = select.epoll()
+    def start(self):
+        """
+        Start watching the event files
+        """
+        if self._reactor is None:
+            self._reactor = _add_event_files(self, list(self._remainders))
 
-        # Register files with select
-        for event_fd in event_file_map.keys():
-            poll_object.register(event_fd, select.EPOLLIN | select.EPOLLPRI)
+    def stop(self):
+        """
+        Stop watching the event files and close them
 
-        # Loop
-        while not self._shutdown:
-            # epoll is nice but it wasn't getting events properly :(
+        :return: False if the reactor thread could not be stopped
+        :rtype: bool
+        """
+        result = True
+        if self._reactor is not None:
+            result = _remove_event_files(self._reactor, list(self._remainders))
+            self._reactor = None
 
-            try:  # Cheap hack until i merged new code
-                if self._use_epoll:
-                    self._poll_epoll(poll_object, event_file_map)
-                else:
-                    self._poll_read()
-            except (IOError, OSError):  # Basically if there's an error, most likely device has been removed then it'll get deleted properly
-                pass
+        for event_file in self.open_event_files:
+            event_file.close()
+
+        return result
 
-            time.sleep(SPIN_SLEEP)
+    def read_events(self, event_fd):
+        """
+        Read all pending events from an event file and pass the key events on
 
-        # Unbind files and close them
-        for event_fd, event_file in event_file_map.items():
-            poll_object.unregister(event_fd)
-            event_file.close()
+        :param event_fd: Event file descriptor
+        :type event_fd: int
 
-        poll_object.close()
+        :return: False if the end of the file was reached
+        :rtype: bool
+        """
+        key_action = self._parent.key_action
 
-    def _poll_epoll(self, poll_object, event_file_map):
-        events = poll_object.poll(EPOLL_TIMEOUT)
+        while True:
+            try:
+                data = os.read(event_fd, EVENT_SIZE * READ_EVENTS)
+            except BlockingIOError:
+                return True
 
-        if len(events) != 0:
-            # pylint: disable=unused-variable
-            for event_fd, mask in events:
-                while True:
-                    key_data = event_file_map[event_fd].read(EVENT_SIZE)
-                    if not key_data:
-                        break
+            if not data:
+                return False
 
-                    date, key_action, key_code = self.parse_event_record(key_data)
+            # Read the whole buffer, so there could be more
+            more = len(data) == EVENT_SIZE * READ_EVENTS
 
-                    # Skip if date, key_action and key_code is none as that's a spacer record
-                    if date is None:
-                        continue
+            if self._remainders[event_fd]:
+                data = self._remainders[event_fd] + data
+            usable = len(data) - len(data) % EVENT_SIZE
+            self._remainders[event_fd] = data[usable:]
 
-                    # Now if key is pressed then we record
-                    self._parent.key_action(date, key_code, key_action)
+            # Event Seconds, Event Microseconds, Event Type, Event Code, Event Value
+            for ev_sec, ev_usec, ev_type, ev_code, ev_value in EVENT_STRUCT.iter_unpack(memoryview(data)[:usable]):
+                # Skip anything that's not a key, like the spacer records
+                if ev_type != EV_KEY:
+                    continue
 
-    def _poll_read(self):
-        for event_file in self.open_event_files:
+                # Now if key is pressed then we record
+                key_action(ev_sec * 1000000000 + ev_usec * 1000, ev_code, ev_value)
 
-            key_data = event_file.read(EVENT_SIZE)
+            if not more:
+                return True
 
-            if key_data is None:
-                continue
 
-            date, key_action, key_code = self.parse_event_record(key_data)
+class KeyEventBatcher(object):
+    """
+    Collects key events and passes them on in batches
 
-            # Skip if date, key_action and key_code is none as that's a spacer record
-            if date is None:
-                continue
+    The first event of a batch schedules a flush after the batch window and the events which arrive until then
+    are sent with it, so a burst of typing is passed on at most once per window instead of once per key.
 
-            # Now if key is pressed then we record
-            self._parent.key_action(date, key_code, key_action)
+    :param emit: Called with the list of (timestamp, position, action) tuples of a batch
+    :type emit: callable
 
-    @property
-    def shutdown(self):
+    :param schedule: Called with the delay in seconds and the function to call after it, like GLib.timeout_add
+    :type schedule: callable
+
+    :param window: Batch window in seconds
+    :type window: float
+    """
+
+    def __init__(self, emit, schedule, window=0.005):
+        self._emit = emit
+        self._schedule = schedule
+        self.window = window
+
+        self._lock = threading.Lock()
+        self._events = []
+
+    def add(self, timestamp, row, col, action):
         """
-        Thread shutdown condition
+        Add a key event to the batch
 
-        :return: Shutdown condition
-        :rtype: bool
+        :param timestamp: Time event occurred in nanoseconds
+        :type timestamp: int
+
+        :param row: Matrix row of the key
+        :type row: int
+
+        :param col: Matrix column of the key
+        :type col: int
+
+        :param action: KEY_PRESS, KEY_RELEASE or KEY_AUTOREPEAT
+        :type action: int
         """
-        return self._shutdown
+        with self._lock:
+            self._events.append((timestamp, (row << 8) | col, action))
+            first = len(self._events) == 1
+
+        if first:
+            self._schedule(self.window, self.flush)
 
-    @shutdown.setter
-    def shutdown(self, value):
+    def flush(self):
         """
-        Set thread shutdown condition
+        Pass on the events collected since the last flush
 
-        :param value: Boolean, normally only True would be used
-        :type value: str
+        :return: False, so the flush is not repeated when scheduled with GLib
+        :rtype: bool
         """
-        self._shutdown = value
+        with self._lock:
+            events, self._events = self._events, []
+
+        if events:
+            self._emit(events)
+
+        return False
 
 
 class KeyboardKeyManager(object):
@@ -223,7 +432,7 @@ class KeyboardKeyManager(object):
     * Logic to deal with GameMode shortcut not working when macro's not enabled
     * Logic to deal with recording on the fly macros and replaying them
 
-    It will be used to store keypresses in a list (for at most 2 seconds) if enabled for the ripple effect, when I
+    It will be used to store keypresses in a ring buffer (for at most 2 seconds) if enabled for the ripple effect, when I
     get round to making the effect.
     """
     KEY_MAP = KEY_MAPPING
@@ -250,17 +459,32 @@ class KeyboardKeyManager(object):
             self._logger.warning("No event files for KeyWatcher")
 
         self._recording_macro = False
+        # Macros compiled by the macro player, and the getMacros JSON of them, cleared when they change
         self._macros = {}
+        self._macros_json = None
+        # Where the macros are kept between restarts, they are loaded from it when first needed
+        self.macro_store = None
+        self._macros_loaded = False
+        self._macros_load_lock = threading.Lock()
+        # What to do when a bind key is pressed while its macro is playing, queue by default
+        self._macro_policies = {}
 
         self._current_macro_bind_key = None
         self._current_macro_combo = []
 
-        self._threads = set()
-        self._clean_counter = 0
+        # Shared macro player, added when the first macro is played
+        self._macro_player = None
 
         self._temp_key_store_active = False
-        self._temp_key_store = []
-        self._temp_expire_time = datetime.timedelta(seconds=2)
+        self._temp_key_store = KeyStore(expire_time=2.0)
+        # Called when a key is added to the store, so the effect engine can wake up
+        self.temp_key_store_callback = None
+
+        # Latency of key presses through the daemon, the effect engine adds the render and upload stages
+        self.latency = KeyLatencyStatistics()
+
+        # Set while clients want the key events, see KeyEventBatcher
+        self.key_event_batcher = None
 
         self._last_colour_choice = None
 
@@ -275,25 +499,10 @@ class KeyboardKeyManager(object):
         """
         Get the temporary key store
 
-        :return: List of keys
-        :rtype: list
+        :return: Snapshot of the keys pressed in the last 2 seconds
+        :rtype: openrazer_daemon.misc.key_store.KeyStoreSnapshot
         """
-        # Locking so it doesn't mutate whilst copying
-        self._access_lock.acquire()
-        now = datetime.datetime.now()
-
-        # Remove expired keys from store
-        try:
-            # Get date and if its less than now its expired
-            while self._temp_key_store[0][0] < now:
-                self._temp_key_store.pop(0)
-        except IndexError:
-            pass
-
-        # Creating a copy as then it doesn't mutate whilst iterating
-        result = self._temp_key_store[:]
-        self._access_lock.release()
-        return result
+        return self._temp_key_store.snapshot()
 
     @property
     def temp_key_store_state(self):
@@ -327,7 +536,48 @@ class KeyboardKeyManager(object):
                 fcntl.ioctl(event_file.fileno(), EVIOCGRAB, int(grab))
         self._event_files_locked = grab
 
-    def key_action(self, event_time, key_id, key_press='press'):
+    def _record_read_latency(self, event_time, now_ns):
+        """
+        Record the time taken for a key press to be read
+
+        :param event_time: Time event occurred in nanoseconds
+        :type event_time: int
+
+        :param now_ns: time.monotonic_ns() when the event was received
+        :type now_ns: int
+
+        :return: The event time, or now_ns if the event was timestamped with another clock
+        :rtype: int
+        """
+        if 0 <= now_ns - event_time < MAX_EVENT_AGE:
+            self.latency.add('read', now_ns - event_time)
+            return event_time
+
+        return now_ns
+
+    def _batch_key_event(self, batcher, event_time, key_id, key_press):
+        """
+        Pass a key event on to the clients which want the key events
+
+        Keys which are not in the matrix are left out.
+
+        :param batcher: Key event batcher
+        :type batcher: KeyEventBatcher
+
+        :param event_time: Time event occurred in nanoseconds
+        :type event_time: int
+
+        :param key_id: Key Event ID
+        :type key_id: int
+
+        :param key_press: KEY_PRESS, KEY_RELEASE or KEY_AUTOREPEAT
+        :type key_press: int
+        """
+        position = self.KEY_MAP.get(self.EVENT_MAP.get(key_id))
+        if position is not None:
+            batcher.add(event_time, position[0], position[1], key_press)
+
+    def key_action(self, event_time, key_id, key_press=KEY_PRESS):
         """
         Process a key press event
 
@@ -338,46 +588,36 @@ class KeyboardKeyManager(object):
           then it will record keys, then pressing FN+F9 will save macro.
         * Pressing any macro key will run macro.
         * Pressing FN+F10 will toggle game mode.
-        :param event_time: Time event occurred
-        :type event_time: datetime.datetime
+        :param event_time: Time event occurred in nanoseconds
+        :type event_time: int
 
         :param key_id: Key Event ID
         :type key_id: int
 
-        :param key_press: Can either be press, release, autorepeat
-        :type key_press: bool
+        :param key_press: Can either be KEY_PRESS, KEY_RELEASE, KEY_AUTOREPEAT
+        :type key_press: int
         """
         # Disable pylints complaining for this part, #PerformanceOverNeatness
         # pylint: disable=too-many-branches,too-many-statements
+        start_ns = time.monotonic_ns()
 
         # Get event files if they arnt locked #nasty hack
         if not self._event_files_locked and self._should_grab_event_files:
             self.grab_event_files(True)
 
-        if key_press == 'autorepeat':  # TODO not done right yet
+        batcher = self.key_event_batcher
+        if batcher is not None:
+            self._batch_key_event(batcher, event_time, key_id, key_press)
+
+        if key_press == KEY_AUTOREPEAT:  # TODO not done right yet
             # If its brightness then convert autorepeat to key presses
             # Brightness keys are defined in keyboard.py and razerkbd_driver.c
             if key_id in (0x2ab, 0x2aa):
-                key_press = 'press'
+                key_press = KEY_PRESS
             else:
                 # Quit out early
                 return
 
-        now = datetime.datetime.now()
-
-        # Remove expired keys from store
-        try:
-            # Get date and if its less than now its expired
-            while self._temp_key_store[0][0] < now:
-                self._temp_key_store.pop(0)
-        except IndexError:
-            pass
-
-        # Clean up any threads
-        if self._clean_counter > 20 and len(self._threads) > 0:
-            self._clean_counter = 0
-            self.clean_macro_threads()
-
         try:
             # Convert event ID to key name
             key_name = self.EVENT_MAP[key_id]
@@ -385,7 +625,7 @@ class KeyboardKeyManager(object):
             # self._logger.info("Got key: {0}, state: {1}".format(key_name, 'DOWN' if key_press else 'UP'))
 
             # Key release
-            if key_press == 'release':
+            if key_press == KEY_RELEASE:
                 if self._recording_macro:
                     # Skip as don't care about releasing macro bind key
                     if key_name not in (self._current_macro_bind_key, 'MACROMODE'):
@@ -394,11 +634,15 @@ class KeyboardKeyManager(object):
 
             else:
                 # Key press
+                event_start = self._record_read_latency(event_time, start_ns)
 
                 if self._temp_key_store_active:
                     colour = random_colour_picker(self._last_colour_choice, COLOUR_CHOICES)
                     self._last_colour_choice = colour
-                    self._temp_key_store.append((now + self._temp_expire_time, self.KEY_MAP[key_name], colour))
+                    self._temp_key_store.add(self.KEY_MAP[key_name], colour, start_ns, event_start)
+
+                    if self.temp_key_store_callback is not None:
+                        self.temp_key_store_callback()
 
                 # Macro FN+F9 logic
                 if key_name == 'MACROMODE':
@@ -481,10 +725,15 @@ class KeyboardKeyManager(object):
                         self._current_macro_combo.append((event_time, key_name, 'DOWN'))
                 # Not recording anything so if a macro key is pressed then run
                 else:
+                    if not self._macros_loaded:
+                        self.load_macros()
+
                     # If key has a macro, play it
                     if key_name in self._macros:
                         self.play_macro(key_name)
 
+                self.latency.add('key_action', time.monotonic_ns() - start_ns)
+
         except KeyError as err:
             self._logger.exception("Got key error. Couldn't convert event to key name", exc_info=err)
 
@@ -498,52 +747,114 @@ class KeyboardKeyManager(object):
 
         start_time = self._current_macro_combo[0][0]
         for event_time, key, state in self._current_macro_combo:
-            delay = (event_time - start_time).microseconds
+            # Nanoseconds to microseconds
+            delay = (event_time - start_time) // 1000
             start_time = event_time
             new_macro.append(MacroKey(key, delay, state))
 
-        self._macros[self._current_macro_bind_key] = new_macro
+        self._set_macro(self._current_macro_bind_key, new_macro)
 
-    def clean_macro_threads(self):
+    def _set_macro(self, macro_key, macro_data, save=True):
         """
-        Threadless-threadpool
+        Compile a macro and bind it to a key
 
-        Goes though the threads (macro play jobs) and removed the threads if they have finished.
-        #SetMagic
+        :param macro_key: Macro bind key
+        :type macro_key: str
+
+        :param macro_data: Macro objects
+        :type macro_data: list
+
+        :param save: Write the macro to the macro store
+        :type save: bool
         """
-        self._logger.debug("Cleaning up macro threads")
-        to_remove = set()
+        if self._macro_player is None:
+            self._macro_player = add_macro_user(self)
+
+        program = self._macro_player.compile(macro_data)
+        self._macros[macro_key] = program
+        self._macros_json = None
 
-        for macro_thread in self._threads:
-            macro_thread.join(timeout=0.05)
-            if not macro_thread.is_alive():
-                to_remove.add(macro_thread)
+        if save:
+            self._save_macro(macro_key)
 
-        self._threads -= to_remove
+    def _save_macro(self, macro_key):
+        """
+        Write the macro and the policy of a bind key to the macro store
+
+        :param macro_key: Macro bind key
+        :type macro_key: str
+        """
+        if self.macro_store is None:
+            return
+
+        program = self._macros.get(macro_key)
+        self.macro_store.save(macro_key, program.json if program is not None else None, self._macro_policies.get(macro_key))
+
+    def load_macros(self):
+        """
+        Load the macros and their policies from the macro store, if they haven't been loaded yet
+
+        Macros and policies set since the device was added are kept.
+        """
+        with self._macros_load_lock:
+            if self._macros_loaded:
+                return
+            self._macros_loaded = True
+
+            if self.macro_store is None:
+                return
+
+            for macro_key, (macro_list, policy) in self.macro_store.load().items():
+                if policy is not None and macro_key not in self._macro_policies:
+                    if policy in MACRO_POLICIES:
+                        if policy != MACRO_POLICY_QUEUE:
+                            self._macro_policies[macro_key] = policy
+                    else:
+                        self._logger.warning("Unknown macro policy %s of %s, using %s", policy, macro_key, MACRO_POLICY_QUEUE)
+
+                if macro_list is None or macro_key in self._macros:
+                    continue
+
+                try:
+                    macro_data = [macro_dict_to_obj(dict(macro_dict)) for macro_dict in macro_list]
+                except (KeyError, TypeError, ValueError) as err:
+                    self._logger.warning("Could not load the macro of %s: %s", macro_key, err)
+                    continue
+
+                self._set_macro(macro_key, macro_data, save=False)
+
+            self._logger.debug("Loaded %d macros", len(self._macros))
 
     def play_macro(self, macro_key):
         """
         Play macro for a given key
 
-        Launches a thread and adds it to the pool
+        Queues the macro on the macro player shared by all devices
         :param macro_key: Macro Key
         :type macro_key: str
         """
         self._logger.info("Running Macro %s:%s", macro_key, str(self._macros[macro_key]))
-        macro_thread = MacroRunner(self._device_id, macro_key, self._macros[macro_key])
-        macro_thread.start()
-        self._threads.add(macro_thread)
+        if self._macro_player is None:
+            self._macro_player = add_macro_user(self)
+        self._macro_player.play(self._device_id, macro_key, self._macros[macro_key], self._macro_policies.get(macro_key, MACRO_POLICY_QUEUE))
 
     # Methods to be used with DBus
     def dbus_delete_macro(self, key_name):
         """
         Delete a macro from a key
 
+        Its policy goes back to the default as well.
+
         :param key_name: Key Name
         :type key_name: str
         """
+        if self.macro_store is not None:
+            self.macro_store.delete(key_name)
+
+        self._macro_policies.pop(key_name, None)
         try:
             del self._macros[key_name]
+            self._macros_json = None
         except KeyError:
             pass
 
@@ -560,12 +871,13 @@ class KeyboardKeyManager(object):
         :return: JSON of macros
         :rtype: str
         """
-        result_dict = {}
-        for macro_key, macro_combo in self._macros.items():
-            str_combo = [value.to_dict() for value in macro_combo]
-            result_dict[macro_key] = str_combo
+        self.load_macros()
+
+        if self._macros_json is None:
+            # Same as json.dumps of the dict, from the JSON each program keeps
+            self._macros_json = '{' + ', '.join(json.dumps(macro_key) + ': ' + program.json for macro_key, program in list(self._macros.items())) + '}'
 
-        return json.dumps(result_dict)
+        return self._macros_json
 
     def dbus_add_macro(self, macro_key, macro_json):
         """
@@ -579,20 +891,68 @@ class KeyboardKeyManager(object):
         :type macro_json: str
         """
         macro_list = [macro_dict_to_obj(macro_object_dict) for macro_object_dict in json.loads(macro_json)]
-        self._macros[macro_key] = macro_list
+        self._set_macro(macro_key, macro_list)
+
+    def dbus_get_macro_policy(self, macro_key):
+        """
+        Get what happens when a bind key is pressed while its macro is playing
+
+        :param macro_key: Macro bind key
+        :type macro_key: str
+
+        :return: Policy, one of MACRO_POLICIES
+        :rtype: str
+        """
+        self.load_macros()
+
+        return self._macro_policies.get(macro_key, MACRO_POLICY_QUEUE)
+
+    def dbus_set_macro_policy(self, macro_key, policy):
+        """
+        Set what happens when a bind key is pressed while its macro is playing
+
+        The policy is kept in the macro store with the macro.
+
+        :param macro_key: Macro bind key
+        :type macro_key: str
+
+        :param policy: Policy, one of MACRO_POLICIES
+        :type policy: str
+
+        :raises ValueError: When the policy isn't known
+        """
+        if policy not in MACRO_POLICIES:
+            raise ValueError("Unknown macro policy {0}".format(policy))
+
+        # So the stored macro is written back with the policy
+        self.load_macros()
+
+        if policy == MACRO_POLICY_QUEUE:
+            self._macro_policies.pop(macro_key, None)
+        else:
+            self._macro_policies[macro_key] = policy
+
+        self._save_macro(macro_key)
 
     def close(self):
         """
         Cleanup function
         """
-        if self._keywatcher.is_alive():
+        # Stored macros aren't loaded anymore
+        with self._macros_load_lock:
+            self._macros_loaded = True
+
+        if self._macro_player is not None:
+            if not remove_macro_user(self._macro_player, self):
+                self._logger.error("Could not stop MacroPlayer thread")
+            self._macro_player = None
+
+        if self._keywatcher.running:
             self._parent.remove_observer(self)
 
             self._logger.debug("Stopping key manager")
-            self._keywatcher.shutdown = True
-            self._keywatcher.join(timeout=2)
-            if self._keywatcher.is_alive():
-                self._logger.error("Could not stop KeyWatcher thread")
+            if not self._keywatcher.stop():
+                self._logger.error("Could not stop InputReactor thread")
 
     def __del__(self):
         self.close()
@@ -634,7 +994,7 @@ class GamepadKeyManager(KeyboardKeyManager):
         self._mode_modifier_combo = []
         self._mode_modifier_key_down = False
 
-    def key_action(self, event_time, key_id, key_press=True):
+    def key_action(self, event_time, key_id, key_press=KEY_PRESS):
         """
         Process a key press event
 
@@ -645,47 +1005,37 @@ class GamepadKeyManager(KeyboardKeyManager):
           then it will record keys, then pressing FN+F9 will save macro.
         * Pressing any macro key will run macro.
         * Pressing FN+F10 will toggle game mode.
-        :param event_time: Time event occurred
-        :type event_time: datetime.datetime
+        :param event_time: Time event occurred in nanoseconds
+        :type event_time: int
 
         :param key_id: Key Event ID
         :type key_id: int
 
-        :param key_press: If true then its a press, else its a release
-        :type key_press: bool
+        :param key_press: KEY_RELEASE is false, KEY_PRESS and KEY_AUTOREPEAT are true
+        :type key_press: int
         """
         # Disable pylints complaining for this part, #PerformanceOverNeatness
         # pylint: disable=too-many-branches,too-many-statements
+        start_ns = time.monotonic_ns()
         self._access_lock.acquire()
 
         if not self._event_files_locked:
             self.grab_event_files(True)
 
-        now = datetime.datetime.now()
-
-        # Remove expired keys from store
-        try:
-            # Get date and if its less than now its expired
-            while self._temp_key_store[0][0] < now:
-                self._temp_key_store.pop(0)
-        except IndexError:
-            pass
-
-        # Clean up any threads
-        if self._clean_counter > 20 and len(self._threads) > 0:
-            self._clean_counter = 0
-            self.clean_macro_threads()
-
         try:
             # Convert event ID to key name
 
             key_name = self.GAMEPAD_EVENT_MAPPING[key_id]
             # Key press
+            event_start = self._record_read_latency(event_time, start_ns) if key_press else start_ns
 
             if self._temp_key_store_active:
                 colour = random_colour_picker(self._last_colour_choice, COLOUR_CHOICES)
                 self._last_colour_choice = colour
-                self._temp_key_store.append((now + self._temp_expire_time, self.GAMEPAD_KEY_MAPPING[key_name], colour))
+                self._temp_key_store.add(self.GAMEPAD_KEY_MAPPING[key_name], colour, start_ns, event_start)
+
+                if self.temp_key_store_callback is not None:
+                    self.temp_key_store_callback()
 
             # if self._testing:
             # if key_press:
@@ -714,9 +1064,15 @@ class GamepadKeyManager(KeyboardKeyManager):
 
             self._logger.debug("Macro String: {0}".format(key_name))
 
+            if key_press and not self._macros_loaded:
+                self.load_macros()
+
             if key_name in self._macros and key_press:
                 self.play_macro(key_name)
 
+            if key_press:
+                self.latency.add('key_action', time.monotonic_ns() - start_ns)
+
         except KeyError as err:
             self._logger.exception("Got key error. Couldn't convert event to key name", exc_info=err)
 
@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Contains the store of recent key presses used by the effects rendered by the daemon
+"""
+import collections
+import time
+
+import numpy as np
+
+KeyStoreSnapshot = collections.namedtuple('KeyStoreSnapshot', ['times', 'rows', 'cols', 'colours', 'event_times'])
+KeyStoreSnapshot.__doc__ = """
+Key presses which have not expired, oldest first
+
+:param times: time.monotonic_ns() of each press, int64 array
+:param rows: Matrix row of each key, intp array
+:param cols: Matrix column of each key, intp array
+:param colours: Random colour of each press, uint8 array of shape (presses, 3)
+:param event_times: Input event timestamp of each press in nanoseconds, int64 array
+"""
+
+
+class KeyStore(object):
+    """
+    Fixed size ring buffer of recent key presses
+
+    The presses are stored as a structure of numpy arrays. Expired presses are dropped by advancing the
+    tail index and the oldest presses are overwritten when the buffer is full, so adding a press never
+    allocates or moves memory.
+
+    There must only be one writer (the key manager) but snapshot() can be called from any thread without
+    locking.
+
+    :param capacity: Maximum number of presses held
+    :type capacity: int
+
+    :param expire_time: Seconds after which a press expires
+    :type expire_time: float
+    """
+
+    def __init__(self, capacity=128, expire_time=2.0):
+        self.capacity = capacity
+        self.expire_time_ns = int(expire_time * 1e9)
+
+        self._times = np.zeros(capacity, dtype=np.int64)
+        self._rows = np.zeros(capacity, dtype=np.intp)
+        self._cols = np.zeros(capacity, dtype=np.intp)
+        self._colours = np.zeros((capacity, 3), dtype=np.uint8)
+        self._event_times = np.zeros(capacity, dtype=np.int64)
+
+        # Number of presses ever added and the number of them which have expired. The slot after the
+        # newest press is never read by snapshot() as it is the next one to be written.
+        self._head = 0
+        self._tail = 0
+
+    def __len__(self):
+        return self._head - max(self._tail, self._head - (self.capacity - 1))
+
+    def add(self, key, colour, time_ns=None, event_time_ns=None):
+        """
+        Add a key press
+
+        :param key: (row, col) of the key
+        :type key: tuple
+
+        :param colour: Colour tuple like (0, 255, 255)
+        :type colour: tuple
+
+        :param time_ns: time.monotonic_ns() of the press, defaults to now
+        :type time_ns: int or None
+
+        :param event_time_ns: Timestamp of the input event, defaults to time_ns
+        :type event_time_ns: int or None
+        """
+        if time_ns is None:
+            time_ns = time.monotonic_ns()
+        if event_time_ns is None:
+            event_time_ns = time_ns
+
+        self.expire(time_ns)
+
+        index = self._head % self.capacity
+        self._times[index] = time_ns
+        self._rows[index], self._cols[index] = key
+        self._colours[index] = colour
+        self._event_times[index] = event_time_ns
+
+        # Publish the press once it has been written
+        self._head += 1
+
+    def expire(self, now_ns=None):
+        """
+        Drop the presses which have expired
+
+        :param now_ns: time.monotonic_ns(), defaults to now
+        :type now_ns: int or None
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+
+        cutoff = now_ns - self.expire_time_ns
+        tail = max(self._tail, self._head - (self.capacity - 1))
+        while tail < self._head and self._times[tail % self.capacity] < cutoff:
+            tail += 1
+        self._tail = tail
+
+    def clear(self):
+        """
+        Drop all presses
+        """
+        self._tail = self._head
+
+    def snapshot(self, now_ns=None):
+        """
+        Get a copy of the presses which have not expired
+
+        :param now_ns: time.monotonic_ns(), defaults to now
+        :type now_ns: int or None
+
+        :return: Snapshot
+        :rtype: KeyStoreSnapshot
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+
+        head = self._head
+        start = max(self._tail, head - (self.capacity - 1))
+
+        indices = np.arange(start, head) % self.capacity
+        times = self._times[indices]
+        rows = self._rows[indices]
+        cols = self._cols[indices]
+        colours = self._colours[indices]
+        event_times = self._event_times[indices]
+
+        # Drop presses which the writer overwrote while they were being copied
+        overwritten = self._head - (self.capacity - 1) - start
+        # and the ones which have expired since the tail was last advanced
+        expired = int(np.searchsorted(times, now_ns - self.expire_time_ns))
+
+        first = max(overwritten, expired, 0)
+        if first:
+            return KeyStoreSnapshot(times[first:], rows[first:], cols[first:], colours[first:], event_times[first:])
+        return KeyStoreSnapshot(times, rows, cols, colours, event_times)
@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Contains the latency statistics of key presses, from the input event to the LEDs
+"""
+import bisect
+
+# Upper bounds of the histogram buckets in nanoseconds, 20 per decade from 1 us to 10 s
+BUCKET_BOUNDS = tuple(int(round(1000 * 10 ** (index / 20))) for index in range(0, 141))
+
+# Key event timestamps further than this in the past are assumed to be from a clock other than time.monotonic_ns()
+MAX_EVENT_AGE = 1000000000
+
+
+class LatencyHistogram(object):
+    """
+    Histogram of latencies with logarithmic buckets
+
+    Adding a latency doesn't allocate, so it can be done for every key press. There must only be one writer.
+    """
+
+    def __init__(self):
+        # The last bucket holds anything over 10 s
+        self._counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+
+    def add(self, latency_ns):
+        """
+        Record a latency
+
+        :param latency_ns: Latency in nanoseconds
+        :type latency_ns: int
+        """
+        self._counts[bisect.bisect_left(BUCKET_BOUNDS, latency_ns)] += 1
+        self.count += 1
+
+    def clear(self):
+        """
+        Forget the recorded latencies
+        """
+        self._counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+
+    def percentile(self, percent):
+        """
+        Get a percentile of the latencies
+
+        :param percent: Percentile like 50 or 99
+        :type percent: float
+
+        :return: Upper bound of the bucket the percentile is in, in milliseconds. 0 when empty
+        :rtype: float
+        """
+        counts = list(self._counts)
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+
+        target = total * percent / 100.0
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if count and seen >= target:
+                break
+
+        return BUCKET_BOUNDS[min(index, len(BUCKET_BOUNDS) - 1)] / 1000000.0
+
+
+class KeyLatencyStatistics(object):
+    """
+    Latency histograms of each stage from a key press to the frame showing it
+
+    * read - from the input event timestamp to the daemon reading the event
+    * key_action - time taken by KeyboardKeyManager.key_action
+    * render - from the key being stored to the end of rendering the first frame with it
+    * upload - time taken to send that frame to the device
+    * total - from the input event timestamp to the end of the upload
+    """
+    STAGES = ('read', 'key_action', 'render', 'upload', 'total')
+
+    def __init__(self):
+        self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+
+    def add(self, stage, latency_ns):
+        """
+        Record the latency of a stage
+
+        :param stage: Stage, one of STAGES
+        :type stage: str
+
+        :param latency_ns: Latency in nanoseconds
+        :type latency_ns: int
+        """
+        self.histograms[stage].add(latency_ns)
+
+    def clear(self):
+        """
+        Forget the recorded latencies
+        """
+        for histogram in self.histograms.values():
+            histogram.clear()
+
+    def as_dict(self):
+        """
+        Get the statistics
+
+        Times are in milliseconds.
+
+        :return: Dictionary of latency_<stage>_p50_ms, latency_<stage>_p99_ms and latency_<stage>_count of every stage
+        :rtype: dict
+        """
+        result = {}
+        for stage, histogram in self.histograms.items():
+            result['latency_' + stage + '_p50_ms'] = histogram.percentile(50)
+            result['latency_' + stage + '_p99_ms'] = histogram.percentile(99)
+            result['latency_' + stage + '_count'] = float(histogram.count)
+
+        return result
@@ -6,16 +6,45 @@ Macro stuff
 Has objects representing key events
 Launching programs etc...
 """
+import fcntl
+import itertools
+import json
 import logging
+import os
+import queue
+import struct
 import subprocess
 import threading
+import time
 
 # pylint: disable=import-error
-from openrazer_daemon.keyboard import XTE_MAPPING
+from openrazer_daemon.keyboard import EVENT_MAPPING, XTE_MAPPING
 
 # This determines if the macro keys are executed with their natural spacing
 XTE_SLEEP = False
 
+# Key names to the input-event-codes.h codes written to the uinput keyboard
+UINPUT_MAPPING = {key_name: code for code, key_name in EVENT_MAPPING.items()}
+
+# input-event-codes.h and uinput.h
+EV_SYN = 0x00
+EV_KEY = 0x01
+SYN_REPORT = 0
+BUS_VIRTUAL = 0x06
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+UI_DEV_SETUP = 0x405c5503
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UINPUT_SETUP_FORMAT = '@HHHH80sI'
+EVENT_STRUCT = struct.Struct('@llHHi')
+
+# What the player does when a bind key is pressed while its macro is still queued or playing
+MACRO_POLICY_QUEUE = 'queue'
+MACRO_POLICY_RESTART = 'restart'
+MACRO_POLICY_IGNORE = 'ignore'
+MACRO_POLICIES = (MACRO_POLICY_QUEUE, MACRO_POLICY_RESTART, MACRO_POLICY_IGNORE)
+
 
 class MacroObject(object):
     """
@@ -143,71 +172,717 @@ class MacroScript(MacroObject):
         proc.communicate()
 
 
+def xte_line(key_event):
+    """
+    Generate a line to be fet into XTE
+
+    :param key_event: Key event object
+    :type key_event: MacroKey
+
+    :return: String XTE script
+    :rtype: str
+    """
+    # Save key here to prevent 5odd dictionary lookups
+    key = key_event.xte_key
+
+    cmd = ''
+
+    if key is not None:
+        if XTE_SLEEP:
+            cmd += 'usleep {0}\n'.format(key_event.pre_pause)
+
+        if key_event.state == 'UP':
+            cmd += 'keyup {0}\n'.format(key)
+        else:
+            cmd += 'keydown {0}\n'.format(key)
+
+    return cmd
+
+
+def xte_script(keys):
+    """
+    Generate the XTE script of a run of key events
+
+    :param keys: Key event objects
+    :type keys: list
+
+    :return: String XTE script
+    :rtype: str
+    """
+    return ''.join(xte_line(key_event) for key_event in keys)
+
+
+def compile_macro(macro_data, compile_keys=xte_script):
+    """
+    Turn a macro into the steps to play it
+
+    Runs of key events are compiled into one step, anything else is left as the object to execute.
+
+    :param macro_data: Macro objects
+    :type macro_data: list
+
+    :param compile_keys: Function compiling a run of key events, XTE scripts by default
+    :type compile_keys: callable
+
+    :return: Steps, compiled key events and other macro objects
+    :rtype: tuple
+    """
+    steps = []
+    keys = []
+
+    for event in itertools.chain(macro_data, (None,)):
+        if isinstance(event, MacroKey):
+            keys.append(event)
+            continue
+
+        if keys:
+            compiled = compile_keys(keys)
+            if compiled:
+                steps.append(compiled)
+            keys = []
+
+        if event is not None:
+            steps.append(event)
+
+    return tuple(steps)
+
+
+class MacroProgram(object):
+    """
+    Macro compiled for playback
+
+    Compiled once when the macro is bound to a key and never changed afterwards, an edit of the macro creates a
+    new program. The JSON of the macro is kept so it doesn't have to be built again for every getMacros.
+
+    :param macro_data: Macro objects
+    :type macro_data: list
+
+    :param compile_keys: Function compiling a run of key events, XTE scripts by default
+    :type compile_keys: callable
+    """
+    __slots__ = ('macro_data', 'compile_keys', 'steps', 'keys_only', 'json')
+
+    def __init__(self, macro_data, compile_keys=xte_script):
+        self.macro_data = tuple(macro_data)
+        self.compile_keys = compile_keys
+        self.steps = compile_macro(self.macro_data, compile_keys)
+        self.keys_only = not any(isinstance(step, MacroObject) for step in self.steps)
+        self.json = json.dumps([value.to_dict() for value in self.macro_data])
+
+    def __repr__(self):
+        return repr(list(self.macro_data))
+
+
+class XteInjector(object):
+    """
+    Long-lived xte process which the key events of macros are written to
+
+    xte runs the commands from its stdin as they arrive, so the process is kept running instead of starting one
+    for every macro. It is restarted if it dies.
+
+    :param command: Command to run
+    :type command: list
+    """
+
+    def __init__(self, command=None):
+        self._logger = logging.getLogger('razer.macro.xte')
+        self._command = command if command is not None else ['xte']
+        self._lock = threading.Lock()
+        self._process = None
+
+    compile = staticmethod(xte_script)
+
+    def _start(self):
+        """
+        Start the process
+
+        :return: Process or None if it could not be started
+        :rtype: subprocess.Popen or None
+        """
+        try:
+            return subprocess.Popen(self._command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as err:
+            self._logger.error("Could not start %s: %s", self._command[0], err)
+            return None
+
+    def send(self, script, cancelled=None):
+        """
+        Run an XTE script
+
+        The script is sent at once, so it can't be cancelled.
+
+        :param script: XTE script
+        :type script: str
+
+        :param cancelled: Unused
+        :type cancelled: threading.Event or None
+
+        :return: False if the script could not be sent
+        :rtype: bool
+        """
+        data = script.encode('ascii')
+
+        with self._lock:
+            # Retry once with a new process if the old one has died
+            for _ in range(0, 2):
+                if self._process is None or self._process.poll() is not None:
+                    if self._process is not None:
+                        self._logger.warning("%s exited with %s, restarting it", self._command[0], self._process.returncode)
+                    self._process = self._start()
+                    if self._process is None:
+                        return False
+
+                try:
+                    self._process.stdin.write(data)
+                    self._process.stdin.flush()
+                    return True
+                except OSError:
+                    self._process.kill()
+                    self._process.wait()
+
+        return False
+
+    def release(self):
+        """
+        Release the keys held down by a cancelled macro, nothing to do as scripts are never cut short
+        """
+
+    def close(self):
+        """
+        Stop the process
+        """
+        with self._lock:
+            if self._process is None:
+                return
+
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+
+
+class UinputInjector(object):
+    """
+    Virtual keyboard owned by the daemon which the key events of macros are written to
+
+    Works without X11. The delays recorded in the macro are kept, waiting on the monotonic clock so they
+    don't add up, and key events without a delay between them are written together.
+
+    :param path: Path of the uinput device
+    :type path: str
+
+    :raises OSError: If the virtual keyboard could not be created
+    """
+    NAME = b'OpenRazer Macro Keyboard'
+
+    def __init__(self, path='/dev/uinput'):
+        self._logger = logging.getLogger('razer.macro.uinput')
+        self._lock = threading.Lock()
+        self._fd = self._open(path)
+        # Codes of the keys which are held down
+        self._held = set()
+
+    def _open(self, path):
+        """
+        Create the virtual keyboard
+
+        :param path: Path of the uinput device
+        :type path: str
+
+        :return: File descriptor
+        :rtype: int
+        """
+        fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        try:
+            fcntl.ioctl(fd, UI_SET_EVBIT, EV_KEY)
+            for code in sorted(set(UINPUT_MAPPING.values())):
+                fcntl.ioctl(fd, UI_SET_KEYBIT, code)
+
+            fcntl.ioctl(fd, UI_DEV_SETUP, struct.pack(UINPUT_SETUP_FORMAT, BUS_VIRTUAL, 0x1532, 0, 1, self.NAME, 0))
+            fcntl.ioctl(fd, UI_DEV_CREATE)
+        except OSError:
+            os.close(fd)
+            raise
+
+        return fd
+
+    def fileno(self):
+        """
+        Get the file descriptor of the uinput device
+
+        :return: File descriptor
+        :rtype: int
+        """
+        return self._fd
+
+    @staticmethod
+    def compile(keys):
+        """
+        Turn a run of key events into the writes to play them
+
+        Keys without an evdev code are skipped, their delay is added to the next key.
+
+        :param keys: Key event objects
+        :type keys: list
+
+        :return: Tuples of the delay in nanoseconds and the events to write after it
+        :rtype: tuple
+        """
+        writes = []
+        pause_ns = 0
+
+        for key_event in keys:
+            pause_ns += max(int(key_event.pre_pause), 0) * 1000
+
+            code = UINPUT_MAPPING.get(key_event.key_id)
+            if code is None:
+                continue
+
+            data = EVENT_STRUCT.pack(0, 0, EV_KEY, code, 0 if key_event.state == 'UP' else 1) + EVENT_STRUCT.pack(0, 0, EV_SYN, SYN_REPORT, 0)
+            if writes and pause_ns == 0:
+                writes[-1] = (writes[-1][0], writes[-1][1] + data)
+            else:
+                writes.append((pause_ns, data))
+            pause_ns = 0
+
+        return tuple(writes)
+
+    def send(self, writes, cancelled=None):
+        """
+        Play compiled key events
+
+        :param writes: Key events from compile
+        :type writes: tuple
+
+        :param cancelled: Event which stops the playback when set during a delay
+        :type cancelled: threading.Event or None
+
+        :return: False if the key events could not be written
+        :rtype: bool
+        """
+        with self._lock:
+            if self._fd is None:
+                return False
+
+            deadline = time.monotonic_ns()
+            for pause_ns, data in writes:
+                if pause_ns:
+                    deadline += pause_ns
+                    remaining = deadline - time.monotonic_ns()
+                    if remaining > 0:
+                        if cancelled is None:
+                            time.sleep(remaining / 1000000000)
+                        elif cancelled.wait(remaining / 1000000000):
+                            break
+
+                if not self._write(data):
+                    return False
+
+        return True
+
+    def _write(self, data):
+        """
+        Write key events and keep track of the keys held down
+
+        :param data: input_event structs
+        :type data: bytes
+
+        :return: False if the key events could not be written
+        :rtype: bool
+        """
+        try:
+            os.write(self._fd, data)
+        except OSError as err:
+            self._logger.error("Could not write to the virtual keyboard: %s", err)
+            return False
+
+        for _, _, ev_type, ev_code, ev_value in EVENT_STRUCT.iter_unpack(data):
+            if ev_type == EV_KEY:
+                if ev_value:
+                    self._held.add(ev_code)
+                else:
+                    self._held.discard(ev_code)
+
+        return True
+
+    def release(self):
+        """
+        Release the keys held down by a cancelled macro
+        """
+        with self._lock:
+            if self._fd is None or not self._held:
+                return
+
+            data = b''.join(EVENT_STRUCT.pack(0, 0, EV_KEY, code, 0) for code in sorted(self._held)) + EVENT_STRUCT.pack(0, 0, EV_SYN, SYN_REPORT, 0)
+            self._write(data)
+
+    def close(self):
+        """
+        Remove the virtual keyboard
+        """
+        with self._lock:
+            if self._fd is None:
+                return
+
+            try:
+                fcntl.ioctl(self._fd, UI_DEV_DESTROY)
+            except OSError:
+                pass
+            os.close(self._fd)
+            self._fd = None
+
+
+def default_injector():
+    """
+    Get the injector to play macros with, the uinput keyboard if it can be created or xte otherwise
+
+    :return: Injector
+    :rtype: UinputInjector or XteInjector
+    """
+    try:
+        return UinputInjector()
+    except OSError as err:
+        logging.getLogger('razer.macro').info("Could not create the uinput keyboard (%s), macros are played with xte", err)
+        return XteInjector()
+
+
 class MacroRunner(threading.Thread):
     """
     Thread to run macros
+
+    Used for macros which run scripts or open URLs, as those wait for the command to finish.
     """
 
-    def __init__(self, device_id, macro_bind, macro_data):
+    def __init__(self, device_id, macro_bind, macro_data, injector=None):
         super().__init__()
 
         self._logger = logging.getLogger('razer.device{0}.macro{1}'.format(device_id, macro_bind))
-        self._macro_data = macro_data
         self._macro_bind = macro_bind
+        self._injector = injector
 
-    @staticmethod
-    def xte_line(key_event):
+        if isinstance(macro_data, MacroProgram):
+            self._steps = macro_data.steps
+        else:
+            self._steps = compile_macro(macro_data, injector.compile if injector is not None else xte_script)
+
+    # Kept for compatibility
+    xte_line = staticmethod(xte_line)
+
+    def _send(self, xte):
         """
-        Generate a line to be fet into XTE
+        Play compiled key events, as an XTE script with a new xte process if there is no injector
 
-        :param key_event: Key event object
-        :type key_event: MacroKey
+        :param xte: Compiled key events
+        :type xte: str or tuple
+        """
+        if self._injector is not None:
+            self._injector.send(xte)
+        else:
+            proc = subprocess.Popen(['xte'], stdin=subprocess.PIPE)
+            proc.communicate(input=xte.encode('ascii'))
 
-        :return: String XTE script
-        :rtype: str
+    def run(self):
+        """
+        Main thread function
+        """
+        for step in self._steps:
+            if not isinstance(step, MacroObject):
+                self._send(step)
+            else:
+                step.execute()
+
+        self._logger.debug("Finished running macro %s", self._macro_bind)
+
+
+class MacroPlayback(object):
+    """
+    Macro waiting to be played or being played
+
+    :param device_id: Device ID
+    :type device_id: int
+
+    :param macro_bind: Macro bind key
+    :type macro_bind: str
+
+    :param program: Compiled macro
+    :type program: MacroProgram
+    """
+    __slots__ = ('device_id', 'macro_bind', 'program', 'cancelled')
+
+    def __init__(self, device_id, macro_bind, program):
+        self.device_id = device_id
+        self.macro_bind = macro_bind
+        self.program = program
+        self.cancelled = threading.Event()
+
+
+class MacroPlayer(threading.Thread):
+    """
+    Thread which plays the macros of all devices
+
+    Macros are queued and their key events are written to one injector, so playing a macro doesn't start a
+    thread or a process. Macros which run scripts or open URLs are played by a few worker threads instead, as
+    those wait for the command to finish. The queues are bounded, macros are dropped if they fill up.
+
+    What happens when a bind key is pressed while its macro is still queued or playing depends on its policy:
+
+    * queue - the macro is played again after the previous one
+    * restart - the previous one is cancelled and the macro is played again
+    * ignore - the press is ignored
+
+    Nothing here waits for a macro, so playing one doesn't hold up the key events.
+
+    :param injector: Injector, the uinput keyboard or xte by default
+    :type injector: UinputInjector or XteInjector or None
+    """
+
+    # Number of macros which can be waiting to be played, for each queue
+    QUEUE_SIZE = 32
+    # Number of threads playing macros which run scripts or open URLs
+    WORKERS = 2
+
+    def __init__(self, injector=None):
+        super().__init__()
+
+        self._logger = logging.getLogger('razer.macroplayer')
+        self.injector = injector if injector is not None else default_injector()
+
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._worker_queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._workers = []
+        self._lock = threading.Lock()
+        self._users = set()
+        # (device ID, bind key) to the playbacks of its macro which are queued or playing
+        self._playing = {}
+
+        self._shutdown = False
+
+    def add(self, user):
         """
-        # Save key here to prevent 5odd dictionary lookups
-        key = key_event.xte_key
+        Add a user of the player, like a key manager
 
-        cmd = ''
+        :param user: User
+        :type user: object
+        """
+        with self._lock:
+            self._users.add(user)
+
+    def remove(self, user):
+        """
+        Remove a user of the player, the thread stops once it has no users
 
-        if key is not None:
-            if XTE_SLEEP:
-                cmd += 'usleep {0}\n'.format(key_event.pre_pause)
+        :param user: User
+        :type user: object
 
-            if key_event.state == 'UP':
-                cmd += 'keyup {0}\n'.format(key)
+        :return: True if the player has no users left
+        :rtype: bool
+        """
+        with self._lock:
+            self._users.discard(user)
+
+            if not self._users and not self._shutdown:
+                self._shutdown = True
+
+                for playbacks in self._playing.values():
+                    for playback in playbacks:
+                        playback.cancelled.set()
+
+                # Wake the threads up, they stop before playing anything still queued. If a queue is full
+                # the threads are busy and see the flag once they take the next macro
+                for item_queue, count in ((self._queue, 1), (self._worker_queue, len(self._workers))):
+                    for _ in range(0, count):
+                        try:
+                            item_queue.put_nowait(None)
+                        except queue.Full:
+                            pass
+
+            return self._shutdown
+
+    def compile(self, macro_data):
+        """
+        Compile a macro for the injector of the player
+
+        :param macro_data: Macro objects
+        :type macro_data: list
+
+        :return: Compiled macro
+        :rtype: MacroProgram
+        """
+        return MacroProgram(macro_data, self.injector.compile)
+
+    def play(self, device_id, macro_bind, macro_data, policy=MACRO_POLICY_QUEUE):
+        """
+        Queue a macro to be played
+
+        :param device_id: Device ID
+        :type device_id: int
+
+        :param macro_bind: Macro bind key
+        :type macro_bind: str
+
+        :param macro_data: Macro compiled by compile, or the macro objects to compile
+        :type macro_data: MacroProgram or list
+
+        :param policy: What to do if the macro of the bind key is still queued or playing, one of MACRO_POLICIES
+        :type policy: str
+
+        :return: False if the macro was dropped or ignored
+        :rtype: bool
+        """
+        if isinstance(macro_data, MacroProgram) and macro_data.compile_keys == self.injector.compile:
+            program = macro_data
+        else:
+            program = self.compile(macro_data)
+
+        key = (device_id, macro_bind)
+
+        with self._lock:
+            if self._shutdown:
+                return False
+
+            playing = self._playing.get(key)
+            if playing:
+                if policy == MACRO_POLICY_IGNORE:
+                    self._logger.debug("Macro %s is still playing, ignoring it", macro_bind)
+                    return False
+                if policy == MACRO_POLICY_RESTART:
+                    for playback in playing:
+                        playback.cancelled.set()
+
+            if program.keys_only:
+                item_queue = self._queue
             else:
-                cmd += 'keydown {0}\n'.format(key)
+                item_queue = self._worker_queue
+                if len(self._workers) < self.WORKERS:
+                    worker = threading.Thread(target=self._run_worker, name='MacroWorker', daemon=True)
+                    worker.start()
+                    self._workers.append(worker)
+
+            playback = MacroPlayback(device_id, macro_bind, program)
+            try:
+                item_queue.put_nowait(playback)
+            except queue.Full:
+                self._logger.warning("Too many macros queued, dropping macro %s", macro_bind)
+                return False
 
-        return cmd
+            self._playing.setdefault(key, []).append(playback)
+
+        return True
+
+    def _play(self, playback):
+        """
+        Play a macro unless it has been cancelled
+
+        :param playback: Macro to play
+        :type playback: MacroPlayback
+        """
+        started = False
+
+        try:
+            for step in playback.program.steps:
+                if playback.cancelled.is_set():
+                    break
+                started = True
+
+                if isinstance(step, MacroObject):
+                    step.execute()
+                elif not self.injector.send(step, playback.cancelled):
+                    self._logger.error("Could not play macro %s", playback.macro_bind)
+                    break
+
+            # Don't leave keys pressed by a cancelled macro held down
+            if started and playback.cancelled.is_set():
+                self.injector.release()
+        finally:
+            key = (playback.device_id, playback.macro_bind)
+            with self._lock:
+                playing = self._playing.get(key, [])
+                if playback in playing:
+                    playing.remove(playback)
+                if not playing:
+                    self._playing.pop(key, None)
+
+    def _run_worker(self):
+        """
+        Worker thread function, plays the macros which run scripts or open URLs
+        """
+        while True:
+            playback = self._worker_queue.get()
+            if playback is None or self._shutdown:
+                break
+
+            self._play(playback)
 
     def run(self):
         """
         Main thread function
         """
+        while True:
+            playback = self._queue.get()
+            if playback is None or self._shutdown:
+                break
 
-        # TODO move the xte-munging to the init
-        xte = ''
+            self._play(playback)
 
-        for event in self._macro_data:
-            if isinstance(event, MacroKey):
-                xte += self.xte_line(event)
-            else:
-                if xte != '':
-                    proc = subprocess.Popen(['xte'], stdin=subprocess.PIPE)
-                    proc.communicate(input=xte.encode('ascii'))
-                    xte = ''
+        for worker in self._workers:
+            worker.join(timeout=0.05)
+        self.injector.close()
 
-                # Now run everything else (this just allows for less calls to xte
-                if not isinstance(event, MacroKey):
-                    event.execute()
 
-        if xte != '':
-            proc = subprocess.Popen(['xte'], stdin=subprocess.PIPE)
-            proc.communicate(input=xte.encode('ascii'))
+# The player shared by all devices, started when the first macro is played
+_PLAYER = None
+_PLAYER_LOCK = threading.Lock()
 
-        self._logger.debug("Finished running macro %s", self._macro_bind)
+
+def add_macro_user(user):
+    """
+    Add a user to the shared macro player, starting it if needed
+
+    :param user: User, like a key manager
+    :type user: object
+
+    :return: Player
+    :rtype: MacroPlayer
+    """
+    global _PLAYER  # pylint: disable=global-statement
+
+    with _PLAYER_LOCK:
+        if _PLAYER is None:
+            _PLAYER = MacroPlayer()
+            _PLAYER.start()
+
+        _PLAYER.add(user)
+        return _PLAYER
+
+
+def remove_macro_user(player, user):
+    """
+    Remove a user from the shared macro player, stopping it if it was the last one
+
+    :param player: Player the user was added to
+    :type player: MacroPlayer
+
+    :param user: User
+    :type user: object
+
+    :return: False if the player could not be stopped
+    :rtype: bool
+    """
+    global _PLAYER  # pylint: disable=global-statement
+
+    with _PLAYER_LOCK:
+        if not player.remove(user):
+            return True
+
+        if player is _PLAYER:
+            _PLAYER = None
+
+    if player is not threading.current_thread():
+        player.join(timeout=2)
+    return not player.is_alive()
 
 
 def macro_dict_to_obj(macro_dict):
@@ -0,0 +1,188 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Stores the macros of the devices on disk
+
+Each device has a directory named after its serial, with a JSON file for every bind key so changing a macro
+only rewrites that file. The file has the macro and the policy of the bind key, as
+{"policy": POLICY, "macro": [MACRO_DICT...]} where either can be left out. Files with only the list of the
+macro, as they used to be, can still be read.
+"""
+import json
+import logging
+import os
+import tempfile
+import urllib.parse
+
+# Directory with the macros of all devices, None if they aren't stored
+_MACRO_DIRECTORY = None
+
+
+class MacroStore(object):
+    """
+    Macros of one device
+
+    :param directory: Directory of the device
+    :type directory: str
+    """
+    SUFFIX = '.json'
+
+    def __init__(self, directory):
+        self._logger = logging.getLogger('razer.macrostore')
+        self.directory = directory
+
+    def _path(self, macro_key):
+        """
+        Get the file of a bind key
+
+        :param macro_key: Macro bind key
+        :type macro_key: str
+
+        :return: Path
+        :rtype: str
+        """
+        return os.path.join(self.directory, urllib.parse.quote(macro_key, safe='') + self.SUFFIX)
+
+    def load(self):
+        """
+        Read the macros of the device
+
+        Files which can't be read are skipped.
+
+        :return: Dictionary of bind keys to (list of macro dicts or None, policy or None)
+        :rtype: dict
+        """
+        result = {}
+
+        try:
+            file_names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return result
+        except OSError as err:
+            self._logger.warning("Could not read the macros in %s: %s", self.directory, err)
+            return result
+
+        for file_name in sorted(file_names):
+            if not file_name.endswith(self.SUFFIX) or file_name.startswith('.'):
+                continue
+
+            path = os.path.join(self.directory, file_name)
+            try:
+                with open(path, 'r') as macro_file:
+                    macro_list = json.load(macro_file)
+            except (OSError, ValueError) as err:
+                self._logger.warning("Could not read the macro in %s: %s", path, err)
+                continue
+
+            if isinstance(macro_list, list):
+                policy = None
+            elif isinstance(macro_list, dict):
+                policy = macro_list.get('policy')
+                macro_list = macro_list.get('macro')
+            else:
+                self._logger.warning("Could not read the macro in %s: not an object", path)
+                continue
+
+            if (macro_list is not None and not isinstance(macro_list, list)) or (policy is not None and not isinstance(policy, str)):
+                self._logger.warning("Could not read the macro in %s: invalid macro or policy", path)
+                continue
+
+            result[urllib.parse.unquote(file_name[:-len(self.SUFFIX)])] = (macro_list, policy)
+
+        return result
+
+    def save(self, macro_key, macro_json, policy=None):
+        """
+        Write the macro and the policy of a bind key
+
+        The file is replaced atomically, so it is never left half written. If there is neither a macro nor a
+        policy the file is deleted.
+
+        :param macro_key: Macro bind key
+        :type macro_key: str
+
+        :param macro_json: JSON list of macro dicts, or None if the bind key has no macro
+        :type macro_json: str or None
+
+        :param policy: Policy of the bind key, or None for the default one
+        :type policy: str or None
+
+        :return: False if the macro could not be written
+        :rtype: bool
+        """
+        if macro_json is None and policy is None:
+            return self.delete(macro_key)
+
+        items = []
+        if policy is not None:
+            items.append('"policy": ' + json.dumps(policy))
+        if macro_json is not None:
+            items.append('"macro": ' + macro_json)
+        data = '{' + ', '.join(items) + '}'
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            fd, tmp_path = tempfile.mkstemp(prefix='.', suffix=self.SUFFIX, dir=self.directory)
+            try:
+                with os.fdopen(fd, 'w') as macro_file:
+                    macro_file.write(data)
+                    macro_file.flush()
+                    os.fsync(macro_file.fileno())
+                os.replace(tmp_path, self._path(macro_key))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as err:
+            self._logger.error("Could not write the macro of %s to %s: %s", macro_key, self.directory, err)
+            return False
+
+        return True
+
+    def delete(self, macro_key):
+        """
+        Delete the macro and the policy of a bind key
+
+        :param macro_key: Macro bind key
+        :type macro_key: str
+
+        :return: False if the macro could not be deleted
+        :rtype: bool
+        """
+        try:
+            os.unlink(self._path(macro_key))
+        except FileNotFoundError:
+            pass
+        except OSError as err:
+            self._logger.error("Could not delete the macro of %s from %s: %s", macro_key, self.directory, err)
+            return False
+
+        return True
+
+
+def set_macro_directory(directory):
+    """
+    Set the directory the macros of all devices are stored in
+
+    :param directory: Directory, or None to not store macros
+    :type directory: str or None
+    """
+    global _MACRO_DIRECTORY  # pylint: disable=global-statement
+
+    _MACRO_DIRECTORY = directory
+
+
+def get_macro_store(storage_name):
+    """
+    Get the macro store of a device
+
+    :param storage_name: Storage name of the device, its serial
+    :type storage_name: str
+
+    :return: Store or None if macros aren't stored
+    :rtype: MacroStore or None
+    """
+    if _MACRO_DIRECTORY is None:
+        return None
+
+    return MacroStore(os.path.join(_MACRO_DIRECTORY, urllib.parse.quote(storage_name, safe='')))
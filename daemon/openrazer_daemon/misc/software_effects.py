@@ -0,0 +1,493 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Contains the effects which are rendered by the daemon
+
+Each effect draws the next frame into a numpy array of shape (rows, cols, 3) given the time since
+the previous frame and the keys which have been pressed recently.
+"""
+import collections
+import functools
+import math
+
+import numpy as np
+
+# pylint: disable=import-error
+from openrazer_daemon.misc.key_event_management import COLOUR_CHOICES
+
+KeyEvents = collections.namedtuple('KeyEvents', ['ages', 'rows', 'cols', 'colours'])
+KeyEvents.__doc__ = """
+Recent key presses, oldest first
+
+:param ages: Seconds since each press, float64 array
+:param rows: Matrix row of each key, intp array
+:param cols: Matrix column of each key, intp array
+:param colours: Random colour of each press, uint8 array of shape (presses, 3)
+"""
+
+NO_KEY_EVENTS = KeyEvents(np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp), np.zeros((0, 3), dtype=np.uint8))
+
+
+class SoftwareEffect(object):
+    """
+    Base class of the effects rendered by the effect engine
+
+    If the colour is None the effect picks random colours.
+
+    :param rows: Number of rows of the matrix
+    :type rows: int
+
+    :param cols: Number of columns of the matrix
+    :type cols: int
+
+    :param colour: Colour tuple like (0, 255, 255) or None
+    :type colour: tuple or None
+    """
+    NAME = None
+
+    def __init__(self, rows, cols, colour=None):
+        self.rows = rows
+        self.cols = cols
+        self.colour = colour
+
+        self._rng = np.random.default_rng()
+
+    def render(self, frame, dt, key_events):
+        """
+        Draw the next frame
+
+        The frame still contains the previous frame when this is called.
+
+        :param frame: uint8 array of shape (rows, cols, 3)
+        :type frame: numpy.ndarray
+
+        :param dt: Seconds since the previous frame
+        :type dt: float
+
+        :param key_events: Recent key presses
+        :type key_events: KeyEvents
+        """
+        raise NotImplementedError()
+
+    def is_idle(self, key_events):
+        """
+        Check if the effect has nothing left to draw
+
+        An idle effect renders a blank frame and is not rendered again until a key is pressed.
+
+        :param key_events: Recent key presses
+        :type key_events: KeyEvents
+
+        :return: True if the frame would stay blank until a key is pressed
+        :rtype: bool
+        """
+        return False
+
+    def _random_colours(self, count):
+        """
+        Pick random colours from the ripple colour choices
+
+        :param count: Number of colours
+        :type count: int
+
+        :return: Array of shape (count, 3)
+        :rtype: numpy.ndarray
+        """
+        return np.array(COLOUR_CHOICES, dtype='float32')[self._rng.integers(len(COLOUR_CHOICES), size=count)]
+
+    def _new_presses(self, dt, key_events):
+        """
+        Get the keys which were pressed since the previous frame
+
+        :param dt: Seconds since the previous frame
+        :type dt: float
+
+        :param key_events: Recent key presses
+        :type key_events: KeyEvents
+
+        :return: Tuple of (rows, cols) arrays of the keys inside the matrix, usable as an index
+        :rtype: tuple
+        """
+        new = key_events.ages <= dt
+        new &= (key_events.rows >= 0) & (key_events.rows < self.rows) & (key_events.cols >= 0) & (key_events.cols < self.cols)
+
+        return key_events.rows[new], key_events.cols[new]
+
+
+def _pixel_positions(rows, cols):
+    """
+    Get the physical position of every LED of the matrix
+
+    :param rows: Number of rows of the matrix
+    :type rows: int
+
+    :param cols: Number of columns of the matrix
+    :type cols: int
+
+    :return: Tuple of float arrays (rows, cols) in matrix order
+    :rtype: tuple
+    """
+    pixel_rows, pixel_cols = np.divmod(np.arange(rows * cols), cols)
+    pixel_rows = pixel_rows.astype('float64')
+    pixel_cols = pixel_cols.astype('float64')
+
+    if rows == 6 and cols == 22:
+        # The logo location is physically at (6, 11), logically at (0, 20)
+        pixel_rows[20] = 6
+        pixel_cols[20] = 11
+
+    return pixel_rows, pixel_cols
+
+
+@functools.lru_cache(maxsize=None)
+def _distance_table(rows, cols):
+    """
+    Get the distance between every key of the matrix and every LED
+
+    The table is shared by all devices with the same matrix size so it is only calculated once.
+
+    :param rows: Number of rows of the matrix
+    :type rows: int
+
+    :param cols: Number of columns of the matrix
+    :type cols: int
+
+    :return: Read-only array of shape (rows * cols, rows * cols), indexed by [key_row * cols + key_col, LED]
+    :rtype: numpy.ndarray
+    """
+    pixel_rows, pixel_cols = _pixel_positions(rows, cols)
+    key_rows, key_cols = np.divmod(np.arange(rows * cols), cols)
+
+    table = np.hypot(key_rows[:, np.newaxis] - pixel_rows, key_cols[:, np.newaxis] - pixel_cols)
+    table.flags.writeable = False
+
+    return table
+
+
+class RippleEffect(SoftwareEffect):
+    """
+    Rings which grow outwards from every key that is pressed
+    """
+    NAME = 'ripple'
+
+    # Ring growth in keys per second and width of the ring in keys
+    SPEED = 24
+    WIDTH = 2
+
+    def __init__(self, rows, cols, colour=None):
+        super().__init__(rows, cols, colour)
+
+        self._distances = _distance_table(rows, cols)
+        self._pixel_rows, self._pixel_cols = _pixel_positions(rows, cols)
+
+        # LED to (row, col) of the frame, as the LEDs of the table are in matrix order
+        self._frame_rows, self._frame_cols = np.divmod(np.arange(rows * cols), cols)
+
+        # Age after which a ripple has left the matrix, whichever key it started from
+        self._max_age = (math.hypot(max(self._pixel_rows.max(), rows), max(self._pixel_cols.max(), cols)) + self.WIDTH) / self.SPEED
+
+        self._allocate(16)
+
+    def is_idle(self, key_events):
+        return not (key_events.ages <= self._max_age).any()
+
+    def _allocate(self, count):
+        """
+        Allocate the buffers for a number of simultaneous ripples
+
+        :param count: Number of ripples
+        :type count: int
+        """
+        pixels = self.rows * self.cols
+
+        self._capacity = count
+        self._ripple_distances = np.zeros((count, pixels), dtype='float64')
+        self._radiuses = np.zeros((count, 1), dtype='float64')
+        self._colours = np.zeros((count, 3), dtype='uint8')
+        self._in_ring = np.zeros((count, pixels), dtype='bool')
+        self._scratch = np.zeros((count, pixels), dtype='bool')
+
+    def render(self, frame, dt, key_events):
+        frame.fill(0)
+
+        count = len(key_events.ages)
+        if not count:
+            return
+        if count > self._capacity:
+            self._allocate(count * 2)
+
+        distances = self._ripple_distances[:count]
+        radiuses = self._radiuses[:count]
+        key_rows, key_cols = key_events.rows, key_events.cols
+
+        if ((key_rows >= 0) & (key_rows < self.rows) & (key_cols >= 0) & (key_cols < self.cols)).all():
+            np.take(self._distances, key_rows * self.cols + key_cols, axis=0, out=distances)
+        else:
+            # Keys outside of the matrix are not in the table
+            np.hypot(key_rows[:, np.newaxis] - self._pixel_rows, key_cols[:, np.newaxis] - self._pixel_cols, out=distances)
+
+        # Current radius is based off a time metric
+        np.multiply(key_events.ages[:, np.newaxis], self.SPEED, out=radiuses)
+        if self.colour is None:
+            self._colours[:count] = key_events.colours
+        else:
+            self._colours[:count] = self.colour
+
+        # An LED is lit when rad >= distance >= rad - width
+        in_ring = self._in_ring[:count]
+        np.less_equal(distances, radiuses, out=in_ring)
+        np.subtract(radiuses, self.WIDTH, out=radiuses)
+        np.greater_equal(distances, radiuses, out=self._scratch[:count])
+        np.logical_and(in_ring, self._scratch[:count], out=in_ring)
+
+        # The first ripple which covers an LED sets its colour
+        lit = in_ring.any(axis=0)
+        first = in_ring.argmax(axis=0)[lit]
+
+        frame[self._frame_rows[lit], self._frame_cols[lit]] = self._colours[first]
+
+
+class StarlightEffect(SoftwareEffect):
+    """
+    Stars which light up random keys and fade out, pressed keys light up as well
+    """
+    NAME = 'starlight'
+
+    # Chance of a key lighting up per second and seconds a star takes to fade out
+    RATE = 0.1
+    FADE_TIME = 1.5
+
+    def __init__(self, rows, cols, colour=None):
+        super().__init__(rows, cols, colour)
+
+        self._intensity = np.zeros((rows, cols), dtype='float32')
+        self._random = np.zeros((rows, cols), dtype='float32')
+        self._new_stars = np.zeros((rows, cols), dtype='bool')
+        self._colours = np.zeros((rows, cols, 3), dtype='float32')
+        self._scratch = np.zeros((rows, cols, 3), dtype='float32')
+
+        if colour is not None:
+            self._colours[:] = colour
+
+    def render(self, frame, dt, key_events):
+        np.subtract(self._intensity, dt / self.FADE_TIME, out=self._intensity)
+        np.maximum(self._intensity, 0.0, out=self._intensity)
+
+        self._rng.random(dtype='float32', out=self._random)
+        np.less(self._random, self.RATE * dt, out=self._new_stars)
+        self._new_stars[self._new_presses(dt, key_events)] = True
+
+        count = np.count_nonzero(self._new_stars)
+        if count:
+            if self.colour is None:
+                self._colours[self._new_stars] = self._random_colours(count)
+            self._intensity[self._new_stars] = 1.0
+
+        np.multiply(self._colours, self._intensity[..., np.newaxis], out=self._scratch)
+        np.copyto(frame, self._scratch, casting='unsafe')
+
+
+class WaveEffect(SoftwareEffect):
+    """
+    A gradient which scrolls across the matrix
+
+    Without a colour this is a rainbow, with a colour it is a wave of brightness.
+    """
+    NAME = 'wave'
+
+    # Gradient cycles per second
+    SPEED = 0.25
+
+    def __init__(self, rows, cols, colour=None):
+        super().__init__(rows, cols, colour)
+
+        self._phase = 0.0
+        self._position = np.linspace(0.0, 1.0, cols, endpoint=False, dtype='float32')
+        self._hue = np.zeros(cols, dtype='float32')
+        self._scratch = np.zeros(cols, dtype='float32')
+        self._row = np.zeros((cols, 3), dtype='float32')
+
+        if colour is not None:
+            self._colour = np.array(colour, dtype='float32')
+
+    def render(self, frame, dt, key_events):
+        self._phase = (self._phase + dt * self.SPEED) % 1.0
+
+        np.subtract(self._position, self._phase, out=self._hue)
+        np.mod(self._hue, 1.0, out=self._hue)
+
+        if self.colour is None:
+            # Hue to RGB, each channel is a clipped triangle wave of the hue
+            np.multiply(self._hue, 6.0, out=self._hue)
+            for channel, (centre, sign) in enumerate(((3.0, 1.0), (2.0, -1.0), (4.0, -1.0))):
+                np.subtract(self._hue, centre, out=self._scratch)
+                np.abs(self._scratch, out=self._scratch)
+                np.multiply(self._scratch, sign, out=self._scratch)
+                np.add(self._scratch, -1.0 if sign > 0 else 2.0, out=self._scratch)
+                np.clip(self._scratch, 0.0, 1.0, out=self._scratch)
+                np.multiply(self._scratch, 255.0, out=self._row[:, channel])
+        else:
+            np.multiply(self._hue, 2 * math.pi, out=self._scratch)
+            np.cos(self._scratch, out=self._scratch)
+            np.multiply(self._scratch, -0.5, out=self._scratch)
+            np.add(self._scratch, 0.5, out=self._scratch)
+            np.multiply(self._scratch[:, np.newaxis], self._colour, out=self._row)
+
+        np.copyto(frame, self._row, casting='unsafe')
+
+
+class FireEffect(SoftwareEffect):
+    """
+    Flames which rise from the bottom of the matrix, pressed keys flare up
+
+    Without a colour the flames are red to yellow, with a colour they fade from black through the colour to white.
+    """
+    NAME = 'fire'
+
+    # Rate the heat rises and cools at, per second
+    RISE = 12.0
+    COOLING = 1.2
+
+    def __init__(self, rows, cols, colour=None):
+        super().__init__(rows, cols, colour)
+
+        # An extra row below the matrix which is the fuel of the fire
+        self._heat = np.zeros((rows + 1, cols), dtype='float32')
+        self._spread = np.zeros((rows, cols), dtype='float32')
+        self._random = np.zeros((rows + 1, cols), dtype='float32')
+        self._index = np.zeros((rows, cols), dtype=np.intp)
+
+        # Neighbours which contribute to the heat of a key, the row below counts twice
+        self._weights = np.full(cols, 4.0, dtype='float32')
+        if cols > 1:
+            self._weights[0] = self._weights[-1] = 3.0
+        else:
+            self._weights[0] = 2.0
+
+        # Upper rows cool faster so the flames taper off
+        self._cooling = np.linspace(2.0, 1.0, rows, dtype='float32')[:, np.newaxis] * self.COOLING
+
+        level = np.linspace(0.0, 1.0, 256, dtype='float32')[:, np.newaxis]
+        if colour is None:
+            self._palette = np.clip(np.hstack((level * 3.0, level * 3.0 - 1.0, level * 3.0 - 2.0)), 0.0, 1.0)
+        else:
+            colour = np.array(colour, dtype='float32') / 255.0
+            self._palette = np.where(level < 0.75, level / 0.75 * colour, colour + (level - 0.75) / 0.25 * (1.0 - colour))
+        self._palette = (self._palette * 255.0).astype('uint8')
+
+    def render(self, frame, dt, key_events):
+        heat = self._heat
+        self._rng.random(dtype='float32', out=self._random)
+
+        # Flickering fuel
+        np.multiply(self._random[-1], 0.5, out=heat[-1])
+        np.add(heat[-1], 0.5, out=heat[-1])
+
+        # Heat of each key moves towards the average of the keys below it
+        np.multiply(heat[1:], 2.0, out=self._spread)
+        if self.cols > 1:
+            np.add(self._spread[:, 1:], heat[1:, :-1], out=self._spread[:, 1:])
+            np.add(self._spread[:, :-1], heat[1:, 1:], out=self._spread[:, :-1])
+        np.divide(self._spread, self._weights, out=self._spread)
+        np.subtract(self._spread, heat[:-1], out=self._spread)
+        np.multiply(self._spread, min(1.0, self.RISE * dt), out=self._spread)
+        np.add(heat[:-1], self._spread, out=heat[:-1])
+
+        # Random cooling
+        np.multiply(self._random[:-1], self._cooling * dt, out=self._spread)
+        np.subtract(heat[:-1], self._spread, out=heat[:-1])
+        np.clip(heat, 0.0, 1.0, out=heat)
+
+        heat[self._new_presses(dt, key_events)] = 1.0
+
+        np.multiply(heat[:-1], 255.0, out=self._spread)
+        np.copyto(self._index, self._spread, casting='unsafe')
+        np.take(self._palette, self._index, axis=0, out=frame, mode='clip')
+
+
+class BreathingEffect(SoftwareEffect):
+    """
+    Every key breathes on its own at a slightly different rate, pressed keys jump to full brightness
+    """
+    NAME = 'breathing'
+
+    # Range of seconds a breath takes
+    MIN_PERIOD = 2.0
+    MAX_PERIOD = 5.0
+
+    def __init__(self, rows, cols, colour=None):
+        super().__init__(rows, cols, colour)
+
+        self._phase = self._rng.random((rows, cols), dtype='float32')
+        self._rate = (1.0 / self._rng.uniform(self.MIN_PERIOD, self.MAX_PERIOD, (rows, cols))).astype('float32')
+        self._level = np.zeros((rows, cols), dtype='float32')
+        self._scratch = np.zeros((rows, cols, 3), dtype='float32')
+
+        if colour is None:
+            self._colours = self._random_colours(rows * cols).reshape(rows, cols, 3)
+        else:
+            self._colours = np.zeros((rows, cols, 3), dtype='float32')
+            self._colours[:] = colour
+
+    def render(self, frame, dt, key_events):
+        np.multiply(self._rate, dt, out=self._level)
+        np.add(self._phase, self._level, out=self._phase)
+        np.mod(self._phase, 1.0, out=self._phase)
+
+        self._phase[self._new_presses(dt, key_events)] = 0.5
+
+        np.multiply(self._phase, 2 * math.pi, out=self._level)
+        np.cos(self._level, out=self._level)
+        np.multiply(self._level, -0.5, out=self._level)
+        np.add(self._level, 0.5, out=self._level)
+
+        np.multiply(self._colours, self._level[..., np.newaxis], out=self._scratch)
+        np.copyto(frame, self._scratch, casting='unsafe')
+
+
+# Effects which can be selected with setSoftwareEffect
+SOFTWARE_EFFECTS = {effect.NAME: effect for effect in (RippleEffect, StarlightEffect, WaveEffect, FireEffect, BreathingEffect)}
+
+
+def persistence_name(effect_name, random_colour):
+    """
+    Get the name a software effect is persisted as
+
+    :param effect_name: Name of the effect like 'fire'
+    :type effect_name: str
+
+    :param random_colour: If the effect uses random colours
+    :type random_colour: bool
+
+    :return: Name like 'softwareFireRandomColour'
+    :rtype: str
+    """
+    result = 'software' + effect_name[0].upper() + effect_name[1:]
+    if random_colour:
+        result += 'RandomColour'
+    return result
+
+
+def parse_persistence_name(value):
+    """
+    Get the software effect from a persisted effect name
+
+    :param value: Persisted effect name
+    :type value: str
+
+    :return: Tuple of (effect_name, random_colour) or None if it is not a software effect
+    :rtype: tuple or None
+    """
+    if not value.startswith('software'):
+        return None
+
+    random_colour = value.endswith('RandomColour')
+    if random_colour:
+        value = value[:-len('RandomColour')]
+
+    effect_name = value[len('software'):]
+    effect_name = effect_name[:1].lower() + effect_name[1:]
+    if effect_name not in SOFTWARE_EFFECTS:
+        return None
+
+    return effect_name, random_colour
@@ -0,0 +1,179 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Lighting state of the zones of a device
+
+A device only allocates the states of the zones it has. The states can still be used like the dicts the
+devices used to have, so the DBus methods can keep indexing them by key.
+"""
+import collections.abc
+import configparser
+
+DEFAULT_COLORS = bytes((0, 255, 0, 0, 255, 255, 0, 0, 255))
+
+
+class ZoneState(collections.abc.Mapping):
+    """
+    State of a lighting zone
+
+    The 3 colours are stored as 9 bytes. Indexing the state by key is a view of its attributes.
+
+    :param present: If the device has the zone
+    :type present: bool
+    """
+    __slots__ = ('present', 'active', 'brightness', 'effect', 'colors', 'speed', 'wave_dir')
+    KEYS = frozenset(__slots__)
+
+    def __init__(self, present=False):
+        self.present = present
+        self.active = True
+        self.brightness = 75.0
+        self.effect = 'spectrum'
+        self.colors = bytearray(DEFAULT_COLORS)
+        self.speed = 1
+        self.wave_dir = 1
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.KEYS:
+            raise KeyError(key)
+
+        if key == 'colors':
+            value = bytearray(value)
+            if len(value) != len(DEFAULT_COLORS):
+                raise ValueError('There must be exactly 9 colors')
+
+        setattr(self, key, value)
+
+    def __iter__(self):
+        # In the order of __slots__, KEYS is only for lookups
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        return "ZoneState({0})".format(self.as_dict())
+
+    def as_dict(self):
+        """
+        Copy the state into a dict
+
+        :return: Dictionary of the keys of the state to their values, with the colours as a list
+        :rtype: dict
+        """
+        result = dict(self.items())
+        result['colors'] = list(self.colors)
+
+        return result
+
+    def write_persistence(self, section, name):
+        """
+        Write the state into the persistence file
+
+        :param section: Section of the device in the persistence file
+        :type section: configparser.SectionProxy or dict
+
+        :param name: Zone name
+        :type name: str
+        """
+        section[name + '_active'] = str(self.active)
+        section[name + '_brightness'] = str(self.brightness)
+        section[name + '_effect'] = self.effect
+        section[name + '_colors'] = ' '.join(str(color) for color in self.colors)
+        section[name + '_speed'] = str(self.speed)
+        section[name + '_wave_dir'] = str(self.wave_dir)
+
+    def read_persistence(self, persistence, section_name, name, logger):
+        """
+        Read the state from the persistence file
+
+        Options which are missing keep their current value, invalid colours are reset to the defaults.
+
+        :param persistence: Persistence file
+        :type persistence: configparser.ConfigParser
+
+        :param section_name: Section of the device
+        :type section_name: str
+
+        :param name: Zone name
+        :type name: str
+
+        :param logger: Logger of the device
+        :type logger: logging.Logger
+        """
+        section = persistence[section_name]
+
+        # try reading the effect name from the persistence
+        try:
+            self.effect = section[name + '_effect']
+        except KeyError:
+            logger.info("Failed to get " + name + " effect from persistence storage, using default.")
+
+        # zone active status
+        try:
+            self.active = persistence.getboolean(section_name, name + '_active')
+        except (KeyError, configparser.NoOptionError):
+            logger.info("Failed to get " + name + " active from persistence storage, using default.")
+
+        # brightness
+        try:
+            self.brightness = float(section[name + '_brightness'])
+        except KeyError:
+            logger.info("Failed to get " + name + " brightness from persistence storage, using default.")
+
+        # colors.
+        # these are stored as a string that must contain 9 numbers, separated with spaces.
+        try:
+            # bytearray checks if the colors are in range
+            colors = bytearray(int(item) for item in section[name + '_colors'].split(" "))
+
+            # check if we have exactly 9 colors
+            if len(colors) != len(DEFAULT_COLORS):
+                raise ValueError('There must be exactly 9 colors')
+
+            self.colors = colors
+        except ValueError:
+            # invalid colors. reinitialize
+            self.colors = bytearray(DEFAULT_COLORS)
+            logger.info("Invalid " + name + " colors; restoring to defaults.")
+        except KeyError:
+            logger.info("Failed to get " + name + " colors from persistence storage, using default.")
+
+        # speed
+        try:
+            self.speed = int(section[name + '_speed'])
+        except KeyError:
+            logger.info("Failed to get " + name + " speed from persistence storage, using default.")
+
+        # wave direction
+        try:
+            self.wave_dir = int(section[name + '_wave_dir'])
+        except KeyError:
+            logger.info("Failed to get " + name + " wave direction from persistence storage, using default.")
+
+
+class ZoneStates(dict):
+    """
+    Zone states of a device, by zone name
+
+    Looking up a zone the device doesn't have allocates a state for it which isn't present.
+    """
+
+    def __missing__(self, key):
+        self[key] = ZoneState()
+        return self[key]
+
+    def as_dict(self):
+        """
+        Copy the states into dicts
+
+        :return: Dictionary of zone names to state dicts
+        :rtype: dict
+        """
+        return {name: state.as_dict() for name, state in self.items()}
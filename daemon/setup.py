@@ -10,6 +10,7 @@ setup(
     install_requires=[
         "daemonize >= 2.4.7",
         "dbus-python >= 1.2.0",
+        "numpy >= 1.11.0",
         "PyGObject >= 3.20.0",
         "pyudev >= 0.16.1",
         "setproctitle >= 1.1.8",
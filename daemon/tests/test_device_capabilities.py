@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import unittest
+
+try:
+    import openrazer_daemon.hardware as hardware
+    from openrazer_daemon.hardware.device_base import RazerDevice
+
+    DEVICE_CLASSES = hardware.get_device_classes()
+except ImportError:
+    # The device classes need dbus and gi
+    DEVICE_CLASSES = None
+
+
+@unittest.skipIf(DEVICE_CLASSES is None, "dbus or gi isn't installed")
+class DeviceCapabilitiesTest(unittest.TestCase):
+    def test_method_names(self):
+        for device_class in DEVICE_CLASSES:
+            with self.subTest(device_class=device_class.__name__):
+                self.assertIsInstance(device_class.METHOD_NAMES, frozenset)
+                self.assertEqual(device_class.METHOD_NAMES, set(device_class.METHODS))
+
+    def test_present_zones(self):
+        for device_class in DEVICE_CLASSES:
+            methods = device_class.METHODS
+            present_zones = []
+            for i in device_class.ZONES:
+                if (i == 'backlight' and ('set_static_effect' in methods or 'bw_set_static' in methods)) \
+                        or 'set_' + i + '_static_classic' in methods or 'set_' + i + '_static' in methods \
+                        or 'set_' + i + '_active' in methods or 'set_' + i + '_on' in methods:
+                    present_zones.append(i)
+
+            with self.subTest(device_class=device_class.__name__):
+                self.assertEqual(device_class.PRESENT_ZONES, tuple(present_zones))
+
+    def test_persistence_schema(self):
+        class DeviceWithDPI(RazerDevice):
+            METHODS = ['get_dpi_xy', 'set_dpi_xy', 'set_poll_rate', 'set_bho', 'set_logo_active', 'set_logo_brightness']
+
+        self.assertTrue(DeviceWithDPI.HAS_DPI)
+        self.assertEqual(DeviceWithDPI.PERSISTENCE_SCHEMA, (('poll_rate', int, "poll rate"), ('bho', int, "battery health optimizer")))
+        self.assertEqual(DeviceWithDPI.PRESENT_ZONES, ('logo',))
+        self.assertEqual(DeviceWithDPI.ZONE_SETTERS['logo'], ('setLogoActive', 'setLogoBrightness'))
+        self.assertEqual(DeviceWithDPI.ZONE_SETTERS['scroll'], (None, None))
+
+    def test_unknown_method(self):
+        with self.assertRaisesRegex(RuntimeError, 'set_unknown_effect'):
+            class DeviceWithUnknownMethod(RazerDevice):
+                METHODS = ['get_device_type_keyboard', 'set_unknown_effect']
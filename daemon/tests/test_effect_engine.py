@@ -0,0 +1,278 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import time
+import unittest
+
+import openrazer_daemon.misc.effect_engine as effect_engine
+import openrazer_daemon.misc.key_store as key_store
+import openrazer_daemon.misc.latency as latency
+
+
+class DummyKeyManager(object):
+    temp_key_store_state = False
+    temp_key_store_callback = None
+
+    def __init__(self):
+        self.store = key_store.KeyStore()
+        self.latency = latency.KeyLatencyStatistics()
+
+    @property
+    def temp_key_store(self):
+        return self.store.snapshot()
+
+    def press(self, key, event_time_ns=None):
+        self.store.add(key, (255, 0, 0), event_time_ns=event_time_ns)
+        self.temp_key_store_callback()
+
+
+class FakeClock(object):
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class DummyDevice(object):
+    MATRIX_DIMS = (6, 22)
+
+    def __init__(self, upload_time=0.0, clock=None):
+        self.key_manager = DummyKeyManager()
+        self.upload_time = upload_time
+        self.clock = clock
+        self.frames = 0
+
+    def register_observer(self, observer):
+        pass
+
+    def _set_key_row(self, payload):
+        self.payload = bytes(payload)
+
+    def _set_custom_effect(self):
+        if self.clock is None:
+            time.sleep(self.upload_time)
+        else:
+            self.clock.advance(self.upload_time)
+        self.frames += 1
+
+
+class FrameStatisticsTest(unittest.TestCase):
+    def test_statistics(self):
+        statistics = effect_engine.FrameStatistics()
+        statistics.reset(0.05)
+
+        for frame in range(0, 11):
+            statistics.add_frame(frame * 0.05, 0.001, 0.003 if frame == 5 else 0.002)
+
+        result = statistics.as_dict()
+        self.assertAlmostEqual(result['fps'], 20.0)
+        self.assertAlmostEqual(result['target_fps'], 20.0)
+        self.assertAlmostEqual(result['render_ms'], 1.0)
+        self.assertAlmostEqual(result['upload_max_ms'], 3.0)
+        self.assertEqual(result['skipped_frames'], 0.0)
+
+    def test_empty_statistics(self):
+        result = effect_engine.FrameStatistics().as_dict()
+
+        self.assertEqual(result['fps'], 0.0)
+        self.assertEqual(result['target_fps'], 0.0)
+
+
+class EffectManagerTest(unittest.TestCase):
+    def render_frames(self, upload_time, frames, refresh_rate=0.0625):
+        """
+        Render frames of a wave effect with a fake clock, waking up exactly when each frame is due
+
+        The times are multiples of 1/64 so the deadlines are exact.
+        """
+        clock = FakeClock(10.0)
+        device = DummyDevice(upload_time, clock)
+        manager = effect_engine.EffectManager(device, 0, effect_engine.EffectScheduler(), clock)
+        try:
+            manager.notify(('effect', device, 'setSoftwareEffectRandomColour', 'wave', refresh_rate))
+
+            deadlines = []
+            for _ in range(0, frames):
+                deadlines.append(manager._renderer.render_frame())
+                clock.now = deadlines[-1]
+        finally:
+            manager.close()
+
+        return deadlines, manager.statistics
+
+    def test_deadline_schedule(self):
+        deadlines, statistics = self.render_frames(0.03125, 4)
+
+        # The frame time is not added on top of the refresh rate
+        self.assertEqual(deadlines, [10.0625, 10.125, 10.1875, 10.25])
+        self.assertEqual(statistics['skipped_frames'], 0)
+        self.assertEqual(statistics['fps'], 16.0)
+        self.assertEqual(statistics['upload_ms'], 31.25)
+
+    def test_skips_frames_when_behind(self):
+        deadlines, statistics = self.render_frames(0.140625, 3)
+
+        # Each upload overruns 2 deadlines, the next frame is due on the first one after it
+        self.assertEqual(deadlines, [10.1875, 10.375, 10.5625])
+        self.assertEqual(statistics['skipped_frames'], 6)
+        self.assertEqual(statistics['upload_ms'], 140.625)
+        self.assertAlmostEqual(statistics['fps'], 1 / 0.1875)
+
+    def test_refresh_rate_too_low(self):
+        for refresh_rate in (0.0, -1.0, float('nan')):
+            with self.subTest(refresh_rate=refresh_rate):
+                deadlines, statistics = self.render_frames(0.0, 3, refresh_rate)
+
+                # Keeps rendering at the minimum refresh rate
+                for deadline, expected in zip(deadlines, (10.001, 10.002, 10.003)):
+                    self.assertAlmostEqual(deadline, expected)
+                self.assertEqual(statistics['skipped_frames'], 0)
+                self.assertAlmostEqual(statistics['target_fps'], 1000.0)
+
+    def test_enable_while_rendering(self):
+        clock = FakeClock(10.0)
+        device = DummyDevice(clock=clock)
+        manager = effect_engine.EffectManager(device, 0, effect_engine.EffectScheduler(), clock)
+        renderer = manager._renderer
+        try:
+            manager.notify(('effect', device, 'setSoftwareEffectRandomColour', 'wave', 0.0625))
+
+            # The DBus thread enables an effect while the frame is uploaded
+            upload = device._set_custom_effect
+
+            def enable_during_upload():
+                upload()
+                renderer.enable(renderer.effect, 0.125)
+
+            device._set_custom_effect = enable_during_upload
+            self.assertEqual(renderer.render_frame(), 10.0625)
+        finally:
+            manager.close()
+
+    def test_other_effect_stops(self):
+        device = DummyDevice()
+        manager = effect_engine.EffectManager(device, 0)
+        try:
+            manager.notify(('effect', device, 'setRipple', 0, 255, 0, 0.01))
+            time.sleep(0.05)
+            self.assertTrue(device.key_manager.temp_key_store_state)
+
+            manager.notify(('effect', device, 'setStatic', 0, 255, 0))
+            time.sleep(0.03)
+            frames = device.frames
+            time.sleep(0.05)
+            self.assertEqual(device.frames, frames)
+            self.assertFalse(device.key_manager.temp_key_store_state)
+        finally:
+            manager.close()
+
+    def test_ripple_idle(self):
+        device = DummyDevice()
+        manager = effect_engine.EffectManager(device, 0)
+        try:
+            manager.notify(('effect', device, 'setRipple', 0, 255, 0, 0.01))
+            time.sleep(0.05)
+
+            # Nobody is typing so only the blank frame is sent
+            self.assertEqual(device.frames, 1)
+
+            device.key_manager.press((2, 2))
+            time.sleep(0.05)
+            self.assertGreater(device.frames, 1)
+            self.assertNotEqual(device.payload[2 * 69 + 3:3 * 69], bytes(66))
+
+            # The final frame is blank then the thread waits again
+            device.key_manager.store.clear()
+            time.sleep(0.03)
+            frames = device.frames
+            time.sleep(0.05)
+            self.assertEqual(device.frames, frames)
+            self.assertEqual(device.payload[3:69], bytes(66))
+        finally:
+            manager.close()
+
+    def test_key_latency(self):
+        device = DummyDevice()
+        manager = effect_engine.EffectManager(device, 0)
+        try:
+            manager.notify(('effect', device, 'setRipple', 0, 255, 0, 0.01))
+            time.sleep(0.03)
+
+            device.key_manager.press((2, 2), event_time_ns=time.monotonic_ns() - 3000000)
+            time.sleep(0.05)
+        finally:
+            manager.close()
+
+        # The press is only counted in the first frame which shows it
+        statistics = manager.statistics
+        self.assertEqual(statistics['latency_render_count'], 1)
+        self.assertEqual(statistics['latency_upload_count'], 1)
+        self.assertEqual(statistics['latency_total_count'], 1)
+        self.assertGreaterEqual(statistics['latency_total_p50_ms'], 3.0)
+        self.assertLess(statistics['latency_render_p50_ms'], 20.0)
+
+    def test_scheduler_order(self):
+        clock = FakeClock(10.0)
+        scheduler = effect_engine.EffectScheduler(clock)
+        devices = [DummyDevice(clock=clock) for _ in range(0, 4)]
+        managers = [effect_engine.EffectManager(device, number, scheduler, clock) for number, device in enumerate(devices)]
+        renderers = [manager._renderer for manager in managers]
+        try:
+            # Each device renders at its own refresh rate, frames due at the same time are rendered in the order they were scheduled
+            for manager, device, refresh_rate in zip(managers, devices, (0.0625, 0.125, 0.125, 0.25)):
+                manager.notify(('effect', device, 'setSoftwareEffectRandomColour', 'fire', refresh_rate))
+
+            frames = []
+            while scheduler._heap[0][0] <= 10.25:
+                clock.now = scheduler._heap[0][0]
+                renderer = scheduler._next_renderer()
+                frames.append((clock.now, renderers.index(renderer)))
+                scheduler.schedule(renderer, renderer.render_frame())
+
+            self.assertEqual(frames, [
+                (10.0, 0), (10.0, 1), (10.0, 2), (10.0, 3),
+                (10.0625, 0),
+                (10.125, 1), (10.125, 2), (10.125, 0),
+                (10.1875, 0),
+                (10.25, 3), (10.25, 1), (10.25, 2), (10.25, 0),
+            ])
+            self.assertEqual([device.frames for device in devices], [5, 3, 3, 2])
+            self.assertEqual([scheduler._scheduled[renderer][0] for renderer in renderers], [10.3125, 10.375, 10.375, 10.5])
+
+            # A frame which is already scheduled earlier is not moved later
+            scheduler.schedule(renderers[3], 11.0)
+            self.assertEqual(scheduler._scheduled[renderers[3]][0], 10.5)
+            scheduler.schedule(renderers[3], 10.25)
+            self.assertEqual(scheduler._scheduled[renderers[3]][0], 10.25)
+
+            # Cancelled frames are skipped
+            scheduler.unschedule(renderers[3])
+            clock.now = 10.3125
+            self.assertIs(scheduler._next_renderer(), renderers[0])
+        finally:
+            for manager in managers:
+                manager.close()
+
+    def test_shared_scheduler(self):
+        devices = [DummyDevice() for _ in range(0, 4)]
+        managers = [effect_engine.EffectManager(device, number) for number, device in enumerate(devices)]
+        try:
+            scheduler = effect_engine._SCHEDULER
+            self.assertTrue(scheduler.is_alive())
+
+            for manager, device, refresh_rate in zip(managers, devices, (0.01, 0.02, 0.02, 0.04)):
+                manager.notify(('effect', device, 'setSoftwareEffectRandomColour', 'fire', refresh_rate))
+            time.sleep(0.2)
+
+            # The one thread renders all the devices
+            for device in devices:
+                self.assertGreater(device.frames, 0)
+        finally:
+            for manager in managers:
+                manager.close()
+
+        self.assertFalse(scheduler.is_alive())
+        self.assertIsNone(effect_engine._SCHEDULER)
@@ -158,3 +158,37 @@ class EffectSyncTest(unittest.TestCase):
 
         # Logger should have called .exception
         self.assertTrue(self.effect_sync._logger.exception.called)
+
+    def test_zone_effects(self):
+        calls = []
+
+        class DummyHardwareZones(DummyHardwareDevice):
+            def setLogoActive(self, active):
+                calls.append(('setLogoActive', active))
+
+            def setScrollPulsate(self, red, green, blue):
+                calls.append(('setScrollPulsate', red, green, blue))
+
+            def setLogoBreathRandom(self):
+                calls.append(('setLogoBreathRandom',))
+
+            def setScrollNone(self):
+                calls.append(('setScrollNone',))
+
+        self.hardware_device = DummyHardwareZones()
+        self.effect_sync._parent = self.hardware_device
+
+        self.effect_sync.run_effect('setBreathRandom')
+        self.effect_sync.run_effect('setNone')
+
+        # The zones are activated before the similar effects are run
+        self.assertListEqual(calls, [('setLogoActive', True), ('setScrollPulsate', 0, 255, 0), ('setLogoBreathRandom',), ('setScrollNone',)])
+
+    def test_plan_cached(self):
+        self.effect_sync.build_plan = unittest.mock.MagicMock(wraps=self.effect_sync.build_plan)
+
+        self.effect_sync.notify(MSG1)
+        self.effect_sync.notify(('effect', None, 'setBrightness', 100))
+
+        self.assertEqual(self.effect_sync.build_plan.call_count, 1)
+        self.assertEqual(self.hardware_device.effect_call, ('setBrightness', 100))
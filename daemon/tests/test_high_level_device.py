@@ -1,5 +1,7 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+import threading
+import time
 import unittest
 
 import openrazer_daemon.device
@@ -10,11 +12,15 @@ DEVICE1_ID = '0000:0000:0000.0000'
 DEVICE2_SERIAL = 'XX000001'
 DEVICE2_ID = '0000:0000:0000.0001'
 
+DEVICE3_SERIAL = 'XX000002'
+DEVICE3_ID = '0000:0000:0000.0002'
+
 
 class DummyDBusObject(object):
     def __init__(self):
         self.notify_msg = None
         self.parent = None
+        self.lock = threading.RLock()
 
     def notify(self, msg):
         self.notify_msg = msg
@@ -26,6 +32,38 @@ class DummyDBusObject(object):
         self.parent.notify_parent(msg)
 
 
+class SlowDBusObject(DummyDBusObject):
+    def __init__(self):
+        super().__init__()
+        self.proceed = threading.Event()
+        self.notified = threading.Event()
+
+    def notify(self, msg):
+        self.proceed.wait(2)
+        super().notify(msg)
+        self.notified.set()
+
+
+class RecordingDBusObject(DummyDBusObject):
+    def __init__(self, expected_messages):
+        super().__init__()
+        self.calls = []
+        self.expected_messages = expected_messages
+        self.notified = threading.Event()
+
+    def set_effect(self, name):
+        self.calls.append(('start', name))
+        time.sleep(0.001)
+        self.calls.append(('end', name))
+
+    def notify(self, msg):
+        self.set_effect(msg)
+
+        self.expected_messages -= 1
+        if self.expected_messages == 0:
+            self.notified.set()
+
+
 class DummyParentObject(object):
     def __init__(self):
         self.notify_msg = None
@@ -211,3 +249,94 @@ class DeviceCollectionTest(unittest.TestCase):
         # Ensure message gets sent to other devices and not itself
         self.assertIs(dbus_object1.notify_msg, None)
         self.assertIs(dbus_object2.notify_msg, msg)
+
+    def test_async_cross_device_notify(self):
+        device_collection = openrazer_daemon.device.DeviceCollection(async_notify=True)
+        dbus_object1 = DummyDBusObject()
+        dbus_object2 = SlowDBusObject()
+        msg = ('effect', None, 'setSpectrum')
+
+        device_collection.add(DEVICE1_ID, DEVICE1_SERIAL, dbus_object1)
+        device_collection.add(DEVICE2_ID, DEVICE2_SERIAL, dbus_object2)
+
+        # Returns without waiting for the other device
+        dbus_object1.notify_parent(msg)
+        self.assertIs(dbus_object2.notify_msg, None)
+
+        dbus_object2.proceed.set()
+        self.assertTrue(dbus_object2.notified.wait(2))
+        self.assertIs(dbus_object2.notify_msg, msg)
+        self.assertIs(dbus_object1.notify_msg, None)
+
+        worker = device_collection[DEVICE2_ID]._worker
+        device_collection.remove(DEVICE2_ID)
+        self.assertFalse(worker.is_alive())
+
+    def test_worker_holds_device_lock(self):
+        device_collection = openrazer_daemon.device.DeviceCollection(async_notify=True)
+        dbus_object1 = SlowDBusObject()
+        dbus_object2 = RecordingDBusObject(10)
+
+        device_collection.add(DEVICE1_ID, DEVICE1_SERIAL, dbus_object1)
+        device_collection.add(DEVICE2_ID, DEVICE2_SERIAL, dbus_object2)
+        device1 = device_collection[DEVICE1_ID]
+        device2 = device_collection[DEVICE2_ID]
+
+        try:
+            # The synced effects and the device's own DBus calls run one at a time
+            for index in range(0, 10):
+                dbus_object1.notify_parent(('effect', None, 'setBrightness', index))
+                with device2.lock:
+                    dbus_object2.set_effect(('dbus', index))
+
+            self.assertTrue(dbus_object2.notified.wait(2))
+            self.assertEqual(len(dbus_object2.calls), 40)
+            for start, end in zip(dbus_object2.calls[0::2], dbus_object2.calls[1::2]):
+                self.assertEqual((start[0], end[0]), ('start', 'end'))
+                self.assertEqual(start[1], end[1])
+
+            # Other devices aren't held up by the lock
+            dbus_object1.proceed.set()
+            with device2.lock:
+                dbus_object2.notify_parent(('effect', None, 'setSpectrum'))
+                self.assertTrue(dbus_object1.notified.wait(2))
+        finally:
+            device1.stop_worker()
+            device2.stop_worker()
+
+    def test_worker_drops_oldest(self):
+        dbus_object = DummyDBusObject()
+        device_object = openrazer_daemon.device.Device(DEVICE1_ID, DEVICE1_SERIAL, dbus_object)
+        worker = openrazer_daemon.device.DeviceWorker(device_object)
+
+        # Not started so nothing is taken off the queue
+        for index in range(0, openrazer_daemon.device.DeviceWorker.QUEUE_SIZE + 1):
+            worker.post(('effect', None, 'setBrightness', index))
+
+        self.assertEqual(worker._queue.get_nowait()[0], ('effect', None, 'setBrightness', 1))
+
+    def test_sync_groups(self):
+        dbus_object1 = DummyDBusObject()
+        dbus_object2 = DummyDBusObject()
+        dbus_object3 = DummyDBusObject()
+        msg = ('test', 1)
+
+        self.device_collection.add(DEVICE1_ID, DEVICE1_SERIAL, dbus_object1, 'desk')
+        self.device_collection.add(DEVICE2_ID, DEVICE2_SERIAL, dbus_object2)
+        self.device_collection.add(DEVICE3_ID, DEVICE3_SERIAL, dbus_object3, 'desk')
+
+        # Only sent within the group
+        dbus_object1.notify_parent(msg)
+        self.assertIs(dbus_object2.notify_msg, None)
+        self.assertIs(dbus_object3.notify_msg, msg)
+
+        dbus_object3.notify_msg = None
+        self.device_collection.set_sync_group(DEVICE2_SERIAL, 'desk')
+        self.device_collection.set_sync_group(DEVICE3_ID, 'headset')
+
+        dbus_object1.notify_parent(msg)
+        self.assertIs(dbus_object2.notify_msg, msg)
+        self.assertIs(dbus_object3.notify_msg, None)
+
+        self.device_collection.remove(DEVICE2_ID)
+        self.assertEqual(self.device_collection._sync_targets[self.device_collection[DEVICE1_ID]], ())
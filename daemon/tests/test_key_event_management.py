@@ -0,0 +1,317 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import unittest
+
+import openrazer_daemon.misc.key_event_management as key_event_management
+import openrazer_daemon.misc.macro_store as macro_store
+
+
+class DummyKeyManager(object):
+    def __init__(self):
+        self.events = []
+        self.received = threading.Event()
+
+    def key_action(self, event_time, key_id, key_press=key_event_management.KEY_PRESS):
+        self.events.append((event_time, key_id, key_press))
+        self.received.set()
+
+
+class KeyWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.event_file = os.path.join(self.tmp_dir, 'event-kbd')
+        os.mkfifo(self.event_file)
+        self.writer = os.open(self.event_file, os.O_RDWR)
+
+        self.parent = DummyKeyManager()
+        self.watcher = key_event_management.KeyWatcher(0, [self.event_file], self.parent)
+        self.watcher.start()
+
+    def tearDown(self):
+        if self.watcher.running:
+            self.watcher.stop()
+
+        os.close(self.writer)
+        shutil.rmtree(self.tmp_dir)
+
+    def wait_for_events(self, count):
+        deadline = time.monotonic() + 2
+        while len(self.parent.events) < count and time.monotonic() < deadline:
+            self.parent.received.wait(0.1)
+            self.parent.received.clear()
+
+    def test_bulk_events(self):
+        data = b''.join(struct.pack(key_event_management.EVENT_FORMAT, 10, 500000, key_event_management.EV_KEY, 30 + index, index % 3) for index in range(0, 100))
+        # Spacer record
+        data += struct.pack(key_event_management.EVENT_FORMAT, 10, 500000, 0, 0, 0)
+        os.write(self.writer, data)
+
+        self.wait_for_events(100)
+
+        self.assertEqual(len(self.parent.events), 100)
+        self.assertEqual([key_id for _, key_id, _ in self.parent.events], list(range(30, 130)))
+        self.assertEqual(self.parent.events[0][2], key_event_management.KEY_RELEASE)
+        self.assertEqual(self.parent.events[1][2], key_event_management.KEY_PRESS)
+        self.assertEqual(self.parent.events[2][2], key_event_management.KEY_AUTOREPEAT)
+        self.assertEqual(self.parent.events[0][0], 10500000000)
+
+    def test_partial_record(self):
+        data = struct.pack(key_event_management.EVENT_FORMAT, 1, 0, key_event_management.EV_KEY, 30, 1)
+
+        os.write(self.writer, data[:5])
+        time.sleep(0.05)
+        self.assertEqual(self.parent.events, [])
+
+        os.write(self.writer, data[5:])
+        self.wait_for_events(1)
+        self.assertEqual([key_id for _, key_id, _ in self.parent.events], [30])
+
+    def test_shutdown_is_immediate(self):
+        reactor = key_event_management._REACTOR
+
+        start = time.monotonic()
+        self.assertTrue(self.watcher.stop())
+
+        self.assertFalse(reactor.is_alive())
+        self.assertIsNone(key_event_management._REACTOR)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_shared_reactor(self):
+        event_file = os.path.join(self.tmp_dir, 'event-kbd-2')
+        os.mkfifo(event_file)
+        writer = os.open(event_file, os.O_RDWR)
+
+        parent = DummyKeyManager()
+        watcher = key_event_management.KeyWatcher(1, [event_file], parent)
+        watcher.start()
+        try:
+            # One thread watches the files of both devices
+            self.assertIs(key_event_management._REACTOR, self.watcher._reactor)
+            self.assertIs(key_event_management._REACTOR, watcher._reactor)
+
+            os.write(writer, struct.pack(key_event_management.EVENT_FORMAT, 1, 0, key_event_management.EV_KEY, 31, 1))
+            os.write(self.writer, struct.pack(key_event_management.EVENT_FORMAT, 1, 0, key_event_management.EV_KEY, 30, 1))
+
+            self.wait_for_events(1)
+            deadline = time.monotonic() + 2
+            while not parent.events and time.monotonic() < deadline:
+                parent.received.wait(0.1)
+
+            # Events go to the device they came from
+            self.assertEqual([key_id for _, key_id, _ in self.parent.events], [30])
+            self.assertEqual([key_id for _, key_id, _ in parent.events], [31])
+        finally:
+            # Removing a device keeps the reactor running for the others
+            self.assertTrue(watcher.stop())
+            os.close(writer)
+
+        self.assertTrue(self.watcher._reactor.is_alive())
+        os.write(self.writer, struct.pack(key_event_management.EVENT_FORMAT, 1, 0, key_event_management.EV_KEY, 32, 1))
+        self.wait_for_events(2)
+        self.assertEqual([key_id for _, key_id, _ in self.parent.events], [30, 32])
+
+
+class KeyEventBatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+        self.scheduled = []
+        self.batcher = key_event_management.KeyEventBatcher(self.batches.append, lambda delay, callback: self.scheduled.append((delay, callback)), 0.005)
+
+    def test_batches(self):
+        self.batcher.add(10, 1, 2, key_event_management.KEY_PRESS)
+        self.batcher.add(20, 3, 4, key_event_management.KEY_RELEASE)
+
+        # One flush is scheduled for the whole batch
+        self.assertEqual(len(self.scheduled), 1)
+        self.assertEqual(self.scheduled[0][0], 0.005)
+        self.assertEqual(self.batches, [])
+
+        self.assertFalse(self.scheduled[0][1]())
+        self.assertEqual(self.batches, [[(10, 0x0102, 1), (20, 0x0304, 0)]])
+
+        # The next event starts a new batch
+        self.batcher.add(30, 0, 1, key_event_management.KEY_AUTOREPEAT)
+        self.assertEqual(len(self.scheduled), 2)
+        self.scheduled[1][1]()
+        self.assertEqual(self.batches[1], [(30, 0x0001, 2)])
+
+    def test_empty_flush(self):
+        self.batcher.flush()
+
+        self.assertEqual(self.batches, [])
+
+
+class DummyDevice(object):
+    def __init__(self):
+        self.macro_mode = False
+
+    def register_observer(self, observer):
+        pass
+
+    def remove_observer(self, observer):
+        pass
+
+    def setMacroEffect(self, effect):
+        pass
+
+    def setMacroMode(self, enabled):
+        self.macro_mode = enabled
+
+
+class KeyboardKeyManagerTest(unittest.TestCase):
+    MACROMODE = 685
+    M1 = 183
+    KEY_A = 30
+    KEY_B = 48
+
+    def setUp(self):
+        self.manager = key_event_management.KeyboardKeyManager(0, [], DummyDevice(), testing=True)
+
+    def tearDown(self):
+        self.manager.close()
+
+    def test_record_macro(self):
+        events = (
+            (self.MACROMODE, key_event_management.KEY_PRESS),
+            (self.M1, key_event_management.KEY_PRESS),
+            (self.KEY_A, key_event_management.KEY_PRESS),
+            (self.KEY_A, key_event_management.KEY_RELEASE),
+            (self.KEY_B, key_event_management.KEY_AUTOREPEAT),
+            (self.KEY_B, key_event_management.KEY_PRESS),
+            (self.MACROMODE, key_event_management.KEY_PRESS),
+        )
+        for index, (key_id, key_press) in enumerate(events):
+            self.manager.key_action(1000000000 + index * 250000, key_id, key_press)
+
+        macros = json.loads(self.manager.dbus_get_macros())
+
+        # Events timestamped with another clock are not counted as read latency
+        self.assertEqual(self.manager.latency.histograms['read'].count, 0)
+        self.assertEqual(self.manager.latency.histograms['key_action'].count, 5)
+
+        # Autorepeat is ignored and the delays are in microseconds
+        self.assertEqual([(key['key_id'], key['state'], key['pre_pause']) for key in macros['M1']], [('A', 'DOWN', 0), ('A', 'UP', 250), ('B', 'DOWN', 500)])
+        self.assertFalse(self.manager._parent.macro_mode)
+
+    def test_record_long_delay(self):
+        events = (
+            (0, self.MACROMODE, key_event_management.KEY_PRESS),
+            (0, self.M1, key_event_management.KEY_PRESS),
+            (0, self.KEY_A, key_event_management.KEY_PRESS),
+            (2500000000, self.KEY_A, key_event_management.KEY_RELEASE),
+            (2500000000, self.MACROMODE, key_event_management.KEY_PRESS),
+        )
+        for delay, key_id, key_press in events:
+            self.manager.key_action(1000000000 + delay, key_id, key_press)
+
+        # The whole delay is kept, not only the part under a second
+        macros = json.loads(self.manager.dbus_get_macros())
+        self.assertEqual([(key['key_id'], key['state'], key['pre_pause']) for key in macros['M1']], [('A', 'DOWN', 0), ('A', 'UP', 2500000)])
+
+    def test_add_macro(self):
+        macro_json = json.dumps([
+            {'type': 'MacroKey', 'key_id': 'A', 'pre_pause': 0, 'state': 'DOWN'},
+            {'type': 'MacroURL', 'url': 'https://example.com'},
+        ])
+        self.manager.dbus_add_macro('M1', macro_json)
+        self.manager.dbus_add_macro('M2', macro_json)
+
+        macros_json = self.manager.dbus_get_macros()
+        self.assertEqual(json.loads(macros_json), {'M1': json.loads(macro_json), 'M2': json.loads(macro_json)})
+        # Cached until the macros change
+        self.assertIs(self.manager.dbus_get_macros(), macros_json)
+
+        self.manager.dbus_delete_macro('M2')
+        self.assertEqual(json.loads(self.manager.dbus_get_macros()), {'M1': json.loads(macro_json)})
+
+        self.manager.dbus_add_macro('M1', '[]')
+        self.assertEqual(self.manager.dbus_get_macros(), '{"M1": []}')
+
+    def test_macro_store(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.manager.macro_store = macro_store.MacroStore(tmp_dir)
+
+        macro_json = '[{"type": "MacroURL", "url": "https://example.com"}]'
+        self.manager.dbus_add_macro('M1', macro_json)
+        self.manager.dbus_add_macro('M2', macro_json)
+        self.manager.dbus_delete_macro('M2')
+
+        manager = key_event_management.KeyboardKeyManager(1, [], DummyDevice(), testing=True)
+        self.addCleanup(manager.close)
+        manager.macro_store = macro_store.MacroStore(tmp_dir)
+
+        # Loaded when first needed
+        self.assertEqual(manager._macros, {})
+        self.assertEqual(json.loads(manager.dbus_get_macros()), {'M1': json.loads(macro_json)})
+
+    def test_macro_policy_store(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.manager.macro_store = macro_store.MacroStore(tmp_dir)
+
+        macro_json = '[{"type": "MacroURL", "url": "https://example.com"}]'
+        self.manager.dbus_add_macro('M1', macro_json)
+        self.manager.dbus_set_macro_policy('M1', 'restart')
+        self.manager.dbus_set_macro_policy('M2', 'ignore')
+        self.manager.dbus_add_macro('M3', macro_json)
+        self.manager.dbus_set_macro_policy('M3', 'ignore')
+        self.manager.dbus_delete_macro('M3')
+
+        # A new manager, as after a restart, gets the policies back with the macros
+        manager = key_event_management.KeyboardKeyManager(1, [], DummyDevice(), testing=True)
+        self.addCleanup(manager.close)
+        manager.macro_store = macro_store.MacroStore(tmp_dir)
+
+        self.assertEqual(manager.dbus_get_macro_policy('M1'), 'restart')
+        self.assertEqual(manager.dbus_get_macro_policy('M2'), 'ignore')
+        self.assertEqual(manager.dbus_get_macro_policy('M3'), 'queue')
+        self.assertEqual(json.loads(manager.dbus_get_macros()), {'M1': json.loads(macro_json)})
+
+        # Setting the default policy keeps the macro
+        manager.dbus_set_macro_policy('M1', 'queue')
+        manager.dbus_set_macro_policy('M2', 'queue')
+        self.assertEqual(macro_store.MacroStore(tmp_dir).load(), {'M1': (json.loads(macro_json), None)})
+
+    def test_macro_policy(self):
+        self.assertEqual(self.manager.dbus_get_macro_policy('M1'), 'queue')
+
+        self.manager.dbus_set_macro_policy('M1', 'restart')
+        self.assertEqual(self.manager.dbus_get_macro_policy('M1'), 'restart')
+        self.assertEqual(self.manager.dbus_get_macro_policy('M2'), 'queue')
+
+        with self.assertRaises(ValueError):
+            self.manager.dbus_set_macro_policy('M1', 'sometimes')
+
+    def test_key_events(self):
+        batches = []
+        self.manager.key_action(100, self.KEY_A, key_event_management.KEY_PRESS)
+
+        self.manager.key_event_batcher = key_event_management.KeyEventBatcher(batches.append, lambda delay, callback: None)
+        self.manager.key_action(200, self.KEY_A, key_event_management.KEY_PRESS)
+        self.manager.key_action(300, self.KEY_A, key_event_management.KEY_AUTOREPEAT)
+        # M6 is not in the matrix
+        self.manager.key_action(400, 188, key_event_management.KEY_RELEASE)
+        self.manager.key_action(500, self.KEY_A, key_event_management.KEY_RELEASE)
+        self.manager.key_event_batcher.flush()
+
+        # Only events while subscribed are sent, A is row 3 column 2
+        self.assertEqual(batches, [[(200, 0x0302, 1), (300, 0x0302, 2), (500, 0x0302, 0)]])
+
+    def test_read_latency(self):
+        self.manager.temp_key_store_state = True
+        self.manager.key_action(time.monotonic_ns() - 2000000, self.KEY_A, key_event_management.KEY_PRESS)
+
+        self.assertEqual(self.manager.latency.histograms['read'].count, 1)
+        self.assertGreaterEqual(self.manager.latency.histograms['read'].percentile(50), 2.0)
+
+        # The key store keeps the event timestamp for the render stages
+        snapshot = self.manager.temp_key_store
+        self.assertLessEqual(snapshot.event_times[0], snapshot.times[0] - 2000000)
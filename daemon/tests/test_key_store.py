@@ -0,0 +1,86 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import threading
+import unittest
+
+import numpy as np
+
+import openrazer_daemon.misc.key_store as key_store
+
+SECOND = 1000000000
+
+
+class KeyStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = key_store.KeyStore(capacity=8, expire_time=2.0)
+
+    def test_empty(self):
+        snapshot = self.store.snapshot(now_ns=0)
+
+        self.assertEqual(len(snapshot.times), 0)
+        self.assertEqual(snapshot.colours.shape, (0, 3))
+        self.assertEqual(len(self.store), 0)
+
+    def test_add(self):
+        self.store.add((1, 2), (255, 0, 0), time_ns=1 * SECOND)
+        self.store.add((3, 4), (0, 255, 0), time_ns=2 * SECOND)
+
+        snapshot = self.store.snapshot(now_ns=2 * SECOND)
+
+        np.testing.assert_array_equal(snapshot.times, [1 * SECOND, 2 * SECOND])
+        np.testing.assert_array_equal(snapshot.rows, [1, 3])
+        np.testing.assert_array_equal(snapshot.cols, [2, 4])
+        np.testing.assert_array_equal(snapshot.colours, [(255, 0, 0), (0, 255, 0)])
+
+    def test_snapshot_is_a_copy(self):
+        self.store.add((1, 2), (255, 0, 0), time_ns=0)
+        snapshot = self.store.snapshot(now_ns=0)
+
+        for _ in range(0, 10):
+            self.store.add((5, 5), (0, 0, 255), time_ns=0)
+
+        self.assertEqual(snapshot.rows[0], 1)
+
+    def test_expire(self):
+        for second in range(0, 5):
+            self.store.add((0, second), (255, 0, 0), time_ns=second * SECOND)
+
+        # Presses older than 2 seconds are left out even before the tail is advanced
+        np.testing.assert_array_equal(self.store.snapshot(now_ns=4 * SECOND).cols, [2, 3, 4])
+
+        self.store.expire(now_ns=4 * SECOND)
+        self.assertEqual(len(self.store), 3)
+
+        self.store.clear()
+        self.assertEqual(len(self.store.snapshot(now_ns=4 * SECOND).times), 0)
+
+    def test_wraps_around(self):
+        for index in range(0, 20):
+            self.store.add((0, index), (255, 0, 0), time_ns=index)
+
+        # One slot is kept free for the writer
+        np.testing.assert_array_equal(self.store.snapshot(now_ns=20).cols, list(range(13, 20)))
+
+    def test_concurrent_snapshots(self):
+        store = key_store.KeyStore(capacity=16, expire_time=1000.0)
+        stop = threading.Event()
+
+        def writer():
+            index = 0
+            while not stop.is_set():
+                store.add((index % 6, index % 22), (index % 256, 0, 0), time_ns=index)
+                index += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(0, 2000):
+                snapshot = store.snapshot(now_ns=0)
+
+                # Every press is consistent and they are in order
+                np.testing.assert_array_equal(snapshot.rows, snapshot.times % 6)
+                np.testing.assert_array_equal(snapshot.cols, snapshot.times % 22)
+                self.assertTrue((np.diff(snapshot.times) == 1).all())
+        finally:
+            stop.set()
+            thread.join()
@@ -0,0 +1,60 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import unittest
+
+import openrazer_daemon.keyboard
+
+
+class KeyboardColourTest(unittest.TestCase):
+    def setUp(self):
+        self.keyboard = openrazer_daemon.keyboard.KeyboardColour(6, 22)
+
+    def test_empty_payload(self):
+        payload = bytes(self.keyboard.get_total_binary())
+
+        self.assertEqual(len(payload), 6 * (3 + 22 * 3))
+
+        for row_id in range(0, 6):
+            row = payload[row_id * 69:(row_id + 1) * 69]
+            self.assertEqual(row[:3], bytes([row_id, 0x00, 21]))
+            self.assertEqual(row[3:], bytes(22 * 3))
+
+    def test_set_key_colour(self):
+        self.keyboard.set_key_colour(2, 4, (255, 300, -5))
+
+        row = bytes(self.keyboard.get_row_binary(2))
+        self.assertEqual(row[3 + 4 * 3:3 + 5 * 3], bytes([255, 255, 0]))
+        self.assertEqual(self.keyboard.get_key_colour('E'), (255, 255, 0))
+        self.assertEqual(self.keyboard.colors[2][4].get(), (255, 255, 0))
+
+        self.keyboard.reset_key(2, 4)
+        self.assertEqual(self.keyboard.get_key_colour('E'), (0, 0, 0))
+
+    def test_payload_is_a_view(self):
+        payload = self.keyboard.get_total_binary()
+
+        self.keyboard.set_key_colour(0, 0, (1, 2, 3))
+        self.assertEqual(bytes(payload[3:6]), bytes([1, 2, 3]))
+
+        self.keyboard.reset_rows()
+        self.assertEqual(bytes(payload[3:6]), bytes(3))
+        self.assertEqual(bytes(payload[:3]), bytes([0, 0x00, 21]))
+
+    def test_invalid_key(self):
+        with self.assertRaises(openrazer_daemon.keyboard.KeyDoesNotExistError):
+            self.keyboard.set_key_colour(6, 0, (0, 0, 0))
+
+        with self.assertRaises(openrazer_daemon.keyboard.KeyDoesNotExistError):
+            self.keyboard.get_key_colour('NOTAKEY')
+
+    def test_backup_restore(self):
+        self.keyboard.set_key_colour(5, 21, (10, 20, 30))
+        self.keyboard.backup_configuration()
+
+        self.keyboard.reset_rows()
+        self.keyboard.restore_configuration()
+
+        self.assertEqual(bytes(self.keyboard.get_row_binary(5))[-3:], bytes([10, 20, 30]))
+
+        with self.assertRaises(openrazer_daemon.keyboard.NoBackupError):
+            self.keyboard.restore_configuration()
@@ -0,0 +1,51 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import unittest
+
+import openrazer_daemon.misc.latency as latency
+
+MILLISECOND = 1000000
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_empty(self):
+        histogram = latency.LatencyHistogram()
+
+        self.assertEqual(histogram.percentile(50), 0.0)
+        self.assertEqual(histogram.count, 0)
+
+    def test_percentiles(self):
+        histogram = latency.LatencyHistogram()
+        for _ in range(0, 98):
+            histogram.add(1 * MILLISECOND)
+        histogram.add(20 * MILLISECOND)
+        histogram.add(20 * MILLISECOND)
+
+        self.assertEqual(histogram.count, 100)
+        # Buckets are about 12% wide
+        self.assertAlmostEqual(histogram.percentile(50), 1.0, delta=0.13)
+        self.assertAlmostEqual(histogram.percentile(99), 20.0, delta=2.5)
+
+        histogram.clear()
+        self.assertEqual(histogram.percentile(99), 0.0)
+
+    def test_out_of_range(self):
+        histogram = latency.LatencyHistogram()
+        histogram.add(-5)
+        histogram.add(3600 * 1000 * MILLISECOND)
+
+        self.assertEqual(histogram.percentile(0), 0.001)
+        self.assertEqual(histogram.percentile(100), 10000.0)
+
+
+class KeyLatencyStatisticsTest(unittest.TestCase):
+    def test_as_dict(self):
+        statistics = latency.KeyLatencyStatistics()
+        statistics.add('read', 2 * MILLISECOND)
+
+        result = statistics.as_dict()
+
+        self.assertEqual(len(result), len(latency.KeyLatencyStatistics.STAGES) * 3)
+        self.assertAlmostEqual(result['latency_read_p50_ms'], 2.0, delta=0.25)
+        self.assertEqual(result['latency_read_count'], 1.0)
+        self.assertEqual(result['latency_total_count'], 0.0)
@@ -0,0 +1,298 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import openrazer_daemon.misc.macro as macro
+
+
+class DummyInjector(object):
+    def __init__(self, block=False):
+        self.scripts = []
+        self.sent = threading.Event()
+        self.closed = False
+        self.released = 0
+        # Set to finish the scripts when blocking
+        self.finish = threading.Event()
+        if not block:
+            self.finish.set()
+
+    compile = staticmethod(macro.xte_script)
+
+    def send(self, script, cancelled=None):
+        self.scripts.append(script)
+        self.sent.set()
+        while not self.finish.is_set():
+            if cancelled is not None and cancelled.wait(0.01):
+                break
+        return True
+
+    def release(self):
+        self.released += 1
+
+    def close(self):
+        self.closed = True
+
+
+class CompileMacroTest(unittest.TestCase):
+    def test_compile(self):
+        url = macro.MacroURL('https://example.com')
+        program = macro.compile_macro([
+            macro.MacroKey('A', 0, 'DOWN'),
+            macro.MacroKey('A', 10, 'UP'),
+            url,
+            macro.MacroKey('SPACE', 10, 'DOWN'),
+        ])
+
+        # Runs of keys are joined into one script
+        self.assertEqual(program, ('keydown A\nkeyup A\n', url, 'keydown space\n'))
+
+    def test_empty(self):
+        self.assertEqual(macro.compile_macro([]), ())
+
+
+class MacroProgramTest(unittest.TestCase):
+    def test_program(self):
+        url = macro.MacroURL('https://example.com')
+        macro_data = [macro.MacroKey('A', 0, 'DOWN'), url]
+        program = macro.MacroProgram(macro_data)
+        macro_data.append(macro.MacroKey('A', 0, 'UP'))
+
+        # Edits of the list don't change the program
+        self.assertEqual(program.steps, ('keydown A\n', url))
+        self.assertFalse(program.keys_only)
+        self.assertEqual(program.json, json.dumps([{'type': 'MacroKey', 'key_id': 'A', 'pre_pause': 0, 'state': 'DOWN'}, {'type': 'MacroURL', 'url': 'https://example.com'}]))
+
+    def test_keys_only(self):
+        self.assertTrue(macro.MacroProgram([macro.MacroKey('A', 0, 'DOWN')]).keys_only)
+
+
+class PipeUinputInjector(macro.UinputInjector):
+    """
+    Writes the key events to a pipe instead of a virtual keyboard
+    """
+
+    def _open(self, path):
+        self.reader, writer = os.pipe()
+        return writer
+
+
+class UinputInjectorTest(unittest.TestCase):
+    def setUp(self):
+        self.injector = PipeUinputInjector()
+
+    def tearDown(self):
+        self.injector.close()
+        os.close(self.injector.reader)
+
+    def read_events(self):
+        data = os.read(self.injector.reader, 4096)
+        events = [macro.EVENT_STRUCT.unpack_from(data, offset) for offset in range(0, len(data), macro.EVENT_STRUCT.size)]
+        return [(ev_type, ev_code, ev_value) for _, _, ev_type, ev_code, ev_value in events]
+
+    def test_mapping(self):
+        self.assertEqual(macro.UINPUT_MAPPING['A'], 30)
+        self.assertEqual(macro.UINPUT_MAPPING['SPACE'], 57)
+        self.assertEqual(macro.UINPUT_MAPPING['M1'], 183)
+
+    def test_compile(self):
+        program = macro.compile_macro([
+            macro.MacroKey('A', 0, 'DOWN'),
+            macro.MacroKey('A', 0, 'UP'),
+            macro.MacroKey('FN', 1000, 'DOWN'),
+            macro.MacroKey('B', 2000, 'DOWN'),
+        ], self.injector.compile)
+
+        self.assertEqual(len(program), 1)
+        # Keys without a delay are written together, the delay of an unknown key is added to the next one
+        self.assertEqual([pause for pause, _ in program[0]], [0, 3000000])
+
+    def test_send(self):
+        program = macro.compile_macro([macro.MacroKey('A', 0, 'DOWN'), macro.MacroKey('A', 0, 'UP')], self.injector.compile)
+
+        self.assertTrue(self.injector.send(program[0]))
+        self.assertEqual(self.read_events(), [
+            (macro.EV_KEY, 30, 1), (macro.EV_SYN, macro.SYN_REPORT, 0),
+            (macro.EV_KEY, 30, 0), (macro.EV_SYN, macro.SYN_REPORT, 0),
+        ])
+
+    def test_pre_pause(self):
+        program = macro.compile_macro([
+            macro.MacroKey('A', 0, 'DOWN'),
+            macro.MacroKey('A', 20000, 'UP'),
+            macro.MacroKey('B', 20000, 'DOWN'),
+        ], self.injector.compile)
+
+        start = time.monotonic()
+        self.assertTrue(self.injector.send(program[0]))
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_cancel(self):
+        program = macro.compile_macro([macro.MacroKey('A', 0, 'DOWN'), macro.MacroKey('A', 5000000, 'UP')], self.injector.compile)
+        cancelled = threading.Event()
+        threading.Timer(0.05, cancelled.set).start()
+
+        start = time.monotonic()
+        self.assertTrue(self.injector.send(program[0], cancelled))
+        self.assertLess(time.monotonic() - start, 1)
+
+        # The key held down by the cancelled macro is released
+        self.injector.release()
+        self.assertEqual(self.read_events(), [
+            (macro.EV_KEY, 30, 1), (macro.EV_SYN, macro.SYN_REPORT, 0),
+            (macro.EV_KEY, 30, 0), (macro.EV_SYN, macro.SYN_REPORT, 0),
+        ])
+
+    def test_closed(self):
+        self.injector.close()
+
+        self.assertFalse(self.injector.send(((0, b''),)))
+
+
+class XteInjectorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output = os.path.join(self.tmp_dir, 'output')
+        open(self.output, 'w').close()
+        self.injector = macro.XteInjector(['sh', '-c', 'exec cat >> ' + self.output])
+
+    def tearDown(self):
+        self.injector.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def read_output(self, expected):
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            with open(self.output) as output:
+                data = output.read()
+            if data == expected:
+                break
+            time.sleep(0.01)
+        return data
+
+    def test_one_process(self):
+        self.assertTrue(self.injector.send('keydown A\n'))
+        process = self.injector._process
+        self.assertTrue(self.injector.send('keyup A\n'))
+
+        self.assertIs(self.injector._process, process)
+        self.assertEqual(self.read_output('keydown A\nkeyup A\n'), 'keydown A\nkeyup A\n')
+
+    def test_restart(self):
+        self.assertTrue(self.injector.send('keydown A\n'))
+        self.read_output('keydown A\n')
+
+        self.injector._process.kill()
+        self.injector._process.wait()
+
+        self.assertTrue(self.injector.send('keyup A\n'))
+        self.assertEqual(self.read_output('keydown A\nkeyup A\n'), 'keydown A\nkeyup A\n')
+
+    def test_missing_command(self):
+        injector = macro.XteInjector([os.path.join(self.tmp_dir, 'missing')])
+
+        self.assertFalse(injector.send('keydown A\n'))
+
+
+class MacroPlayerTest(unittest.TestCase):
+    def setUp(self):
+        self.injector = DummyInjector()
+        self.player = macro.MacroPlayer(self.injector)
+        self.player.add(self)
+
+    def tearDown(self):
+        if self.player.is_alive():
+            self.player.remove(self)
+            self.player.join(timeout=2)
+
+    def test_play(self):
+        self.player.start()
+        self.assertTrue(self.player.play(0, 'M1', [macro.MacroKey('A', 0, 'DOWN'), macro.MacroKey('A', 0, 'UP')]))
+
+        self.assertTrue(self.injector.sent.wait(2))
+        self.assertEqual(self.injector.scripts, ['keydown A\nkeyup A\n'])
+
+    def test_play_program(self):
+        self.player.start()
+        program = self.player.compile([macro.MacroKey('B', 0, 'DOWN')])
+        self.assertTrue(self.player.play(0, 'M1', program))
+
+        self.assertTrue(self.injector.sent.wait(2))
+        self.assertEqual(self.injector.scripts, ['keydown B\n'])
+
+    def test_bounded_queue(self):
+        # Not started so nothing is taken off the queue
+        for _ in range(0, macro.MacroPlayer.QUEUE_SIZE):
+            self.assertTrue(self.player.play(0, 'M1', [macro.MacroKey('A', 0, 'DOWN')]))
+
+        self.assertFalse(self.player.play(0, 'M1', [macro.MacroKey('A', 0, 'DOWN')]))
+
+    def test_stops_with_last_user(self):
+        self.player.start()
+
+        start = time.monotonic()
+        self.assertTrue(self.player.remove(self))
+        self.player.join(timeout=2)
+
+        self.assertFalse(self.player.is_alive())
+        self.assertTrue(self.injector.closed)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+class MacroPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.injector = DummyInjector(block=True)
+        self.player = macro.MacroPlayer(self.injector)
+        self.player.add(self)
+        self.player.start()
+
+    def tearDown(self):
+        self.injector.finish.set()
+        self.player.remove(self)
+        self.player.join(timeout=2)
+
+    def play(self, key_name, policy):
+        return self.player.play(0, 'M1', [macro.MacroKey(key_name, 0, 'DOWN')], policy)
+
+    def wait_for(self, scripts):
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline and len(self.injector.scripts) < scripts:
+            time.sleep(0.01)
+        return list(self.injector.scripts)
+
+    def test_queue(self):
+        self.assertTrue(self.play('A', macro.MACRO_POLICY_QUEUE))
+        self.assertTrue(self.injector.sent.wait(2))
+        self.assertTrue(self.play('B', macro.MACRO_POLICY_QUEUE))
+
+        self.injector.finish.set()
+        self.assertEqual(self.wait_for(2), ['keydown A\n', 'keydown B\n'])
+        self.assertEqual(self.injector.released, 0)
+
+    def test_ignore(self):
+        self.assertTrue(self.play('A', macro.MACRO_POLICY_IGNORE))
+        self.assertTrue(self.injector.sent.wait(2))
+
+        # Pressed again while playing
+        self.assertFalse(self.play('B', macro.MACRO_POLICY_IGNORE))
+        # Other bind keys are not affected
+        self.assertTrue(self.player.play(0, 'M2', [macro.MacroKey('C', 0, 'DOWN')], macro.MACRO_POLICY_IGNORE))
+
+        self.injector.finish.set()
+        self.assertEqual(self.wait_for(2), ['keydown A\n', 'keydown C\n'])
+
+    def test_restart(self):
+        self.assertTrue(self.play('A', macro.MACRO_POLICY_RESTART))
+        self.assertTrue(self.injector.sent.wait(2))
+
+        # Cancels the macro which is still playing
+        self.assertTrue(self.play('B', macro.MACRO_POLICY_RESTART))
+
+        self.assertEqual(self.wait_for(2), ['keydown A\n', 'keydown B\n'])
+        self.assertEqual(self.injector.released, 1)
@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import openrazer_daemon.misc.macro_store as macro_store
+
+
+class MacroStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = macro_store.MacroStore(os.path.join(self.tmp_dir, 'XX0000000001'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_empty(self):
+        # The directory is only created when a macro is saved
+        self.assertEqual(self.store.load(), {})
+
+    def test_save(self):
+        macro_list = [{'type': 'MacroKey', 'key_id': 'A', 'pre_pause': 0, 'state': 'DOWN'}]
+        self.assertTrue(self.store.save('M1', json.dumps(macro_list)))
+        self.assertTrue(self.store.save('MODE_SWITCH+1', '[]'))
+
+        self.assertEqual(self.store.load(), {'M1': (macro_list, None), 'MODE_SWITCH+1': ([], None)})
+        # One file per bind key and no temporary files left behind
+        self.assertEqual(sorted(os.listdir(self.store.directory)), ['M1.json', 'MODE_SWITCH%2B1.json'])
+
+    def test_replace(self):
+        self.store.save('M1', '[]')
+        self.store.save('M1', '[{"type": "MacroURL", "url": "https://example.com"}]')
+
+        self.assertEqual(self.store.load(), {'M1': ([{'type': 'MacroURL', 'url': 'https://example.com'}], None)})
+
+    def test_policy(self):
+        self.store.save('M1', '[]', 'restart')
+        self.store.save('M2', None, 'ignore')
+
+        self.assertEqual(self.store.load(), {'M1': ([], 'restart'), 'M2': (None, 'ignore')})
+        with open(os.path.join(self.store.directory, 'M1.json')) as macro_file:
+            self.assertEqual(json.load(macro_file), {'policy': 'restart', 'macro': []})
+
+        # Nothing left to store
+        self.store.save('M2', None, None)
+        self.assertEqual(self.store.load(), {'M1': ([], 'restart')})
+
+    def test_list_file(self):
+        # The macros used to be stored as only the list
+        os.makedirs(self.store.directory)
+        with open(os.path.join(self.store.directory, 'M1.json'), 'w') as macro_file:
+            macro_file.write('[{"type": "MacroURL", "url": "https://example.com"}]')
+
+        self.assertEqual(self.store.load(), {'M1': ([{'type': 'MacroURL', 'url': 'https://example.com'}], None)})
+
+    def test_delete(self):
+        self.store.save('M1', '[]')
+        self.store.save('M2', '[]')
+        self.store.delete('M1')
+        self.store.delete('M3')
+
+        self.assertEqual(self.store.load(), {'M2': ([], None)})
+
+    def test_corrupt(self):
+        self.store.save('M1', '[]')
+        with open(os.path.join(self.store.directory, 'M2.json'), 'w') as macro_file:
+            macro_file.write('[{"type": ')
+        with open(os.path.join(self.store.directory, 'M3.json'), 'w') as macro_file:
+            macro_file.write('{"policy": 1, "macro": []}')
+
+        self.assertEqual(self.store.load(), {'M1': ([], None)})
+
+    def test_get_macro_store(self):
+        macro_store.set_macro_directory(None)
+        self.assertIsNone(macro_store.get_macro_store('XX0000000001'))
+
+        macro_store.set_macro_directory(self.tmp_dir)
+        try:
+            self.assertEqual(macro_store.get_macro_store('XX0000000001').directory, self.store.directory)
+        finally:
+            macro_store.set_macro_directory(None)
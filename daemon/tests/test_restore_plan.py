@@ -0,0 +1,237 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import inspect
+import re
+import threading
+import types
+import unittest
+import unittest.mock
+
+try:
+    import openrazer_daemon.dbus_services.dbus_methods as dbus_methods
+    import openrazer_daemon.hardware as hardware
+    from openrazer_daemon.hardware.device_base import RazerDeviceBrightnessSuspend
+    from openrazer_daemon.misc.zone_state import ZoneState, ZoneStates
+
+    DEVICE_CLASSES = hardware.get_device_classes()
+except ImportError:
+    # The device classes need dbus and gi
+    DEVICE_CLASSES = None
+
+EFFECTS = ('none', 'on', 'static', 'spectrum', 'wave', 'wheel', 'reactive', 'ripple', 'rippleRandomColour',
+           'breathSingle', 'breathDual', 'breathTriple', 'breathRandom', 'starlightSingle', 'starlightDual',
+           'starlightRandom', 'blinking', 'pulsate', 'softwareWave', 'invalidEffect')
+
+
+def get_setters(device_class):
+    """
+    Get the DBus names and Python functions of the setters of a device class
+    """
+    methods = list(device_class.METHODS)
+    if issubclass(device_class, RazerDeviceBrightnessSuspend):
+        methods.append('set_brightness')
+
+    for method_name in methods:
+        function = getattr(dbus_methods, method_name, None)
+        if isinstance(function, types.FunctionType) and getattr(function, 'endpoint', False) and function.name.startswith('set'):
+            yield function.name, function
+
+
+def make_recorder(name, function):
+    """
+    Make a setter which records its calls and has the signature of the DBus method
+    """
+
+    def record(self, *args):
+        self.calls.append((name,) + args)
+
+    record.__signature__ = inspect.signature(types.FunctionType(function.code, function.globals))
+    return record
+
+
+def make_probe(device_class):
+    """
+    Subclass a device class with recording setters and create a device of it without touching the hardware
+    """
+    attrs = {name: make_recorder(name, function) for name, function in get_setters(device_class)}
+    attrs['__del__'] = lambda self: None
+    probe_class = type(device_class.__name__ + 'Probe', (device_class,), attrs)
+
+    device = probe_class.__new__(probe_class)
+    device.calls = []
+    device.logger = unittest.mock.MagicMock()
+    device.lock = threading.RLock()
+    device._disable_notifications = threading.local()
+    device._disable_persistence = threading.local()
+    device.zone = ZoneStates()
+    for i in device.PRESENT_ZONES:
+        device.zone[i] = ZoneState(present=True)
+        device.zone[i].active = False
+        device.zone[i].brightness = 42.0
+        device.zone[i].colors[:] = range(1, 10)
+        device.zone[i].speed = 2
+        device.zone[i].wave_dir = 3
+
+    return device
+
+
+def legacy_restore_brightness(self, disable):
+    """
+    restore_brightness() and disable_brightness() as they were before the restore plans
+    """
+    for i in self.ZONES:
+        if self.zone[i]["present"]:
+            if 'set_' + i + '_active' in self.METHODS:
+                active_func = getattr(self, "set" + self.capitalize_first_char(i) + "Active", None)
+                if active_func is not None:
+                    active_func(False if disable else self.zone[i]["active"])
+
+            bright_func = None
+            if i == "backlight":
+                bright_func = getattr(self, "setBrightness", None)
+            elif 'set_' + i + '_brightness' in self.METHODS:
+                bright_func = getattr(self, "set" + self.capitalize_first_char(i) + "Brightness", None)
+
+            if bright_func is not None:
+                bright_func(0 if disable else self.zone[i]["brightness"])
+
+
+def legacy_restore_effect(self):
+    """
+    restore_effect() as it was before the restore plans
+    """
+    for i in self.ZONES:
+        if self.zone[i]["present"]:
+            if i == "backlight":
+                if self.zone[i]["effect"].startswith('software') and hasattr(self, 'setSoftwareEffect'):
+                    continue
+                effect_func_name = 'set' + self.capitalize_first_char(self.zone[i]["effect"])
+            else:
+                effect_func_name = 'set' + self.handle_underscores(self.capitalize_first_char(i)) + self.capitalize_first_char(self.zone[i]["effect"])
+
+            effect_func = getattr(self, effect_func_name, None)
+
+            if effect_func is None and not self.zone[i]["effect"] == "spectrum":
+                self.logger.info("%s: Invalid effect name %s; restoring to Spectrum.", self.__class__.__name__, effect_func_name)
+                self.zone[i]["effect"] = 'spectrum'
+                if i == "backlight":
+                    effect_func_name = 'setSpectrum'
+                else:
+                    effect_func_name = 'set' + self.capitalize_first_char(i) + 'Spectrum'
+                effect_func = getattr(self, effect_func_name, None)
+
+            if effect_func is not None:
+                effect = self.zone[i]["effect"]
+                colors = self.zone[i]["colors"]
+                speed = self.zone[i]["speed"]
+                wave_dir = self.zone[i]["wave_dir"]
+                num_arguments = self.get_num_arguments(effect_func)
+                if num_arguments == 0:
+                    effect_func()
+                elif num_arguments == 1:
+                    if effect == 'starlightRandom':
+                        effect_func(speed)
+                    elif effect in ('wave', 'wheel'):
+                        effect_func(wave_dir)
+                    elif effect != 'rippleRandomColour':
+                        self.logger.error("%s: Effect requires 1 argument but don't know how to handle it!", self.__class__.__name__)
+                elif num_arguments == 3:
+                    effect_func(colors[0], colors[1], colors[2])
+                elif num_arguments == 4:
+                    if effect in ('starlightSingle', 'reactive'):
+                        effect_func(colors[0], colors[1], colors[2], speed)
+                    elif effect != 'ripple':
+                        self.logger.error("%s: Effect requires 4 arguments but don't know how to handle it!", self.__class__.__name__)
+                elif num_arguments == 6:
+                    effect_func(*colors[:6])
+                elif num_arguments == 7:
+                    effect_func(*colors[:6], speed)
+                elif num_arguments == 9:
+                    effect_func(*colors[:9])
+                else:
+                    self.logger.error("%s: Couldn't detect effect argument count!", self.__class__.__name__)
+
+
+def get_effect_names(device):
+    """
+    Get the effects to restore on a device, the common ones and the ones of its setters
+    """
+    effects = set(EFFECTS)
+    prefixes = '|'.join(device.handle_underscores(device.capitalize_first_char(i)) for i in device.ZONES if i != 'backlight')
+    for name in dir(device):
+        match = re.match(r'set(?:' + prefixes + r')?(?P<effect>[A-Z]\w*)$', name)
+        if match is not None:
+            effects.add(match.group('effect')[0].lower() + match.group('effect')[1:])
+
+    return sorted(effects)
+
+
+@unittest.skipIf(DEVICE_CLASSES is None, "dbus or gi isn't installed")
+class RestorePlanTest(unittest.TestCase):
+    def assert_same_result(self, device, legacy_device, restore, legacy_restore):
+        restore()
+        legacy_restore()
+
+        self.assertEqual(device.calls, legacy_device.calls)
+        self.assertEqual(device.logger.mock_calls, legacy_device.logger.mock_calls)
+        for i in device.PRESENT_ZONES:
+            self.assertEqual(device.zone[i].as_dict(), legacy_device.zone[i].as_dict())
+
+    def test_restore_effect(self):
+        for device_class in DEVICE_CLASSES:
+            device = make_probe(device_class)
+            legacy_device = make_probe(device_class)
+
+            for effect in get_effect_names(device):
+                with self.subTest(device_class=device_class.__name__, effect=effect):
+                    for i in device.PRESENT_ZONES:
+                        device.zone[i]["effect"] = effect
+                        legacy_device.zone[i]["effect"] = effect
+
+                    self.assert_same_result(device, legacy_device, device.restore_effect, lambda: legacy_restore_effect(legacy_device))
+
+    def test_restore_brightness(self):
+        for device_class in DEVICE_CLASSES:
+            device = make_probe(device_class)
+            legacy_device = make_probe(device_class)
+
+            with self.subTest(device_class=device_class.__name__):
+                self.assert_same_result(device, legacy_device, device.restore_brightness, lambda: legacy_restore_brightness(legacy_device, False))
+                self.assert_same_result(device, legacy_device, device.disable_brightness, lambda: legacy_restore_brightness(legacy_device, True))
+
+    def test_plan_shared_by_class(self):
+        device = make_probe(DEVICE_CLASSES[0])
+        device.restore_effect()
+        device.restore_brightness()
+
+        plans = device._restore_plans[type(device)]
+        other_device = device.__class__.__new__(device.__class__)
+        self.assertIs(other_device._get_brightness_plan(), plans[None])
+        self.assertIs(other_device._get_effect_plan('backlight', 'spectrum'), plans[('backlight', 'spectrum')])
+
+    def test_suspend_holds_lock(self):
+        device = make_probe(DEVICE_CLASSES[0])
+        states = []
+
+        def record_state():
+            # What a worker syncing an effect would see
+            other = {}
+
+            def check_other_thread():
+                other['locked'] = device.lock.acquire(blocking=False)
+                if other['locked']:
+                    device.lock.release()
+                other['disable_persistence'] = device.disable_persistence
+
+            thread = threading.Thread(target=check_other_thread)
+            thread.start()
+            thread.join()
+            states.append((device.disable_persistence, other['locked'], other['disable_persistence']))
+
+        device._suspend_device = record_state
+        device._resume_device = record_state
+        device.suspend_device()
+        device.resume_device()
+
+        self.assertEqual(states, [(True, False, False), (True, False, False)])
+        self.assertFalse(device.disable_persistence)
@@ -0,0 +1,127 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import math
+import random
+import unittest
+
+import numpy as np
+
+import openrazer_daemon.misc.software_effects as software_effects
+
+
+def key_events(events):
+    """
+    Build the key events of the effects from a list of (age, (key_row, key_col), colour)
+    """
+    if not events:
+        return software_effects.NO_KEY_EVENTS
+
+    ages, keys, colours = zip(*events)
+    rows, cols = zip(*keys)
+    return software_effects.KeyEvents(np.array(ages, dtype=np.float64), np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp), np.array(colours, dtype=np.uint8))
+
+
+def legacy_ripple(rows, cols, key_events, frame):
+    """
+    The ripple algorithm as it was before it was vectorised
+
+    scripts/benchmarks/ripple_render.py times it against RippleEffect
+    """
+    needslogohandling = rows == 6 and cols == 22
+    radiuses = [(key_row, key_col, age * 24, colour) for age, (key_row, key_col), colour in key_events]
+
+    for row in range(0, rows + 1 if needslogohandling else rows):
+        for col in range(0, cols):
+            if needslogohandling and row == 0 and col == 20:
+                continue
+
+            if needslogohandling and row == 6:
+                if col != 11:
+                    continue
+                target = (0, 20)
+            else:
+                target = (row, col)
+
+            for centre_row, centre_col, rad, colour in radiuses:
+                radius = math.sqrt(math.pow(centre_row - row, 2) + math.pow(centre_col - col, 2))
+                if rad >= radius >= rad - 2:
+                    frame[target] = colour
+                    break
+
+
+class SoftwareEffectsTest(unittest.TestCase):
+    def test_effects_render(self):
+        for rows, cols in ((1, 1), (4, 6), (6, 22), (9, 22)):
+            for effect_class in software_effects.SOFTWARE_EFFECTS.values():
+                for colour in (None, (0, 255, 128)):
+                    effect = effect_class(rows, cols, colour)
+                    frame = np.zeros((rows, cols, 3), dtype=np.uint8)
+
+                    for _ in range(0, 5):
+                        effect.render(frame, 0.05, key_events([(0.01, (0, 0), (255, 0, 0)), (0.5, (rows + 5, cols + 5), (0, 255, 0))]))
+
+    def test_ripple(self):
+        effect = software_effects.RippleEffect(6, 22, (0, 255, 0))
+        frame = np.zeros((6, 22, 3), dtype=np.uint8)
+
+        effect.render(frame, 0.05, key_events([(0.1, (2, 2), (255, 0, 0))]))
+
+        # The ring is 2.4 keys from the key after 0.1s
+        self.assertEqual(tuple(frame[2, 4]), (0, 255, 0))
+        self.assertEqual(tuple(frame[2, 2]), (0, 0, 0))
+
+        effect.render(frame, 0.05, key_events([]))
+        self.assertFalse(frame.any())
+
+    def test_ripple_matches_legacy(self):
+        rng = random.Random(42)
+
+        for rows, cols in ((1, 15), (4, 6), (6, 22), (9, 22)):
+            effect = software_effects.RippleEffect(rows, cols)
+
+            for _ in range(0, 50):
+                events = [(rng.uniform(0, 2), (rng.randrange(rows), rng.randrange(cols)), tuple(rng.randrange(256) for _ in range(3))) for _ in range(rng.randrange(1, 20))]
+
+                expected = np.zeros((rows, cols, 3), dtype=np.uint8)
+                legacy_ripple(rows, cols, events, expected)
+
+                frame = np.zeros((rows, cols, 3), dtype=np.uint8)
+                effect.render(frame, 0.05, key_events(events))
+
+                np.testing.assert_array_equal(frame, expected)
+
+    def test_ripple_idle(self):
+        effect = software_effects.RippleEffect(6, 22)
+
+        self.assertTrue(effect.is_idle(key_events([])))
+        self.assertFalse(effect.is_idle(key_events([(0.5, (0, 0), (255, 0, 0))])))
+        self.assertTrue(effect.is_idle(key_events([(1.5, (0, 0), (255, 0, 0))])))
+
+        self.assertFalse(software_effects.FireEffect(6, 22).is_idle(key_events([])))
+
+    def test_ripple_random_colour(self):
+        effect = software_effects.RippleEffect(6, 22)
+        frame = np.zeros((6, 22, 3), dtype=np.uint8)
+
+        effect.render(frame, 0.05, key_events([(0.1, (2, 2), (255, 0, 0))]))
+
+        self.assertEqual(tuple(frame[2, 4]), (255, 0, 0))
+
+    def test_wave(self):
+        effect = software_effects.WaveEffect(6, 22)
+        frame = np.zeros((6, 22, 3), dtype=np.uint8)
+
+        effect.render(frame, 0.0, key_events([]))
+
+        # Every row is the same gradient
+        self.assertTrue((frame == frame[0]).all())
+        self.assertEqual(tuple(frame[0, 0]), (255, 0, 0))
+
+    def test_persistence_name(self):
+        self.assertEqual(software_effects.persistence_name('fire', False), 'softwareFire')
+        self.assertEqual(software_effects.persistence_name('fire', True), 'softwareFireRandomColour')
+
+        self.assertEqual(software_effects.parse_persistence_name('softwareFire'), ('fire', False))
+        self.assertEqual(software_effects.parse_persistence_name('softwareStarlightRandomColour'), ('starlight', True))
+        self.assertIsNone(software_effects.parse_persistence_name('softwareUnknown'))
+        self.assertIsNone(software_effects.parse_persistence_name('ripple'))
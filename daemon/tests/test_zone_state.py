@@ -0,0 +1,81 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import configparser
+import unittest
+import unittest.mock
+
+import openrazer_daemon.misc.zone_state as zone_state
+
+
+class ZoneStateTest(unittest.TestCase):
+    def setUp(self):
+        self.state = zone_state.ZoneState(present=True)
+
+    def test_defaults(self):
+        self.assertEqual(self.state.as_dict(), {
+            "present": True,
+            "active": True,
+            "brightness": 75.0,
+            "effect": 'spectrum',
+            "colors": [0, 255, 0, 0, 255, 255, 0, 0, 255],
+            "speed": 1,
+            "wave_dir": 1,
+        })
+        self.assertFalse(hasattr(self.state, '__dict__'))
+
+    def test_dict_view(self):
+        self.state["effect"] = 'static'
+        self.state["colors"][0:3] = 1, 2, 3
+
+        self.assertEqual(self.state.effect, 'static')
+        self.assertEqual(self.state["colors"], bytearray([1, 2, 3, 0, 255, 255, 0, 0, 255]))
+        self.assertEqual(list(self.state.keys()), ['present', 'active', 'brightness', 'effect', 'colors', 'speed', 'wave_dir'])
+        self.assertEqual(zone_state.ZoneState.KEYS, set(self.state.keys()))
+        self.assertIsInstance(zone_state.ZoneState.KEYS, frozenset)
+
+        with self.assertRaises(KeyError):
+            self.state["size"] = 1
+        with self.assertRaises(ValueError):
+            self.state["colors"] = [0, 255, 0]
+        with self.assertRaises(ValueError):
+            self.state["colors"][0] = 256
+
+    def test_persistence_round_trip(self):
+        self.state.active = False
+        self.state.brightness = 42.0
+        self.state.effect = 'wave'
+        self.state.colors[:] = range(1, 10)
+        self.state.speed = 3
+        self.state.wave_dir = 2
+
+        persistence = configparser.ConfigParser()
+        persistence['Device'] = {}
+        self.state.write_persistence(persistence['Device'], 'logo')
+        self.assertEqual(persistence['Device']['logo_colors'], '1 2 3 4 5 6 7 8 9')
+
+        state = zone_state.ZoneState(present=True)
+        logger = unittest.mock.MagicMock()
+        state.read_persistence(persistence, 'Device', 'logo', logger)
+
+        self.assertEqual(state.as_dict(), self.state.as_dict())
+        logger.info.assert_not_called()
+
+    def test_read_invalid_persistence(self):
+        persistence = configparser.ConfigParser()
+        persistence['Device'] = {'logo_effect': 'static', 'logo_colors': '1 2 300 4 5 6 7 8 9'}
+
+        self.state.colors[0] = 5
+        logger = unittest.mock.MagicMock()
+        self.state.read_persistence(persistence, 'Device', 'logo', logger)
+
+        self.assertEqual(self.state.effect, 'static')
+        self.assertEqual(self.state.colors, zone_state.DEFAULT_COLORS)
+        self.assertEqual(self.state.brightness, 75.0)
+        self.assertTrue(logger.info.called)
+
+    def test_missing_zone(self):
+        states = zone_state.ZoneStates()
+        states['logo'] = zone_state.ZoneState(present=True)
+
+        self.assertFalse(states['scroll']['present'])
+        self.assertEqual(set(states.as_dict()), {'logo', 'scroll'})
@@ -5,6 +5,7 @@ import configparser
 import glob
 import os
 import shutil
+import time
 
 SPECS = {os.path.splitext(os.path.basename(spec_file))[0]: spec_file for spec_file in glob.glob(os.path.join(os.path.dirname(__file__), '*.cfg'))}
 EVENT_FORMAT = '@llHHI'
@@ -70,7 +71,6 @@ class FakeDevice(object):
         if spec_name not in SPECS:
             raise ValueError("Spec {0} not in SPECS".format(spec_name))
 
-        self._tick = 1
         self.spec_name = spec_name
         self._config = configparser.ConfigParser()
         self._config.read(SPECS[spec_name])
@@ -183,7 +183,9 @@ class FakeDevice(object):
         else:
             value = 0x00
 
-        event_binary = struct.pack(EVENT_FORMAT, self._tick, 0, EV_KEY, key_code, value)
+        # Timestamp the event like the kernel does once the daemon has switched it to CLOCK_MONOTONIC
+        timestamp = time.monotonic_ns()
+        event_binary = struct.pack(EVENT_FORMAT, timestamp // 1000000000, timestamp // 1000 % 1000000, EV_KEY, key_code, value)
         pipe_fd = self.events[file_id][1]
         os.write(pipe_fd, event_binary)
 
@@ -88,6 +88,37 @@ class DeviceManager(object):
 
         self._dbus_devices.syncEffects(sync)
 
+    def get_sync_group(self, serial: str) -> str:
+        """
+        Get the group of devices a device syncs effects with
+
+        :param serial: Device serial
+        :type serial: str
+
+        :return: Group name, '' if the device isn't in a group
+        :rtype: str
+        """
+        return str(self._dbus_devices.getSyncGroup(serial))
+
+    def set_sync_group(self, serial: str, group: str):
+        """
+        Set the group of devices a device syncs effects with
+
+        Effects are only synced between devices in the same group. Devices which aren't in a group sync with each other.
+
+        :param serial: Device serial
+        :type serial: str
+
+        :param group: Group name, '' to remove the device from its group
+        :type group: str
+
+        :raises ValueError: If group isn't a string
+        """
+        if not isinstance(group, str):
+            raise ValueError("Group must be a string")
+
+        self._dbus_devices.setSyncGroup(serial, group)
+
     @property
     def supported_devices(self):
         json_data = self._dbus_daemon.supportedDevices()
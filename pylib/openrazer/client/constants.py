@@ -26,6 +26,9 @@ STARLIGHT_SLOW = 0x03
 # Ripple
 RIPPLE_REFRESH_RATE = 0.05
 
+# Effects rendered by the daemon
+SOFTWARE_EFFECT_REFRESH_RATE = 0.05
+
 # NOTE: These constants are deprecated. Use values from supported_poll_rates instead
 POLL_8000HZ = 8000
 POLL_4000HZ = 4000
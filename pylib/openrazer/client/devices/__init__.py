@@ -104,6 +104,7 @@ class RazerDevice(object):
 
             'lighting_ripple': self._has_feature('razer.device.lighting.custom', 'setRipple'),  # Thinking of extending custom to do more hence the key check
             'lighting_ripple_random': self._has_feature('razer.device.lighting.custom', 'setRippleRandomColour'),
+            'lighting_software_effects': self._has_feature('razer.device.lighting.custom', 'setSoftwareEffect'),
 
             'lighting_pulsate': self._has_feature('razer.device.lighting.bw2013', 'setPulsate'),
 
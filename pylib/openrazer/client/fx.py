@@ -62,8 +62,8 @@ class RazerFX(BaseRazerFX):
         else:
             self.advanced = None
 
-        # Only keyboards will have ripple set
-        if self.has('led_matrix') and self.has('ripple'):
+        # Only keyboards will have ripple or software effects set
+        if self.has('led_matrix') and (self.has('ripple') or self.has('software_effects')):
             self._custom_lighting_dbus = _dbus.Interface(self._dbus, "razer.device.lighting.custom")
         else:
             self._custom_lighting_dbus = None
@@ -492,6 +492,89 @@ class RazerFX(BaseRazerFX):
             return True
         return False
 
+    @property
+    def software_effects(self) -> list:
+        """
+        Get the names of the effects which the daemon can render for the device
+
+        :return: List of effect names
+        :rtype: list of str
+        """
+        if self.has('software_effects'):
+            return [str(effect_name) for effect_name in self._custom_lighting_dbus.getSoftwareEffects()]
+        return []
+
+    def software_effect(self, effect_name: str, red: int, green: int, blue: int, refreshrate: float = c.SOFTWARE_EFFECT_REFRESH_RATE) -> bool:
+        """
+        Set an effect rendered by the daemon, like 'fire' or 'starlight'
+
+        :param effect_name: Effect name, one of software_effects
+        :type effect_name: str
+
+        :param red: Red RGB component
+        :rtype red: int
+
+        :param green: Green RGB component
+        :type green: int
+
+        :param blue: Blue RGB component
+        :type blue: int
+
+        :param refreshrate: Effect refresh rate
+        :type refreshrate: float
+
+        :return: True if success, False otherwise
+        :rtype: bool
+
+        :raises ValueError: If arguments are invalid
+        """
+        if not isinstance(effect_name, str):
+            raise ValueError("Effect name is not a string")
+        if not isinstance(refreshrate, float):
+            raise ValueError("Refresh rate is not a float")
+        if not isinstance(red, int):
+            raise ValueError("Red is not an integer")
+        if not isinstance(green, int):
+            raise ValueError("Green is not an integer")
+        if not isinstance(blue, int):
+            raise ValueError("Blue is not an integer")
+
+        if self.has('software_effects'):
+            red = clamp_ubyte(red)
+            green = clamp_ubyte(green)
+            blue = clamp_ubyte(blue)
+
+            self._custom_lighting_dbus.setSoftwareEffect(effect_name, red, green, blue, refreshrate)
+
+            return True
+        return False
+
+    def software_effect_random(self, effect_name: str, refreshrate: float = c.SOFTWARE_EFFECT_REFRESH_RATE) -> bool:
+        """
+        Set an effect rendered by the daemon with random colours
+
+        :param effect_name: Effect name, one of software_effects
+        :type effect_name: str
+
+        :param refreshrate: Effect refresh rate
+        :type refreshrate: float
+
+        :return: True if success, False otherwise
+        :rtype: bool
+
+        :raises ValueError: If arguments are invalid
+        """
+        if not isinstance(effect_name, str):
+            raise ValueError("Effect name is not a string")
+        if not isinstance(refreshrate, float):
+            raise ValueError("Refresh rate is not a float")
+
+        if self.has('software_effects'):
+            self._custom_lighting_dbus.setSoftwareEffectRandomColour(effect_name, refreshrate)
+
+            return True
+        return False
+
     def starlight_single(self, red: int, green: int, blue: int, time: int) -> bool:
         """
         Starlight effect
@@ -1103,6 +1186,11 @@ class Frame(object):
     Class to represent the RGB matrix of the keyboard. So to animate you'd use multiple frames
     """
 
+    # Row ID, start column, end column
+    ROW_HEADER_SIZE = 3
+
+    BLEND_MODES = ('over', 'add', 'max', 'multiply')
+
     def __init__(self, dimensions):
         self._rows, self._cols = dimensions
         self._components = 3
@@ -1111,6 +1199,20 @@ class Frame(object):
         self._fb1 = None
         self.reset()
 
+        # Driver payload with the row headers baked in, only the RGB part is refreshed on serialisation
+        self._row_size = self.ROW_HEADER_SIZE + self._cols * self._components
+        self._binary = _np.zeros((self._rows, self._row_size), 'uint8')
+        self._binary[:, 0] = _np.arange(self._rows)
+        self._binary[:, 1] = 0
+        self._binary[:, 2] = self._cols - 1
+        # (rows, cols, rgb) view onto the RGB part of the payload
+        self._binary_rgb = self._binary[:, self.ROW_HEADER_SIZE:].reshape(self._rows, self._cols, self._components)
+        self._binary_data = self._binary.reshape(-1).data
+
+        # Scratch buffers so the compositing operations don't allocate
+        self._scratch = _np.zeros(self._matrix.shape, 'float32')
+        self._scratch_ubyte = _np.zeros(self._matrix.shape, 'uint8')
+
     # Index with row, col OR y, x
     def __getitem__(self, key: tuple) -> tuple:
         """
@@ -1157,7 +1259,9 @@ class Frame(object):
         :return: Driver binary payload
         :rtype: bytes
         """
-        return b''.join([self.row_binary(row_id) for row_id in range(0, self._rows)])
+        _np.copyto(self._binary_rgb, self._matrix.transpose(1, 2, 0))
+
+        return self._binary.tobytes()
 
     def reset(self):
         """
@@ -1215,27 +1319,224 @@ class Frame(object):
         """
         assert 0 <= row_id < self._rows, "Row out of bounds"
 
-        start = 0
-        end = self._cols - 1
+        _np.copyto(self._binary_rgb[row_id], self._matrix[:, row_id].T)
 
-        return row_id.to_bytes(1, byteorder='big') + start.to_bytes(1, byteorder='big') + end.to_bytes(1, byteorder='big') + self._matrix[:, row_id].tobytes(order='F')
+        return self._binary[row_id].tobytes()
 
-    def to_binary(self):
+    def to_binary(self, out=None):
         """
         Get the whole binary for the keyboard to be sent to the driver.
 
-        :return: Driver binary payload
-        :rtype: bytes
+        If out is given the payload is written into it instead of allocating a new bytes object,
+        so a buffer can be reused for every frame of an animation.
+
+        :param out: Optional writable one-dimensional buffer of exactly rows * (3 + cols * 3) bytes
+        :type out: bytearray or memoryview or numpy.ndarray or None
+
+        :return: Driver binary payload, or out if it was given
+        :rtype: bytes or bytearray or memoryview or numpy.ndarray
+
+        :raises ValueError: If out is not the size of the payload
         """
-        return bytes(self)
+        if out is None:
+            return bytes(self)
+
+        if len(out) != self._binary.size:
+            raise ValueError("Output buffer must be {0} bytes, got {1}".format(self._binary.size, len(out)))
+
+        _np.copyto(self._binary_rgb, self._matrix.transpose(1, 2, 0))
+        out[:] = self._binary_data
+
+        return out
+
+    @property
+    def binary_size(self) -> int:
+        """
+        Size of the driver binary payload
+
+        :return: Size in bytes
+        :rtype: int
+        """
+        return self._binary.size
 
     # Simple FB
     def to_framebuffer(self):
-        self._fb1 = _np.copy(self._matrix)
+        _np.copyto(self._fb1, self._matrix)
 
     def to_framebuffer_or(self):
-        self._fb1 = _np.bitwise_or(self._fb1, self._matrix)  # pylint: disable=no-member
+        _np.bitwise_or(self._fb1, self._matrix, out=self._fb1)  # pylint: disable=no-member
 
     def draw_with_fb_or(self):
-        self._matrix = _np.bitwise_or(self._fb1, self._matrix)  # pylint: disable=no-member
+        _np.bitwise_or(self._fb1, self._matrix, out=self._matrix)  # pylint: disable=no-member
         return bytes(self)
+
+    # In-place compositing
+    def fill(self, rgb: tuple):
+        """
+        Set every LED to the same colour
+
+        :param rgb: RGB tuple
+        :type rgb: tuple
+
+        :return: The frame
+        :rtype: Frame
+
+        :raises AssertionError: If rgb is invalid
+        """
+        assert isinstance(rgb, (list, tuple)) and len(rgb) == 3, "Value must be a tuple,list of 3 RGB components"
+
+        for component, value in enumerate(rgb):
+            self._matrix[component].fill(clamp_ubyte(value))
+
+        return self
+
+    def blend(self, other, mode: str = 'over', alpha: float = 1.0, out=None):
+        """
+        Composite another frame onto this one
+
+        The modes are
+        * over - other replaces this frame
+        * add - components are added, saturating at 255
+        * max - the brightest of each component is kept
+        * multiply - components are multiplied, 255 being 1.0
+
+        The result of the mode is then mixed with this frame by alpha, so an alpha of 0.5 with
+        'over' gives a 50/50 mix of both frames.
+
+        :param other: Frame to composite onto this one
+        :type other: Frame
+
+        :param mode: Blend mode, one of BLEND_MODES
+        :type mode: str
+
+        :param alpha: Opacity of the result, 0.0 to 1.0
+        :type alpha: float
+
+        :param out: Frame to write the result to, defaults to this frame
+        :type out: Frame or None
+
+        :return: The frame written to
+        :rtype: Frame
+
+        :raises ValueError: If the frames are different sizes or the mode is unknown
+        """
+        if out is None:
+            out = self
+
+        if other._matrix.shape != self._matrix.shape or out._matrix.shape != self._matrix.shape:
+            raise ValueError("Frames must have the same dimensions")
+
+        src = other._matrix
+        dst = self._matrix
+        result = self._scratch
+
+        if mode == 'over':
+            _np.copyto(result, src)
+        elif mode == 'add':
+            _np.add(dst, src, out=result, dtype='float32')
+            # Saturate before mixing with alpha
+            _np.minimum(result, 255, out=result)
+        elif mode == 'max':
+            _np.maximum(dst, src, out=result, dtype='float32')
+        elif mode == 'multiply':
+            _np.multiply(dst, src, out=result, dtype='float32')
+            _np.multiply(result, 1 / 255, out=result)
+        else:
+            raise ValueError("Unknown blend mode \"{0}\", must be one of {1}".format(mode, ', '.join(self.BLEND_MODES)))
+
+        if alpha < 1.0:
+            # dst + (result - dst) * alpha
+            _np.subtract(result, dst, out=result)
+            _np.multiply(result, max(alpha, 0.0), out=result)
+            _np.add(result, dst, out=result)
+
+        self._store(result, out._matrix)
+        return out
+
+    def fade(self, factor: float):
+        """
+        Scale the brightness of every LED
+
+        :param factor: Multiplier, 0.0 turns everything off, 1.0 leaves it unchanged
+        :type factor: float
+
+        :return: The frame
+        :rtype: Frame
+        """
+        _np.multiply(self._matrix, max(factor, 0.0), out=self._scratch, dtype='float32')
+        self._store(self._scratch, self._matrix)
+
+        return self
+
+    def shift(self, dx: int, dy: int, wrap: bool = False):
+        """
+        Move the contents of the frame
+
+        LEDs shifted in from the edges are turned off unless wrap is set, in which case what
+        falls off one edge comes back on the opposite one.
+
+        :param dx: Columns to move right, negative moves left
+        :type dx: int
+
+        :param dy: Rows to move down, negative moves up
+        :type dy: int
+
+        :param wrap: Wrap around the edges
+        :type wrap: bool
+
+        :return: The frame
+        :rtype: Frame
+        """
+        _np.copyto(self._scratch_ubyte, self._matrix)
+        if not wrap:
+            self._matrix.fill(0)
+
+        for dst_rows, src_rows in self._shift_slices(self._rows, dy, wrap):
+            for dst_cols, src_cols in self._shift_slices(self._cols, dx, wrap):
+                _np.copyto(self._matrix[:, dst_rows, dst_cols], self._scratch_ubyte[:, src_rows, src_cols])
+
+        return self
+
+    @staticmethod
+    def _shift_slices(length: int, offset: int, wrap: bool) -> list:
+        """
+        Get the (destination, source) slices that shift an axis by offset
+
+        :param length: Length of the axis
+        :type length: int
+
+        :param offset: Amount to move
+        :type offset: int
+
+        :param wrap: Wrap around the ends
+        :type wrap: bool
+
+        :return: List of (destination slice, source slice)
+        :rtype: list of tuple
+        """
+        if wrap:
+            offset %= length
+            if offset == 0:
+                return [(slice(0, length), slice(0, length))]
+            return [(slice(offset, length), slice(0, length - offset)), (slice(0, offset), slice(length - offset, length))]
+
+        if abs(offset) >= length:
+            return []
+        if offset >= 0:
+            return [(slice(offset, length), slice(0, length - offset))]
+        return [(slice(0, length + offset), slice(-offset, length))]
+
+    @staticmethod
+    def _store(values, matrix):
+        """
+        Round, clamp and write float values into a uint8 matrix
+
+        :param values: Float scratch buffer, modified
+        :type values: numpy.ndarray
+
+        :param matrix: Destination matrix
+        :type matrix: numpy.ndarray
+        """
+        _np.rint(values, out=values)
+        _np.clip(values, 0, 255, out=values)
+        _np.copyto(matrix, values, casting='unsafe')
@@ -83,6 +83,35 @@ class RazerMacro(object):
         else:
             self._macro_dbus.deleteMacro(bind_key)
 
+    def get_macro_policy(self, bind_key: str) -> str:
+        """
+        Get what happens when the bind key is pressed while its macro is still playing
+
+        :param bind_key: Bind Key
+        :type bind_key: str
+
+        :return: Policy, one of openrazer_daemon.misc.macro.MACRO_POLICIES
+        :rtype: str
+        """
+        return str(self._macro_dbus.getMacroPolicy(bind_key))
+
+    def set_macro_policy(self, bind_key: str, policy: str):
+        """
+        Set what happens when the bind key is pressed while its macro is still playing
+
+        queue plays the macro again after the previous one, restart cancels the previous one and ignore ignores the press
+
+        :param bind_key: Bind Key
+        :type bind_key: str
+
+        :param policy: Policy, one of openrazer_daemon.misc.macro.MACRO_POLICIES
+        :type policy: str
+        """
+        if policy not in _daemon_macro.MACRO_POLICIES:
+            raise ValueError("Policy {0} is not one of {1}".format(policy, ', '.join(_daemon_macro.MACRO_POLICIES)))
+
+        self._macro_dbus.setMacroPolicy(bind_key, policy)
+
     @property
     def mode_modifier(self):
         if 'macro_mode_modifier' in self._capabilities:
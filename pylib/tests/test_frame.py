@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import unittest
+
+try:
+    from openrazer.client.fx import Frame
+except ImportError:
+    # The client needs dbus and the daemon package
+    Frame = None
+
+
+def make_frame(rows):
+    """
+    Make a frame from rows of RGB tuples
+    """
+    frame = Frame((len(rows), len(rows[0])))
+    for y, row in enumerate(rows):
+        for x, rgb in enumerate(row):
+            frame[y, x] = rgb
+
+    return frame
+
+
+def make_red_frame(rows):
+    """
+    Make a frame from rows of red values
+    """
+    return make_frame([[(red, 0, 0) for red in row] for row in rows])
+
+
+def get_pixels(frame):
+    """
+    Get the RGB tuples of a frame by row
+    """
+    return [[tuple(int(component) for component in frame[y, x]) for x in range(0, frame._cols)] for y in range(0, frame._rows)]
+
+
+def get_red(frame):
+    """
+    Get the red values of a frame by row
+    """
+    return [[rgb[0] for rgb in row] for row in get_pixels(frame)]
+
+
+@unittest.skipIf(Frame is None, "dbus or the daemon package isn't installed")
+class FrameCompositingTest(unittest.TestCase):
+    def setUp(self):
+        self.dst = [[(100, 50, 200), (200, 250, 0)]]
+        self.src = [[(10, 120, 30), (100, 10, 255)]]
+
+    def blend(self, mode, alpha=1.0):
+        frame = make_frame(self.dst)
+        result = frame.blend(make_frame(self.src), mode, alpha)
+
+        self.assertIs(result, frame)
+        return get_pixels(frame)
+
+    def test_fill(self):
+        frame = Frame((2, 3))
+        self.assertIs(frame.fill((10, 300, -5)), frame)
+        self.assertEqual(get_pixels(frame), [[(10, 255, 0)] * 3] * 2)
+
+    def test_blend_modes(self):
+        self.assertEqual(self.blend('over'), [[(10, 120, 30), (100, 10, 255)]])
+        # Saturates at 255
+        self.assertEqual(self.blend('add'), [[(110, 170, 230), (255, 255, 255)]])
+        self.assertEqual(self.blend('max'), [[(100, 120, 200), (200, 250, 255)]])
+        # 100 * 10 / 255 = 3.9, 50 * 120 / 255 = 23.5, 200 * 30 / 255 = 23.5, 200 * 100 / 255 = 78.4, 250 * 10 / 255 = 9.8
+        self.assertEqual(self.blend('multiply'), [[(4, 24, 24), (78, 10, 0)]])
+
+        with self.assertRaises(ValueError):
+            self.blend('screen')
+
+    def test_blend_alpha(self):
+        # Half way between this frame and the result of the mode
+        self.assertEqual(self.blend('over', 0.5), [[(55, 85, 115), (150, 130, 128)]])
+        self.assertEqual(self.blend('add', 0.5), [[(105, 110, 215), (228, 252, 128)]])
+        self.assertEqual(self.blend('over', 0.0), self.dst)
+        self.assertEqual(self.blend('over', -1.0), self.dst)
+
+    def test_blend_out(self):
+        for mode in Frame.BLEND_MODES:
+            with self.subTest(mode=mode):
+                frame = make_frame(self.dst)
+                out = Frame((1, 2))
+
+                self.assertIs(frame.blend(make_frame(self.src), mode, 0.75, out=out), out)
+                # The frame itself is left alone
+                self.assertEqual(get_pixels(frame), self.dst)
+
+                frame.blend(make_frame(self.src), mode, 0.75)
+                self.assertEqual(get_pixels(out), get_pixels(frame))
+
+    def test_blend_dimensions(self):
+        frame = make_frame(self.dst)
+
+        with self.assertRaises(ValueError):
+            frame.blend(Frame((2, 1)))
+        with self.assertRaises(ValueError):
+            frame.blend(make_frame(self.src), out=Frame((1, 3)))
+
+    def test_fade(self):
+        frame = make_frame([[(100, 201, 255)]])
+
+        self.assertIs(frame.fade(0.5), frame)
+        # 50, 100.5 and 127.5 round to even
+        self.assertEqual(get_pixels(frame), [[(50, 100, 128)]])
+
+        # Clamped to 255 and 0
+        self.assertEqual(get_pixels(frame.fade(3.0)), [[(150, 255, 255)]])
+        self.assertEqual(get_pixels(frame.fade(-1.0)), [[(0, 0, 0)]])
+
+    def test_shift(self):
+        rows = [[1, 2, 3], [4, 5, 6]]
+
+        self.assertEqual(get_red(make_red_frame(rows).shift(1, 0)), [[0, 1, 2], [0, 4, 5]])
+        self.assertEqual(get_red(make_red_frame(rows).shift(-1, 1)), [[0, 0, 0], [2, 3, 0]])
+        self.assertEqual(get_red(make_red_frame(rows).shift(0, -1)), [[4, 5, 6], [0, 0, 0]])
+        self.assertEqual(get_red(make_red_frame(rows).shift(3, 0)), [[0, 0, 0], [0, 0, 0]])
+
+    def test_shift_wrap(self):
+        rows = [[1, 2, 3], [4, 5, 6]]
+
+        self.assertEqual(get_red(make_red_frame(rows).shift(1, 0, wrap=True)), [[3, 1, 2], [6, 4, 5]])
+        self.assertEqual(get_red(make_red_frame(rows).shift(-1, -1, wrap=True)), [[5, 6, 4], [2, 3, 1]])
+        self.assertEqual(get_red(make_red_frame(rows).shift(3, 2, wrap=True)), rows)
+        self.assertEqual(get_red(make_red_frame(rows).shift(-4, 0, wrap=True)), [[2, 3, 1], [5, 6, 4]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Microbenchmark of openrazer.client.fx.Frame serialisation
+
+Compares the old per-row concatenation with bytes(frame) and with
+frame.to_binary(out=...) reusing a buffer, for the matrix sizes of the
+supported devices.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+PYLIB = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'pylib')
+sys.path.insert(1, PYLIB)
+
+from openrazer.client.fx import Frame
+
+# (rows, cols) of the matrices in the daemon's hardware classes
+MATRIX_SIZES = (
+    (1, 15),  # Mouse mats
+    (1, 16),
+    (1, 21),  # Mouse docks
+    (4, 6),   # Tartarus V2
+    (5, 22),  # Orbweaver Chroma
+    (6, 16),  # Laptops
+    (6, 22),  # Keyboards
+    (6, 25),
+    (9, 22),
+    (6, 80),  # Chroma Addressable RGB Controller
+)
+
+
+def legacy_to_binary(frame):
+    """
+    Serialise a frame the way Frame.__bytes__ used to
+    """
+    result = []
+    for row_id in range(0, frame._rows):
+        result.append(row_id.to_bytes(1, byteorder='big') + (0).to_bytes(1, byteorder='big') + (frame._cols - 1).to_bytes(1, byteorder='big') + frame._matrix[:, row_id].tobytes(order='F'))
+    return b''.join(result)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=20000, help='Serialisations per measurement')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of measurements, the best is reported')
+
+    return parser.parse_args()
+
+
+def run():
+    args = parse_args()
+
+    print("{0:>8} {1:>14} {2:>14} {3:>14}".format('size', 'legacy (us)', 'bytes (us)', 'out= (us)'))
+
+    for rows, cols in MATRIX_SIZES:
+        frame = Frame((rows, cols))
+        frame._matrix[:] = np.random.randint(0, 256, frame._matrix.shape, dtype='uint8')
+        out = bytearray(frame.binary_size)
+
+        assert legacy_to_binary(frame) == bytes(frame) == frame.to_binary(out=out)
+
+        results = []
+        for func in (lambda: legacy_to_binary(frame), lambda: bytes(frame), lambda: frame.to_binary(out=out)):
+            best = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+            results.append(best / args.number * 1e6)
+
+        print("{0:>8} {1:>14.2f} {2:>14.2f} {3:>14.2f}".format('{0}x{1}'.format(rows, cols), *results))
+
+
+if __name__ == '__main__':
+    run()
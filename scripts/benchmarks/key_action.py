@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Throughput benchmark of the daemon's key event decoding
+
+Writes batches of key events into a FIFO and reports how many events per
+second are read, decoded and passed to KeyboardKeyManager.key_action.
+The old decoding, which read each event on its own and built a datetime
+and an action string for it, is measured against the same sink.
+"""
+import argparse
+import datetime
+import logging
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(1, os.path.join(ROOT, 'daemon'))
+
+import openrazer_daemon.misc.key_event_management as key_event_management
+
+# Letter keys, which don't do anything special in key_action
+KEY_CODES = (16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 30, 31, 32, 33, 34, 35, 36, 37, 38, 44, 45, 46, 47, 48, 49, 50)
+LEGACY_KEY_ACTIONS = {0: 'release', 1: 'press', 2: 'autorepeat'}
+# Events per write, well below the size of a pipe
+BATCH = 512
+
+
+class DummyDevice(object):
+    """
+    Stands in for the device the key manager belongs to
+    """
+
+    def register_observer(self, observer):
+        pass
+
+    def remove_observer(self, observer):
+        pass
+
+
+class CountingSink(object):
+    """
+    Stands in for the key manager and only counts the events
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def key_action(self, event_time, key_id, key_press):
+        self.count += 1
+
+
+def legacy_read_events(event_file, parent):
+    """
+    Read the events the way KeyWatcher used to, one read and one datetime per event
+    """
+    while True:
+        key_data = event_file.read(key_event_management.EVENT_SIZE)
+        if not key_data:
+            break
+
+        ev_sec, ev_usec, ev_type, ev_code, ev_value = struct.unpack(key_event_management.EVENT_FORMAT, key_data)
+        if ev_type != key_event_management.EV_KEY:
+            continue
+
+        date = datetime.datetime.fromtimestamp(ev_sec + (ev_usec * 0.000001))
+        parent.key_action(date, ev_code, LEGACY_KEY_ACTIONS.get(ev_value, 'unknown'))
+
+
+def event_batch():
+    """
+    Get a batch of key presses and releases with the spacer records the kernel adds
+    """
+    records = []
+    for index in range(0, BATCH // 2):
+        records.append(struct.pack(key_event_management.EVENT_FORMAT, 1000, index, key_event_management.EV_KEY, KEY_CODES[index % len(KEY_CODES)], index % 2))
+        records.append(struct.pack(key_event_management.EVENT_FORMAT, 1000, index, 0, 0, 0))
+    return b''.join(records)
+
+
+def measure(tmp_dir, parent, events, legacy=False):
+    """
+    Return the number of key events per second passed to the parent
+    """
+    path = os.path.join(tmp_dir, 'event-kbd')
+    os.mkfifo(path)
+    writer = os.open(path, os.O_RDWR)
+
+    watcher = key_event_management.KeyWatcher(0, [path], parent)
+    event_file = watcher.open_event_files[0]
+    batch = event_batch()
+
+    try:
+        start = time.perf_counter()
+        for _ in range(0, events // (BATCH // 2)):
+            os.write(writer, batch)
+            if legacy:
+                legacy_read_events(event_file, parent)
+            else:
+                watcher.read_events(event_file.fileno())
+        elapsed = time.perf_counter() - start
+    finally:
+        watcher.stop()
+        os.close(writer)
+        os.unlink(path)
+
+    return (events // (BATCH // 2)) * (BATCH // 2) / elapsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=200000, help='Number of key events per measurement')
+
+    return parser.parse_args()
+
+
+def run():
+    args = parse_args()
+    logging.getLogger('razer').setLevel(logging.ERROR)
+
+    tmp_dir = tempfile.mkdtemp()
+    manager = key_event_management.KeyboardKeyManager(0, [], DummyDevice(), testing=True)
+
+    try:
+        print("{0:>28} {1:>14}".format('path', 'events/s'))
+
+        print("{0:>28} {1:>14.0f}".format('legacy decode', measure(tmp_dir, CountingSink(), args.events, legacy=True)))
+        print("{0:>28} {1:>14.0f}".format('compact decode', measure(tmp_dir, CountingSink(), args.events)))
+
+        print("{0:>28} {1:>14.0f}".format('key_action', measure(tmp_dir, manager, args.events)))
+        manager.temp_key_store_state = True
+        print("{0:>28} {1:>14.0f}".format('key_action with key store', measure(tmp_dir, manager, args.events)))
+    finally:
+        manager.close()
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    run()
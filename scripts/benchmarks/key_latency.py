@@ -0,0 +1,207 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Latency benchmark of the daemon's KeyWatcher
+
+Emits key events through the fake driver's FIFO event files
+(FakeDevice.emit_kb_event) and measures the time until they reach the
+key manager, for the old per-device polling watcher and the current
+reactor shared by all devices. Also reports how often the watching thread
+wakes up while no keys are pressed.
+"""
+import argparse
+import fcntl
+import os
+import random
+import select
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(1, os.path.join(ROOT, 'pylib'))
+sys.path.insert(1, os.path.join(ROOT, 'daemon'))
+
+import openrazer._fake_driver as fake_driver
+import openrazer_daemon.misc.key_event_management as key_event_management
+from openrazer_daemon.misc.key_event_management import EVENT_SIZE, KeyWatcher
+
+EVENT_FILE = 'usb-Razer_Razer_BlackWidow_Chroma-event-kbd'
+KEY_A = 30
+
+
+class KeyboardFakeDevice(fake_driver.FakeDevice):
+    """
+    Fake keyboard with an event file, which the specs don't have
+    """
+
+    def create_events(self):
+        self._config.set('device', 'event', EVENT_FILE)
+        super().create_events()
+
+
+class LegacyKeyWatcher(threading.Thread):
+    """
+    The KeyWatcher thread as it used to be, polling with a timeout and sleeping between polls
+    """
+
+    def __init__(self, device_id, event_files, parent):
+        super().__init__()
+        self._parent = parent
+        self._shutdown = False
+        self.open_event_files = [open(event_file, 'rb') for event_file in event_files]
+        for event_file in self.open_event_files:
+            flags = fcntl.fcntl(event_file.fileno(), fcntl.F_GETFL)
+            fcntl.fcntl(event_file.fileno(), fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+    def run(self):
+        event_file_map = {event_file.fileno(): event_file for event_file in self.open_event_files}
+
+        poll_object = select.epoll()
+        for event_fd in event_file_map.keys():
+            poll_object.register(event_fd, select.EPOLLIN | select.EPOLLPRI)
+
+        while not self._shutdown:
+            for event_fd, _ in poll_object.poll(0.01):
+                while True:
+                    key_data = event_file_map[event_fd].read(EVENT_SIZE)
+                    if not key_data:
+                        break
+
+                    date, key_action, key_code = KeyWatcher.parse_event_record(key_data)
+                    if date is None:
+                        continue
+
+                    self._parent.key_action(date, key_code, key_action)
+
+            time.sleep(0.01)
+
+        for event_fd, event_file in event_file_map.items():
+            poll_object.unregister(event_fd)
+            event_file.close()
+        poll_object.close()
+
+    @property
+    def thread(self):
+        return self
+
+    def stop(self):
+        self._shutdown = True
+        self.join(timeout=2)
+
+
+class ReactorKeyWatcher(KeyWatcher):
+    """
+    KeyWatcher which exposes the reactor thread watching its files
+    """
+
+    @property
+    def thread(self):
+        return key_event_management._REACTOR
+
+
+class LatencyRecorder(object):
+    """
+    Stands in for the key manager and records when each event arrives
+    """
+
+    def __init__(self):
+        self.received = threading.Event()
+        self.arrival = None
+
+    def key_action(self, event_time, key_id, key_press='press'):
+        self.arrival = time.perf_counter()
+        self.received.set()
+
+
+def measure(watcher_class, device, event_file, count):
+    """
+    Emit events one at a time and return the latency of each in milliseconds
+    """
+    recorder = LatencyRecorder()
+    watcher = watcher_class(0, [event_file], recorder)
+    watcher.start()
+
+    latencies = []
+    try:
+        for _ in range(0, count):
+            recorder.received.clear()
+
+            # Keys aren't pressed in step with the poll loop
+            time.sleep(random.uniform(0.0, 0.02))
+
+            sent = time.perf_counter()
+            device.emit_kb_event('0', KEY_A, 'down')
+            if not recorder.received.wait(1):
+                raise RuntimeError("Event was not received")
+
+            latencies.append((recorder.arrival - sent) * 1000)
+    finally:
+        watcher.stop()
+
+    return latencies
+
+
+def context_switches(thread):
+    """
+    Get the number of times a thread has gone to sleep and been woken up again
+    """
+    with open('/proc/self/task/{0}/status'.format(thread.native_id)) as status:
+        for line in status:
+            if line.startswith('voluntary_ctxt_switches:'):
+                return int(line.split()[1])
+    return 0
+
+
+def measure_idle(watcher_class, event_file, duration):
+    """
+    Return the number of wakeups per second of a watcher while no keys are pressed
+    """
+    watcher = watcher_class(0, [event_file], LatencyRecorder())
+    watcher.start()
+
+    try:
+        # Let the thread settle
+        time.sleep(0.1)
+
+        start = context_switches(watcher.thread)
+        time.sleep(duration)
+        end = context_switches(watcher.thread)
+    finally:
+        watcher.stop()
+
+    return (end - start) / duration
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=200, help='Number of key events to emit')
+    parser.add_argument('--idle', type=float, default=2.0, help='Seconds to count the idle wakeups over')
+
+    return parser.parse_args()
+
+
+def run():
+    args = parse_args()
+
+    device = KeyboardFakeDevice('razerblackwidowchroma', tmp_dir=tempfile.mkdtemp())
+    event_file = device._get_event_path(EVENT_FILE)
+
+    try:
+        print("{0:>10} {1:>10} {2:>10} {3:>10} {4:>10} {5:>16}".format('watcher', 'mean (ms)', 'p50 (ms)', 'p99 (ms)', 'max (ms)', 'idle wakeups/s'))
+
+        for name, watcher_class in (('legacy', LegacyKeyWatcher), ('reactor', ReactorKeyWatcher)):
+            latencies = sorted(measure(watcher_class, device, event_file, args.events))
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            idle = measure_idle(watcher_class, event_file, args.idle)
+
+            print("{0:>10} {1:>10.3f} {2:>10.3f} {3:>10.3f} {4:>10.3f} {5:>16.2f}".format(name, statistics.mean(latencies), statistics.median(latencies), p99, latencies[-1], idle))
+    finally:
+        device.close()
+
+
+if __name__ == '__main__':
+    run()
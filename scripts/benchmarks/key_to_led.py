@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+End-to-end latency benchmark from a key press to the LEDs
+
+Presses keys through the fake driver's event files
+(FakeDevice.emit_kb_event) with the ripple effect enabled, and reports the
+latency histograms the daemon records for each stage, from the input event
+to the frame being written to matrix_custom_frame.
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(1, os.path.join(ROOT, 'pylib'))
+sys.path.insert(1, os.path.join(ROOT, 'daemon'))
+
+import openrazer._fake_driver as fake_driver
+from openrazer_daemon.misc.effect_engine import EffectManager
+from openrazer_daemon.misc.key_event_management import KeyboardKeyManager
+from openrazer_daemon.misc.latency import KeyLatencyStatistics
+
+EVENT_FILE = 'usb-Razer_Razer_BlackWidow_Chroma-event-kbd'
+# Letter keys, which don't do anything special in key_action
+KEY_CODES = (16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 30, 31, 32, 33, 34, 35, 36, 37, 38, 44, 45, 46, 47, 48, 49, 50)
+
+
+class KeyboardFakeDevice(fake_driver.FakeDevice):
+    """
+    Fake keyboard with an event file, which the specs don't have
+    """
+
+    def create_events(self):
+        self._config.set('device', 'event', EVENT_FILE)
+        super().create_events()
+
+
+class FakeKeyboard(object):
+    """
+    Stands in for the daemon's keyboard and writes the frames to the fake driver
+    """
+    MATRIX_DIMS = (6, 22)
+
+    def __init__(self, fake_device):
+        self._fake_device = fake_device
+        self.key_manager = KeyboardKeyManager(0, [fake_device._get_event_path(EVENT_FILE)], self, testing=True)
+
+    def register_observer(self, observer):
+        pass
+
+    def remove_observer(self, observer):
+        pass
+
+    def _set_key_row(self, payload):
+        self._fake_device.set('matrix_custom_frame', bytes(payload), binary=True)
+
+    def _set_custom_effect(self):
+        self._fake_device.set('matrix_effect_custom', '1')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--presses', type=int, default=200, help='Number of key presses')
+    parser.add_argument('--interval', type=float, default=0.05, help='Mean seconds between key presses')
+    parser.add_argument('--refresh-rate', type=float, default=0.04, help='Refresh rate of the ripple effect in seconds')
+
+    return parser.parse_args()
+
+
+def run():
+    args = parse_args()
+    logging.getLogger('razer').setLevel(logging.ERROR)
+
+    device = KeyboardFakeDevice('razerblackwidowchroma', tmp_dir=tempfile.mkdtemp())
+    keyboard = FakeKeyboard(device)
+    effect_manager = EffectManager(keyboard, 0)
+
+    try:
+        effect_manager.notify(('effect', keyboard, 'setRipple', 0, 255, 0, args.refresh_rate))
+
+        for _ in range(0, args.presses):
+            # Keys aren't pressed in step with the frames
+            time.sleep(random.uniform(0.0, args.interval * 2))
+
+            key_code = random.choice(KEY_CODES)
+            device.emit_kb_event('0', key_code, 'down')
+            device.emit_kb_event('0', key_code, 'up')
+
+        # Let the last press be drawn
+        time.sleep(args.refresh_rate * 3)
+        statistics = effect_manager.statistics
+    finally:
+        effect_manager.close()
+        keyboard.key_manager.close()
+        device.close()
+
+    print("{0} key presses, ripple at {1} ms per frame".format(args.presses, args.refresh_rate * 1000))
+    print("{0:>12} {1:>10} {2:>10} {3:>8}".format('stage', 'p50 (ms)', 'p99 (ms)', 'count'))
+    for stage in KeyLatencyStatistics.STAGES:
+        print("{0:>12} {1:>10.3f} {2:>10.3f} {3:>8.0f}".format(stage, statistics['latency_' + stage + '_p50_ms'], statistics['latency_' + stage + '_p99_ms'], statistics['latency_' + stage + '_count']))
+
+
+if __name__ == '__main__':
+    run()
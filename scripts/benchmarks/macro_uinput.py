@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Latency and timing benchmark of playing macros through the uinput keyboard
+
+Creates the daemon's virtual keyboard, plays macros on it and reads the key
+events back from its /dev/input event file. Reports how long each key takes
+from being sent to being read, and how far the delays between the keys are
+from the recorded pre_pause values. Needs write access to /dev/uinput and
+read access to the created event file, so it's usually run as root.
+"""
+import argparse
+import fcntl
+import glob
+import os
+import select
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(1, os.path.join(ROOT, 'daemon'))
+
+import openrazer_daemon.misc.macro as macro
+
+# uinput.h UI_GET_SYSNAME(64) and input.h EVIOCSCLOCKID
+UI_GET_SYSNAME = 0x8040552c
+EVIOCSCLOCKID = 0x400445a0
+CLOCK_MONOTONIC = 1
+# Letter keys
+KEY_NAMES = ('Q', 'W', 'E', 'R', 'T', 'Y', 'U', 'I', 'O', 'P', 'A', 'S', 'D', 'F', 'G', 'H', 'J', 'K', 'L', 'Z', 'X', 'C', 'V', 'B', 'N', 'M')
+
+
+def open_event_file(injector):
+    """
+    Open the event file of the virtual keyboard, with monotonic timestamps
+    """
+    sysname = fcntl.ioctl(injector.fileno(), UI_GET_SYSNAME, bytes(64)).split(b'\0', 1)[0].decode()
+
+    # udev creates the node shortly after the device
+    deadline = time.monotonic() + 2
+    while True:
+        nodes = glob.glob(os.path.join('/sys/devices/virtual/input', sysname, 'event*'))
+        if nodes and os.path.exists(os.path.join('/dev/input', os.path.basename(nodes[0]))):
+            break
+        if time.monotonic() > deadline:
+            raise RuntimeError("No event file for " + sysname)
+        time.sleep(0.01)
+
+    fd = os.open(os.path.join('/dev/input', os.path.basename(nodes[0])), os.O_RDONLY | os.O_NONBLOCK)
+    fcntl.ioctl(fd, EVIOCSCLOCKID, CLOCK_MONOTONIC.to_bytes(4, sys.byteorder))
+    return fd
+
+
+def read_key_events(fd, count):
+    """
+    Read key events until count of them have arrived
+
+    :return: Monotonic timestamps of the events in nanoseconds, and when each read returned
+    """
+    timestamps = []
+    read_at = []
+    poller = select.epoll()
+    poller.register(fd, select.EPOLLIN)
+
+    try:
+        while len(timestamps) < count:
+            if not poller.poll(1):
+                raise RuntimeError("Timed out waiting for key events")
+
+            now = time.monotonic_ns()
+            data = os.read(fd, macro.EVENT_STRUCT.size * 64)
+            for offset in range(0, len(data), macro.EVENT_STRUCT.size):
+                ev_sec, ev_usec, ev_type, _, _ = macro.EVENT_STRUCT.unpack_from(data, offset)
+                if ev_type == macro.EV_KEY:
+                    timestamps.append(ev_sec * 1000000000 + ev_usec * 1000)
+                    read_at.append(now)
+    finally:
+        poller.close()
+
+    return timestamps, read_at
+
+
+def measure_latency(injector, fd, presses):
+    """
+    Send single key events and return the microseconds from sending each one to reading it back
+    """
+    latencies = []
+    for index in range(0, presses):
+        key = macro.MacroKey(KEY_NAMES[index % len(KEY_NAMES)], 0, 'DOWN' if index % 2 == 0 else 'UP')
+        program = macro.compile_macro([key], injector.compile)
+
+        start = time.monotonic_ns()
+        injector.send(program[0])
+        _, read_at = read_key_events(fd, 1)
+        latencies.append((read_at[0] - start) / 1000)
+
+    return latencies
+
+
+def measure_timing(injector, fd, keys, pause_us):
+    """
+    Play a macro with a pre_pause between its keys and return the errors of the delays in microseconds
+    """
+    macro_data = []
+    for index in range(0, keys):
+        macro_data.append(macro.MacroKey(KEY_NAMES[(index // 2) % len(KEY_NAMES)], pause_us if index else 0, 'DOWN' if index % 2 == 0 else 'UP'))
+    program = macro.compile_macro(macro_data, injector.compile)
+
+    injector.send(program[0])
+    timestamps, _ = read_key_events(fd, keys)
+
+    return [(second - first) / 1000 - pause_us for first, second in zip(timestamps, timestamps[1:])]
+
+
+def summary(values):
+    """
+    Format the median, 99th percentile and maximum
+    """
+    values = sorted(values)
+    return "median {0:.1f} us, p99 {1:.1f} us, max {2:.1f} us".format(statistics.median(values), values[int(len(values) * 0.99)], values[-1])
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--presses', type=int, default=1000, help='Number of key events for the latency')
+    parser.add_argument('--keys', type=int, default=200, help='Number of key events in the timed macro')
+    parser.add_argument('--pause', type=int, default=10000, help='pre_pause between the keys of the timed macro in microseconds')
+
+    return parser.parse_args()
+
+
+def run():
+    args = parse_args()
+
+    injector = macro.UinputInjector()
+    try:
+        fd = open_event_file(injector)
+        try:
+            print("Send to read latency: " + summary(measure_latency(injector, fd, args.presses)))
+            print("Error of {0} us delays: ".format(args.pause) + summary(measure_timing(injector, fd, args.keys, args.pause)))
+        finally:
+            os.close(fd)
+    finally:
+        injector.close()
+
+
+if __name__ == '__main__':
+    run()
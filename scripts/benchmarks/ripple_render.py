@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+CPU benchmark of the daemon's ripple renderer
+
+Renders frames with a number of simultaneous ripples using the old
+per-key Python loop and the vectorised RippleEffect, and reports the
+time per frame and the CPU share at the default refresh rate.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+import numpy as np
+
+DAEMON = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'daemon')
+sys.path.insert(1, DAEMON)
+# The old per-key loop is kept once, as the reference of the tests
+sys.path.insert(1, os.path.join(DAEMON, 'tests'))
+
+from openrazer_daemon.misc.software_effects import KeyEvents, RippleEffect
+from test_software_effects import legacy_ripple
+
+# (rows, cols) of the ripple capable devices
+MATRIX_SIZES = (
+    (4, 6),   # Tartarus V2
+    (5, 22),  # Orbweaver Chroma
+    (6, 16),  # Laptops
+    (6, 22),  # Keyboards
+    (6, 25),
+    (9, 22),
+)
+
+REFRESH_RATE = 0.04
+
+
+def legacy_render(rows, cols, key_events, frame):
+    """
+    Render a frame the way RippleEffectThread.run used to
+    """
+    frame.fill(0)
+    legacy_ripple(rows, cols, key_events, frame)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ripples', type=int, default=10, help='Number of simultaneous ripples')
+    parser.add_argument('--number', type=int, default=200, help='Frames per measurement')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of measurements, the best is reported')
+
+    return parser.parse_args()
+
+
+def run():
+    args = parse_args()
+
+    print("{0} simultaneous ripples, CPU share at {1} ms per frame".format(args.ripples, REFRESH_RATE * 1000))
+    print("{0:>8} {1:>14} {2:>10} {3:>14} {4:>10}".format('size', 'legacy (us)', 'legacy %', 'numpy (us)', 'numpy %'))
+
+    for rows, cols in MATRIX_SIZES:
+        key_events = [(random.uniform(0, 2), (random.randrange(rows), random.randrange(cols)), (255, 0, 255)) for _ in range(args.ripples)]
+
+        ages, keys, colours = zip(*key_events)
+        key_arrays = KeyEvents(np.array(ages), np.array([key[0] for key in keys], dtype=np.intp), np.array([key[1] for key in keys], dtype=np.intp), np.array(colours, dtype=np.uint8))
+
+        frame = np.zeros((rows, cols, 3), dtype=np.uint8)
+        effect = RippleEffect(rows, cols)
+
+        results = []
+        for func in (lambda: legacy_render(rows, cols, key_events, frame), lambda: effect.render(frame, REFRESH_RATE, key_arrays)):
+            best = min(timeit.repeat(func, number=args.number, repeat=args.repeat)) / args.number
+            results.extend((best * 1e6, best / REFRESH_RATE * 100))
+
+        print("{0:>8} {1:>14.1f} {2:>10.2f} {3:>14.1f} {4:>10.2f}".format('{0}x{1}'.format(rows, cols), *results))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Memory benchmark of the zone states of the devices
+
+Allocates the zone states of a number of devices, as the dicts of dicts
+every device used to have for all its 14 zones and as the ZoneState
+objects of the zones the device has, and reports the memory tracemalloc
+counts for each. Also times reading a state value both ways.
+"""
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(1, os.path.join(ROOT, 'daemon'))
+
+from openrazer_daemon.misc.zone_state import ZoneState, ZoneStates
+
+# RazerDevice.ZONES, the hardware module needs dbus
+ZONES = ('backlight', 'logo', 'scroll', 'left', 'right', 'charging', 'fast_charging', 'fully_charged', 'channel1', 'channel2', 'channel3', 'channel4', 'channel5', 'channel6')
+
+
+def legacy_zones():
+    """
+    Zone states as they were before ZoneState
+    """
+    zone = dict()
+    for i in ZONES:
+        zone[i] = {
+            "present": False,
+            "active": True,
+            "brightness": 75.0,
+            "effect": 'spectrum',
+            "colors": [0, 255, 0, 0, 255, 255, 0, 0, 255],
+            "speed": 1,
+            "wave_dir": 1,
+        }
+
+    return zone
+
+
+def compact_zones(present_zones):
+    """
+    Zone states of a device with the given zones
+    """
+    zone = ZoneStates()
+    for i in present_zones:
+        zone[i] = ZoneState(present=True)
+
+    return zone
+
+
+def measure(allocate, devices):
+    """
+    Allocate the zone states of the devices and return the bytes they use
+    """
+    tracemalloc.start()
+    try:
+        states = [allocate() for _ in range(0, devices)]
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del states
+    return size
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--devices', type=int, default=20, help='Number of devices')
+    parser.add_argument('--zones', type=int, default=2, help='Number of zones every device has')
+    parser.add_argument('--reads', type=int, default=1000000, help='Number of state reads to time')
+
+    return parser.parse_args()
+
+
+def run():
+    args = parse_args()
+    present_zones = ZONES[:args.zones]
+
+    legacy_size = measure(legacy_zones, args.devices)
+    compact_size = measure(lambda: compact_zones(present_zones), args.devices)
+
+    print("{0} devices with {1} zones".format(args.devices, len(present_zones)))
+    print("dicts:     {0:8d} bytes, {1:6d} per device".format(legacy_size, legacy_size // args.devices))
+    print("ZoneState: {0:8d} bytes, {1:6d} per device ({2:.1f}x smaller)".format(compact_size, compact_size // args.devices, legacy_size / compact_size))
+
+    legacy = legacy_zones()
+    compact = compact_zones(present_zones)
+    zone_name = present_zones[0]
+    for name, statement in (('dict key', 'zone[zone_name]["brightness"]'), ('ZoneState key', 'compact[zone_name]["brightness"]'), ('ZoneState attribute', 'compact[zone_name].brightness')):
+        seconds = timeit.timeit(statement, globals={'zone': legacy, 'compact': compact, 'zone_name': zone_name}, number=args.reads)
+        print("{0:20s} {1:.1f} ns per read".format(name + ':', seconds / args.reads * 1e9))
+
+
+if __name__ == '__main__':
+    run()
@@ -139,7 +139,7 @@ def test_sysfs_consistency(d):
 
 def test_ripple_capable(d):
     # Check that the device has a matrix for a software ripple effect
-    if d.has("lighting_ripple") or d.has("lighting_ripple_random"):
+    if d.has("lighting_ripple") or d.has("lighting_ripple_random") or d.has("lighting_software_effects"):
         if d._matrix_dimensions == (-1, -1):
             _test_failed(d.name, "Cannot have a ripple capability without a matrix")
 